@@ -0,0 +1,69 @@
+# benchmarks/bench_alert_memory.py - Bytes per alert: list of dicts vs columnar AlertStore vs the full working set
+#
+# Run from the repo root:  python -m benchmarks.bench_alert_memory
+
+import gc
+import random
+import tracemalloc
+from database.alert_store import AlertStore
+
+ALERTS = 1_000_000
+SYMBOLS = [f"SYM{i}" for i in range(500)]
+
+
+def measure(build) -> tuple:
+    """Return (bytes allocated by build(), the built object)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, obj
+
+
+def rows():
+    rnd = random.Random(7)
+    for i in range(ALERTS):
+        # Distinct chat ids / float prices, like real data (no small-int or float caching)
+        yield (i + 1, 10_000_000 + rnd.randrange(200_000), rnd.choice(SYMBOLS),
+               rnd.uniform(0.01, 100_000), "up" if i % 2 else "down")
+
+
+def build_dicts():
+    return [{"chat_id": c, "symbol": s, "price": p, "type": t} for _, c, s, p, t in rows()]
+
+
+def build_store():
+    store = AlertStore()
+    for alert_id, c, s, p, t in rows():
+        store.add(alert_id, c, s, p, t)
+    return store
+
+
+def build_working_set():
+    """Everything database.alerts keeps per alert: store, threshold index, per-user index, symbol refs."""
+    from database import alerts
+    for _, c, s, p, t in rows():
+        alerts._insert(c, s, p, t, None)
+    return alerts
+
+
+def main():
+    dict_bytes, dicts = measure(build_dicts)
+    del dicts
+    store_bytes, store = measure(build_store)
+    del store
+    total_bytes, _ = measure(build_working_set)
+
+    print(f"alerts: {ALERTS:,}")
+    print(f"list of dicts : {dict_bytes / 2**20:8.1f} MiB  ({dict_bytes / ALERTS:6.1f} B/alert)")
+    print(f"AlertStore    : {store_bytes / 2**20:8.1f} MiB  ({store_bytes / ALERTS:6.1f} B/alert)")
+    print(f"working set   : {total_bytes / 2**20:8.1f} MiB  ({total_bytes / ALERTS:6.1f} B/alert)"
+          f"  store + threshold index + per-user index + symbol refs")
+    print(f"reduction     : {dict_bytes / store_bytes:8.1f}x store, {dict_bytes / total_bytes:.1f}x working set")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/bench_event_loop.py - asyncio's default event loop vs uvloop on the bot's workloads
+#
+# Run from the repo root (uvloop optional):  python -m benchmarks.bench_event_loop
+
+import asyncio
+import random
+import time
+import aiohttp
+from benchmarks.fake_binance import FakeBinance
+
+TIMER_TASKS = 20_000     # concurrent sleepers (poll deadlines, token-bucket waits)
+QUEUE_ITEMS = 200_000    # notifier-style queue hand-offs
+QUEUE_WORKERS = 8
+HTTP_REQUESTS = 3_000    # local REST round trips (client and server on the same loop)
+HTTP_CONCURRENCY = 50
+
+
+# ---------- WORKLOADS ----------
+async def timers() -> int:
+    rnd = random.Random(1)
+
+    async def sleeper():
+        for _ in range(5):
+            await asyncio.sleep(rnd.uniform(0, 0.01))
+
+    await asyncio.gather(*(sleeper() for _ in range(TIMER_TASKS)))
+    return TIMER_TASKS * 5
+
+
+async def queue_handoff() -> int:
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def worker():
+        while True:
+            await queue.get()
+            queue.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(QUEUE_WORKERS)]
+    for i in range(QUEUE_ITEMS):
+        queue.put_nowait(i)
+        if i % 1000 == 0:
+            await asyncio.sleep(0)
+    await queue.join()
+    for w in workers:
+        w.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    return QUEUE_ITEMS
+
+
+async def http_roundtrips() -> int:
+    fake = FakeBinance({f"SYM{i}": 1.0 + i for i in range(300)})
+    url = await fake.start() + "/api/v3/ticker/price"
+    semaphore = asyncio.Semaphore(HTTP_CONCURRENCY)
+
+    async with aiohttp.ClientSession() as session:
+        async def fetch(i):
+            async with semaphore:
+                async with session.get(url, params={"symbol": f"SYM{i % 300}USDT"}) as resp:
+                    await resp.json()
+
+        await asyncio.gather(*(fetch(i) for i in range(HTTP_REQUESTS)))
+
+    await fake.stop()
+    return HTTP_REQUESTS
+
+
+WORKLOADS = {"timers": timers, "queue": queue_handoff, "http": http_roundtrips}
+
+
+# ---------- RUNNER ----------
+def run(loop_factory) -> dict:
+    """ops/sec of every workload, each in a fresh event loop."""
+    results = {}
+    for name, workload in WORKLOADS.items():
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            start = time.perf_counter()
+            ops = runner.run(workload())
+            results[name] = ops / (time.perf_counter() - start)
+    return results
+
+
+def main():
+    loops = {"asyncio": None}
+    try:
+        import uvloop
+        loops["uvloop"] = uvloop.new_event_loop
+    except ImportError:
+        print("uvloop not installed (pip install uvloop) — measuring asyncio only\n")
+
+    results = {name: run(factory) for name, factory in loops.items()}
+
+    print(f"{'workload':>10} | " + " | ".join(f"{name:>14}" for name in results) + " | speedup")
+    for workload in WORKLOADS:
+        rates = [results[name][workload] for name in results]
+        speedup = f"{rates[-1] / rates[0]:.2f}x" if len(rates) > 1 else "-"
+        print(f"{workload:>10} | " + " | ".join(f"{r:>10,.0f} op/s" for r in rates) + f" | {speedup}")
+
+
+if __name__ == "__main__":
+    main()
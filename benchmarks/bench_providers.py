@@ -0,0 +1,132 @@
+# benchmarks/bench_providers.py - Hedged multi-provider price lookups against local fake exchanges
+#
+# Binance, OKX and Bybit are served locally (benchmarks/fake_binance.py, fake_exchanges.py);
+# each scenario degrades Binance differently and measures what a /price lookup sees.
+# "binance stalled" runs without backups: lookups must give up after HTTP_TIMEOUT, not hang.
+#
+#   python -m benchmarks.bench_providers
+
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+from benchmarks.fake_binance import FakeBinance
+from benchmarks.fake_exchanges import FakeExchange
+from benchmarks.loadtest import percentiles
+
+SYMBOLS = 200
+LOOKUPS = 300        # single-symbol lookups per scenario
+CONCURRENCY = 20
+BASE_LATENCY = 0.01  # seconds every fake exchange takes to answer
+HTTP_TIMEOUT = 2     # per-attempt timeout for the run (a stalled host must hit it)
+HANG_LIMIT = 60      # a scenario taking longer than this is a hang → the benchmark fails
+ALL = ["binance", "okx", "bybit"]
+
+# name → (Binance latency, Binance error rate, providers)
+SCENARIOS = {
+    "healthy": (BASE_LATENCY, 0.0, ALL),
+    "binance slow": (1.5, 0.0, ALL),
+    "binance flaky": (BASE_LATENCY, 0.3, ALL),
+    "binance down": (BASE_LATENCY, 1.0, ALL),
+    "binance stalled": (3600, 0.0, ["binance"]),
+}
+
+
+async def scenario(name: str, fakes: dict, symbols: list) -> dict:
+    from services import binance, providers
+    from services.binance_client import BinanceClient
+    from utils.metrics import PROVIDER_HEDGES
+
+    latency, error_rate, names = SCENARIOS[name]
+    fakes["binance"].latency, fakes["binance"].error_rate = latency, error_rate
+
+    # Fresh health state per scenario (the Binance client keeps its own breakers and budget)
+    binance.client = BinanceClient([os.environ["BINANCE_API_URL"]])
+    pool = providers.ProviderPool(providers.build_providers(names))
+    hedges_before = PROVIDER_HEDGES.total()
+
+    rnd = random.Random(1)
+    samples, misses = [], 0
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def lookup(symbol):
+        nonlocal misses
+        async with semaphore:
+            started = time.perf_counter()
+            price = await pool.get_price(symbol)
+            samples.append(time.perf_counter() - started)
+            misses += price is None
+
+    started = time.perf_counter()
+    lookups = asyncio.gather(*(lookup(rnd.choice(symbols)) for _ in range(LOOKUPS)))
+    await asyncio.wait_for(lookups, HANG_LIMIT)
+    elapsed = time.perf_counter() - started
+
+    bulk_started = time.perf_counter()
+    snapshot = await asyncio.wait_for(pool.get_prices(), HANG_LIMIT)
+    bulk = time.perf_counter() - bulk_started
+
+    return {
+        "lookups_per_sec": LOOKUPS / elapsed,
+        "latency": percentiles(samples),
+        "misses": misses,
+        "hedged": PROVIDER_HEDGES.total() - hedges_before,
+        "wins": {p: next((x.health.wins for x in pool.providers if x.name == p), 0) for p in ALL},
+        "scores": {h["name"]: h["score"] for h in pool.health()},
+        "snapshot": (len(snapshot or {}), bulk),
+    }
+
+
+async def run(workdir: str) -> dict:
+    rnd = random.Random(0)
+    symbols = [f"SYM{i}" for i in range(SYMBOLS)]
+    prices = {s: rnd.uniform(0.5, 50_000) for s in symbols}
+
+    fakes = {"binance": FakeBinance(prices), "okx": FakeExchange("okx", prices), "bybit": FakeExchange("bybit", prices)}
+    urls = {name: await fake.start() for name, fake in fakes.items()}
+    for name in ("okx", "bybit"):
+        fakes[name].latency = BASE_LATENCY * 3  # backups are farther away than the primary
+
+    # config.py reads the environment at import time → set it before importing the providers
+    os.environ.setdefault("BOT_TOKEN", "123456:PROVIDERS")
+    os.environ.update({"BINANCE_API_URL": urls["binance"], "OKX_API_URL": urls["okx"], "BYBIT_API_URL": urls["bybit"],
+                       "PRICE_PROVIDERS": "binance,okx,bybit", "HTTP_TIMEOUT": str(HTTP_TIMEOUT),
+                       "LOG_FILE": os.path.join(workdir, "bench_providers.log")})  # never the repo's logs/
+
+    from services.session import get_session
+    from utils import logger as bot_logger
+
+    # Failures are the point here; keep the console to the results
+    for handler in bot_logger._listener.handlers if bot_logger._listener else ():
+        if isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.FileHandler):
+            handler.setLevel(logging.CRITICAL)
+
+    try:
+        return {name: await scenario(name, fakes, symbols) for name in SCENARIOS}
+    finally:
+        await (await get_session()).close()
+        for fake in fakes.values():
+            await fake.stop()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        results = asyncio.run(run(workdir))
+
+    print(f"{'scenario':>15} | {'lookups/s':>9} | {'p50 ms':>7} | {'p99 ms':>7} | misses | hedged | "
+          f"wins binance/okx/bybit | snapshot")
+    for name, r in results.items():
+        wins = "/".join(str(r["wins"][p]) for p in ("binance", "okx", "bybit"))
+        count, seconds = r["snapshot"]
+        latency = r["latency"]
+        print(f"{name:>15} | {r['lookups_per_sec']:>9,.0f} | {latency['p50']:>7,.1f} | {latency['p99']:>7,.1f} | "
+              f"{r['misses']:>6} | {r['hedged']:>6,.0f} | {wins:>22} | {count} in {seconds * 1000:,.0f} ms")
+    print("\nhealth scores after each scenario:")
+    for name, r in results.items():
+        print(f"  {name:>15}: " + ", ".join(f"{p} {s:.2f}" for p, s in r["scores"].items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_trigger_index.py - Check cost vs alert count: flat list scan vs sorted index
+#
+# Run from the repo root:  python -m benchmarks.bench_trigger_index
+
+import random
+import time
+from database.alert_index import ThresholdIndex
+
+SYMBOLS = [f"SYM{i}" for i in range(200)]
+ALERT_COUNTS = (10_000, 100_000, 1_000_000)
+TICKS = 20
+
+
+# ---------- SYNTHETIC DATA ----------
+def make_alerts(n: int, base: dict) -> list:
+    """Alerts spread ±20% around each symbol's base price, half up and half down."""
+    rnd = random.Random(n)
+    out = []
+    for i in range(n):
+        sym = SYMBOLS[i % len(SYMBOLS)]
+        alert_type = "up" if i % 2 else "down"
+        offset = rnd.uniform(0.01, 0.20)
+        price = base[sym] * (1 + offset if alert_type == "up" else 1 - offset)
+        out.append({"chat_id": i % 5000, "symbol": sym, "price": price, "type": alert_type})
+    return out
+
+
+def make_ticks(base: dict) -> list:
+    """Small random walks: a handful of alerts fire per tick, most do not."""
+    rnd = random.Random(0)
+    ticks, current = [], dict(base)
+    for _ in range(TICKS):
+        current = {s: p * (1 + rnd.uniform(-0.002, 0.002)) for s, p in current.items()}
+        ticks.append(current)
+    return ticks
+
+
+# ---------- OLD PATH: SCAN EVERYTHING ----------
+def flat_scan(alerts: list, ticks: list) -> tuple:
+    fired_total = 0
+    start = time.perf_counter()
+    for prices in ticks:
+        triggered = []
+        for alert in alerts:
+            current = prices[alert["symbol"]]
+            if (alert["type"] == "up" and current >= alert["price"]) or \
+               (alert["type"] == "down" and current <= alert["price"]):
+                triggered.append(alert)
+        fired_total += len(triggered)
+        if triggered:
+            ids = {id(a) for a in triggered}
+            alerts = [a for a in alerts if id(a) not in ids]
+    return time.perf_counter() - start, fired_total
+
+
+# ---------- NEW PATH: SORTED INDEX ----------
+def indexed(alerts: list, ticks: list) -> tuple:
+    index = ThresholdIndex()
+    index.rebuild((a["symbol"], a["type"], a["price"], slot) for slot, a in enumerate(alerts))
+
+    fired_total = 0
+    start = time.perf_counter()
+    for prices in ticks:
+        for sym in index.symbols():
+            fired_total += len(index.pop_triggered(sym, prices[sym]))
+    return time.perf_counter() - start, fired_total
+
+
+def main():
+    rnd = random.Random(42)
+    base = {s: rnd.uniform(0.1, 50_000) for s in SYMBOLS}
+    ticks = make_ticks(base)
+
+    print(f"{'alerts':>10} | {'flat ms/tick':>12} | {'index ms/tick':>13} | {'speedup':>8} | fired")
+    for n in ALERT_COUNTS:
+        alerts = make_alerts(n, base)
+        flat_t, flat_fired = flat_scan(list(alerts), ticks)
+        idx_t, idx_fired = indexed(alerts, ticks)
+        assert flat_fired == idx_fired, (flat_fired, idx_fired)
+
+        print(f"{n:>10,} | {flat_t / TICKS * 1000:>12.2f} | {idx_t / TICKS * 1000:>13.3f} | "
+              f"{flat_t / idx_t:>7.0f}x | {idx_fired}")
+
+
+if __name__ == "__main__":
+    main()
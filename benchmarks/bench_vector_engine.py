@@ -0,0 +1,93 @@
+# benchmarks/bench_vector_engine.py - Trigger evaluation: pure-Python loop vs NumPy vs sorted index
+#
+# The index is what the bot runs; both full scans are O(N) per tick. NumPy is how much a scan
+# can be sped up, and TRIGGER_ENGINE=numpy runs it on top of the index only as a cross-check.
+#
+# Run from the repo root (needs numpy):  python -m benchmarks.bench_vector_engine
+
+import random
+import time
+from database.alert_index import ThresholdIndex
+from database.alert_store import AlertStore, UP, DOWN
+from database import vector_engine
+
+SYMBOLS = [f"SYM{i}" for i in range(300)]
+ALERT_COUNTS = (100_000, 300_000, 1_000_000)
+TICKS = 10
+
+
+def build(n: int, base: dict) -> AlertStore:
+    rnd = random.Random(n)
+    store = AlertStore()
+    for i in range(n):
+        sym = SYMBOLS[i % len(SYMBOLS)]
+        alert_type = "up" if i % 2 else "down"
+        offset = rnd.uniform(0.01, 0.20)
+        price = base[sym] * (1 + offset if alert_type == "up" else 1 - offset)
+        store.add(i + 1, i % 20_000, sym, price, alert_type)
+    return store
+
+
+# ---------- PURE-PYTHON PATH ----------
+def python_fired(store: AlertStore, prices: dict) -> list:
+    """The old per-alert loop, run over the same columns."""
+    fired = []
+    symbols, thresholds, directions = store.symbols, store.prices, store.directions
+    for slot, sid in enumerate(store.symbol_ids):
+        current = prices.get(symbols[sid])
+        if current is None:
+            continue
+        d = directions[slot]
+        if (d == UP and current >= thresholds[slot]) or (d == DOWN and current <= thresholds[slot]):
+            fired.append(slot)
+    return fired
+
+
+def index_fired(index: ThresholdIndex, prices: dict) -> list:
+    """Sorted index lookup (pops what fired), for reference."""
+    fired = []
+    for sym, price in prices.items():
+        for slot in index.pop_triggered(sym, price):
+            fired.append(slot)
+    return fired
+
+
+def bench(fn, *args) -> tuple:
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        result = fn(*args)
+    return (time.perf_counter() - start) / TICKS * 1000, len(result)
+
+
+def main():
+    if not vector_engine.available():
+        raise SystemExit("numpy is required for this benchmark (pip install numpy)")
+
+    rnd = random.Random(1)
+    base = {s: rnd.uniform(0.1, 50_000) for s in SYMBOLS}
+    # A 5% move on every symbol: a realistic "busy" tick that fires a good share of alerts
+    prices = {s: p * (1.05 if i % 2 else 0.95) for i, (s, p) in enumerate(base.items())}
+
+    print(f"{'alerts':>10} | {'python ms':>9} | {'numpy ms':>8} | {'speedup':>7} | {'index ms':>8} | fired")
+    for n in ALERT_COUNTS:
+        store = build(n, base)
+        py_ms, py_fired = bench(python_fired, store, prices)
+        np_ms, np_fired = bench(vector_engine.fired_slots, store, prices)
+        assert py_fired == np_fired
+
+        # The index consumes what fires, so rebuild it for every tick outside the timing
+        idx_total = 0.0
+        for _ in range(TICKS):
+            index = ThresholdIndex()
+            index.rebuild((store.symbol_of(s), store.type_of(s), store.prices[s], s) for s in store.slots())
+            start = time.perf_counter()
+            idx_fired = len(index_fired(index, prices))
+            idx_total += time.perf_counter() - start
+        assert idx_fired == np_fired
+
+        print(f"{n:>10,} | {py_ms:>9.1f} | {np_ms:>8.2f} | {py_ms / np_ms:>6.0f}x | "
+              f"{idx_total / TICKS * 1000:>8.2f} | {np_fired:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# benchmarks/fake_binance.py - Local stand-in for the Binance REST + WebSocket market data API
+
+import asyncio
+import json
+import random
+import time
+from typing import Dict
+from aiohttp import web, WSMsgType
+
+ALL_MARKET = "!miniticker@arr"  # all-market miniTicker stream (stream names are compared lowercased)
+
+
+class FakeBinance:
+    """
+    Serves /api/v3/ticker/price (single, batched and all-tickers), /api/v3/exchangeInfo
+    and a /ws stream that understands SUBSCRIBE / UNSUBSCRIBE and pushes miniTicker events
+    (per symbol, or as arrays on the all-market "!miniTicker@arr" stream).
+    Prices are changed from the test side with set_prices(), pair status via `statuses`.
+
+    Fault injection for REST: `latency` (seconds added to every request), `error_rate`
+    (fraction answered with `error_status`), fail_next(n) for deterministic failures,
+    and a per-minute `weight_limit` reported in X-MBX-USED-WEIGHT-1M and enforced with 429.
+    """
+
+    def __init__(self, prices: Dict[str, float], quote: str = "USDT"):
+        self.prices = dict(prices)  # base symbol → price
+        self.quote = quote
+        self.statuses: Dict[str, str] = {}  # base symbol → exchangeInfo status (default TRADING)
+        self.requests = 0
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self.error_status = 500
+        self.weight_limit: int | None = None
+        self.used_weight = 0
+        self._weight_window = 0
+        self._fail_next = 0
+        self._subscribers: Dict[web.WebSocketResponse, set] = {}
+        self._runner: web.AppRunner | None = None
+
+    # ---------- LIFECYCLE ----------
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._faults])
+        app.router.add_get("/api/v3/ticker/price", self._ticker_price)
+        app.router.add_get("/api/v3/exchangeInfo", self._exchange_info)
+        app.router.add_get("/ws", self._ws)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL (e.g. http://127.0.0.1:54321)."""
+        # Cancel handlers whose client hung up (a stalled request must not hold up stop())
+        self._runner = web.AppRunner(self.app(), handler_cancellation=True)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        host, port = self._runner.addresses[0][:2]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        for ws in list(self._subscribers):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    # ---------- PRICE CONTROL ----------
+    async def set_prices(self, updates: Dict[str, float]):
+        """Change prices and push them to every stream subscribed to those symbols."""
+        self.prices.update(updates)
+
+        for ws, streams in list(self._subscribers.items()):
+            if ALL_MARKET in streams:
+                messages = [[self._event(s, p) for s, p in updates.items()]]
+            else:
+                messages = [self._event(s, p) for s, p in updates.items() if self._stream(s) in streams]
+            for message in messages:
+                try:
+                    await ws.send_json(message)
+                except ConnectionError:
+                    self._subscribers.pop(ws, None)
+
+    def fail_next(self, count: int, status: int = 500):
+        """Answer the next `count` REST requests with `status` (0 → drop the connection)."""
+        self._fail_next = count
+        self.error_status = status
+
+    # ---------- FAULTS & WEIGHT ----------
+    @web.middleware
+    async def _faults(self, request: web.Request, handler):
+        if request.path == "/ws":
+            return await handler(request)
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self._fail_next > 0 or (self.error_rate and random.random() < self.error_rate):
+            self._fail_next = max(0, self._fail_next - 1)
+            self.requests += 1
+            if self.error_status == 0:
+                request.transport.close()  # client sees "Server disconnected"
+                return web.Response()
+            return web.json_response({"code": -1000, "msg": "Injected error."}, status=self.error_status)
+
+        window = int(time.time() // 60)
+        if window != self._weight_window:
+            self._weight_window, self.used_weight = window, 0
+        self.used_weight += 20 if request.path.endswith("exchangeInfo") else (2 if "symbol" in request.query else 4)
+        headers = {"X-MBX-USED-WEIGHT-1M": str(self.used_weight)}
+
+        if self.weight_limit is not None and self.used_weight > self.weight_limit:
+            self.requests += 1
+            return web.json_response({"code": -1003, "msg": "Too many requests."}, status=429,
+                                     headers={**headers, "Retry-After": str(60 - int(time.time() % 60))})
+
+        response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+    # ---------- REST ----------
+    async def _ticker_price(self, request: web.Request) -> web.Response:
+        self.requests += 1
+
+        if "symbol" in request.query:
+            pair = request.query["symbol"]
+            base = pair[:-len(self.quote)]
+            if not pair.endswith(self.quote) or base not in self.prices:
+                return web.json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+            return web.json_response(self._ticker(base))
+
+        if "symbols" in request.query:
+            bases = [p[:-len(self.quote)] for p in json.loads(request.query["symbols"])]
+            return web.json_response([self._ticker(b) for b in bases if b in self.prices])
+
+        return web.json_response([self._ticker(b) for b in self.prices])
+
+    async def _exchange_info(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        symbols = [
+            {
+                "symbol": f"{base}{self.quote}",
+                "status": self.statuses.get(base, "TRADING"),
+                "baseAsset": base,
+                "quoteAsset": self.quote,
+                "filters": [{"filterType": "PRICE_FILTER", "tickSize": "0.01000000"}],
+            }
+            for base in self.prices
+        ]
+        return web.json_response({"timezone": "UTC", "symbols": symbols})
+
+    def _ticker(self, base: str) -> dict:
+        return {"symbol": f"{base}{self.quote}", "price": f"{self.prices[base]:.8f}"}
+
+    # ---------- WEBSOCKET ----------
+    def _stream(self, base: str) -> str:
+        return f"{base.lower()}{self.quote.lower()}@miniticker"
+
+    def _event(self, base: str, price: float) -> dict:
+        return {"e": "24hrMiniTicker", "s": f"{base}{self.quote}", "c": f"{price:.8f}"}
+
+    async def _ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        streams = self._subscribers[ws] = set()
+
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            data = json.loads(msg.data)
+            params = {p.lower() for p in data.get("params", [])}
+
+            if data.get("method") == "SUBSCRIBE":
+                streams |= params
+                await ws.send_json({"result": None, "id": data.get("id")})
+                # Like Binance, the first event arrives right after subscribing
+                if ALL_MARKET in params:
+                    await ws.send_json([self._event(base, price) for base, price in self.prices.items()])
+                for base, price in self.prices.items():
+                    if self._stream(base) in params:
+                        await ws.send_json(self._event(base, price))
+            elif data.get("method") == "UNSUBSCRIBE":
+                streams -= params
+                await ws.send_json({"result": None, "id": data.get("id")})
+
+        self._subscribers.pop(ws, None)
+        return ws
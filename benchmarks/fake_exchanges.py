@@ -0,0 +1,88 @@
+# benchmarks/fake_exchanges.py - Local stand-ins for the backup price providers (OKX, Bybit public tickers)
+
+import asyncio
+import random
+from typing import Dict
+from aiohttp import web
+
+
+class FakeExchange:
+    """
+    Serves the ticker endpoints services/providers.py reads, in OKX's or Bybit's format
+    (`flavor`), for the coins in `prices` (base symbol → USDT price).
+
+    Fault injection: `latency` (seconds added to every request), `error_rate` (fraction
+    answered with HTTP 500), and fail_next(n) for deterministic failures.
+    """
+
+    def __init__(self, flavor: str, prices: Dict[str, float]):
+        if flavor not in ("okx", "bybit"):
+            raise ValueError(f"unknown flavor {flavor!r}")
+        self.flavor = flavor
+        self.prices = dict(prices)
+        self.requests = 0
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self._fail_next = 0
+        self._runner: web.AppRunner | None = None
+
+    # ---------- LIFECYCLE ----------
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._faults])
+        if self.flavor == "okx":
+            app.router.add_get("/api/v5/market/ticker", self._okx_ticker)
+            app.router.add_get("/api/v5/market/tickers", self._okx_tickers)
+        else:
+            app.router.add_get("/v5/market/tickers", self._bybit_tickers)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL."""
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        host, port = self._runner.addresses[0][:2]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def fail_next(self, count: int):
+        self._fail_next = count
+
+    # ---------- FAULTS ----------
+    @web.middleware
+    async def _faults(self, request: web.Request, handler):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self._fail_next > 0 or (self.error_rate and random.random() < self.error_rate):
+            self._fail_next = max(0, self._fail_next - 1)
+            return web.json_response({"msg": "Injected error."}, status=500)
+        return await handler(request)
+
+    # ---------- OKX ----------
+    async def _okx_ticker(self, request: web.Request) -> web.Response:
+        base = request.query.get("instId", "").removesuffix("-USDT")
+        if base not in self.prices:
+            return web.json_response({"code": "51001", "msg": "Instrument ID does not exist", "data": []})
+        return web.json_response({"code": "0", "msg": "", "data": [self._okx_row(base)]})
+
+    async def _okx_tickers(self, request: web.Request) -> web.Response:
+        return web.json_response({"code": "0", "msg": "", "data": [self._okx_row(b) for b in self.prices]})
+
+    def _okx_row(self, base: str) -> dict:
+        return {"instType": "SPOT", "instId": f"{base}-USDT", "last": f"{self.prices[base]:.8f}"}
+
+    # ---------- BYBIT ----------
+    async def _bybit_tickers(self, request: web.Request) -> web.Response:
+        if "symbol" in request.query:
+            base = request.query["symbol"].removesuffix("USDT")
+            if base not in self.prices:
+                return web.json_response({"retCode": 10001, "retMsg": "Not supported symbols", "result": {}})
+            bases = [base]
+        else:
+            bases = list(self.prices)
+        rows = [{"symbol": f"{b}USDT", "lastPrice": f"{self.prices[b]:.8f}"} for b in bases]
+        return web.json_response({"retCode": 0, "retMsg": "OK", "result": {"category": "spot", "list": rows}})
@@ -0,0 +1,71 @@
+# benchmarks/fake_telegram.py - Local stand-in for the Telegram Bot API
+
+import asyncio
+import time
+from typing import List, Tuple
+from aiohttp import web
+
+
+class FakeTelegram:
+    """
+    Answers the Bot API methods the bot uses during a load test and records
+    every sendMessage as (time.monotonic(), chat_id, text).
+    Point aiogram at it with TELEGRAM_API_URL=<base url>.
+    """
+
+    def __init__(self, send_latency: float = 0.0):
+        self.send_latency = send_latency  # simulated server-side delay per sendMessage
+        self.messages: List[Tuple[float, int, str]] = []
+        self._message_id = 0
+        self._runner: web.AppRunner | None = None
+
+    # ---------- LIFECYCLE ----------
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._method)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL."""
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        host, port = self._runner.addresses[0][:2]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    # ---------- BOT API ----------
+    async def _method(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"].lower()
+        data = await request.post()
+
+        if method == "getme":
+            return self._ok({"id": 1, "is_bot": True, "first_name": "LoadTest", "username": "loadtest_bot"})
+
+        if method == "getupdates":
+            # Short "long poll" with no updates keeps the polling loop alive cheaply
+            await asyncio.sleep(min(float(data.get("timeout", 1)), 1.0))
+            return self._ok([])
+
+        if method == "sendmessage":
+            if self.send_latency:
+                await asyncio.sleep(self.send_latency)
+            chat_id = int(data["chat_id"])
+            self.messages.append((time.monotonic(), chat_id, data["text"]))
+            self._message_id += 1
+            return self._ok({
+                "message_id": self._message_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": data["text"],
+            })
+
+        # deleteWebhook, close, … → accept and ignore
+        return self._ok(True)
+
+    @staticmethod
+    def _ok(result) -> web.Response:
+        return web.json_response({"ok": True, "result": result})
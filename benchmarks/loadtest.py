@@ -0,0 +1,259 @@
+# benchmarks/loadtest.py - End-to-end load test against fake Binance and Telegram servers
+#
+# Runs the real bot.main() wiring (SQLite load, notifier, price checker, polling)
+# against local stand-ins, moves prices across every alert and reports JSON metrics.
+#
+#   python -m benchmarks.loadtest --scenarios 100x1000,1000x10000,5000x100000 --output bench.json
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+SCHEMA_VERSION = 1
+
+
+# ---------- HELPERS ----------
+def percentiles(samples: list, points=(50, 90, 99)) -> dict:
+    """Milliseconds summary of a list of second-valued samples."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    out = {f"p{p}": round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000, 3)
+           for p in points}
+    out["mean"] = round(statistics.fmean(ordered) * 1000, 3)
+    out["max"] = round(ordered[-1] * 1000, 3)
+    return out
+
+
+def rss_mb() -> float:
+    """Current resident set size (Linux /proc, falls back to peak RSS elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def loop_lag_probe(samples: list, interval: float = 0.05):
+    """Record how late a short sleep wakes up — a direct measure of event-loop blocking."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - start - interval))
+
+
+def seed_database(db_path: str, schema: str, users: int, alerts: int, symbols: list, base: dict):
+    """Write synthetic alerts straight into SQLite; bot.main() loads them at startup."""
+    rnd = random.Random(alerts)
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executescript(schema)
+        conn.execute("DELETE FROM alerts")
+        rows = []
+        for i in range(alerts):
+            symbol = symbols[i % len(symbols)]
+            alert_type = "up" if i % 2 else "down"
+            offset = rnd.uniform(0.01, 0.10)  # 1–10% away: price noise (±0.5%) never fires them
+            price = base[symbol] * (1 + offset if alert_type == "up" else 1 - offset)
+            rows.append((i + 1, 1_000_000 + rnd.randrange(users), symbol, price, alert_type, time.time()))
+        conn.executemany("INSERT INTO alerts (id, chat_id, symbol, price, type, created_at) VALUES (?, ?, ?, ?, ?, ?)", rows)
+    conn.close()
+
+
+# ---------- ONE SCENARIO ----------
+async def run_scenario(args, users: int, alerts: int, fake_binance, fake_telegram, modules) -> dict:
+    bot_module, alerts_db, storage, price_checker = modules
+
+    rnd = random.Random(users)
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    base = {s: rnd.uniform(0.5, 50_000) for s in symbols}
+    await fake_binance.set_prices(base)
+    fake_binance.requests = 0
+    fake_telegram.messages.clear()
+
+    seed_database(storage.DB_PATH, storage.SCHEMA, users, alerts, symbols, base)
+
+    # Instrument the checker's two phases without changing its code
+    cycle_samples, cycle_start = [], {}
+    real_fetch, real_process = price_checker._fetch_prices, price_checker.process_prices
+
+    async def timed_fetch(symbols):
+        cycle_start["t"] = time.perf_counter()
+        return await real_fetch(symbols)
+
+    def timed_process(prices):
+        start = cycle_start.pop("t", None) or time.perf_counter()
+        real_process(prices)
+        cycle_samples.append(time.perf_counter() - start)
+
+    price_checker._fetch_prices, price_checker.process_prices = timed_fetch, timed_process
+
+    lag_samples = []
+    lag_task = asyncio.create_task(loop_lag_probe(lag_samples))
+    rss_before = rss_mb()
+
+    load_start = time.perf_counter()
+    main_task = asyncio.create_task(bot_module.main())
+    while len(alerts_db.store) < alerts:
+        await asyncio.sleep(0.01)
+    load_seconds = time.perf_counter() - load_start
+    rss_loaded = rss_mb()
+
+    # Synthetic price path: small random walk that never reaches a threshold…
+    async def noise():
+        while True:
+            await fake_binance.set_prices({s: base[s] * (1 + rnd.uniform(-0.005, 0.005)) for s in symbols})
+            await asyncio.sleep(0.5)
+
+    noise_task = asyncio.create_task(noise())
+    await asyncio.sleep(args.warmup)
+
+    # …then two jumps: every up threshold is crossed, then every down threshold
+    move_times = {}
+    expected = {"above": alerts // 2, "below": alerts - alerts // 2}
+    timed_out = False
+
+    for label, factor in (("above", 1.11), ("below", 0.89)):
+        noise_task.cancel()
+        move_times[label] = time.monotonic()
+        await fake_binance.set_prices({s: base[s] * factor for s in symbols})
+
+        deadline = time.monotonic() + args.phase_timeout
+        while _count_blocks(fake_telegram.messages, label) < expected[label]:
+            if time.monotonic() > deadline:
+                timed_out = True
+                break
+            await asyncio.sleep(0.05)
+
+    main_task.cancel()
+    await asyncio.gather(main_task, return_exceptions=True)
+    lag_task.cancel()
+    price_checker._fetch_prices, price_checker.process_prices = real_fetch, real_process
+
+    # Latency from the price change to the notification, per alert
+    latencies = []
+    for received, _, text in fake_telegram.messages:
+        for label, moved in move_times.items():
+            latencies.extend([received - moved] * text.count(f"Target: {label}"))
+
+    sent_times = [m[0] for m in fake_telegram.messages]
+    span = (max(sent_times) - min(sent_times)) if len(sent_times) > 1 else 0
+
+    return {
+        "users": users,
+        "alerts": alerts,
+        "symbols": args.symbols,
+        "timed_out": timed_out,
+        "startup_load_s": round(load_seconds, 3),
+        "check_cycle_ms": percentiles(cycle_samples),
+        "check_cycles": len(cycle_samples),
+        "binance_requests": fake_binance.requests,
+        "alerts_notified": sum(_count_blocks(fake_telegram.messages, l) for l in move_times),
+        "messages_sent": len(fake_telegram.messages),
+        "messages_per_sec": round(len(sent_times) / span, 1) if span else None,
+        "notify_latency_ms": percentiles(latencies, points=(50, 90, 95, 99)),
+        "loop_lag_ms": percentiles(lag_samples),
+        "rss_mb": {"before": round(rss_before, 1), "loaded": round(rss_loaded, 1), "after": round(rss_mb(), 1)},
+    }
+
+
+def _count_blocks(messages: list, label: str) -> int:
+    return sum(text.count(f"Target: {label}") for _, _, text in messages)
+
+
+# ---------- ENTRYPOINT ----------
+async def run(args) -> dict:
+    from benchmarks.fake_binance import FakeBinance
+    from benchmarks.fake_telegram import FakeTelegram
+
+    fake_binance, fake_telegram = FakeBinance({}), FakeTelegram(send_latency=args.send_latency)
+    binance_url = await fake_binance.start()
+    telegram_url = await fake_telegram.start()
+
+    # config.py reads the environment at import time → set it before importing the bot
+    os.environ.update({
+        "BOT_TOKEN": "123456:LOADTEST",
+        "BINANCE_API_URL": binance_url,
+        "BINANCE_WS_URL": f"{binance_url}/ws",
+        "PRICE_PROVIDERS": "binance",  # no backup exchanges: every request stays on the fake server
+        "TELEGRAM_API_URL": telegram_url,
+        "PRICE_FEED": args.feed,
+        "CHECK_INTERVAL": str(args.check_interval),
+        "TELEGRAM_GLOBAL_RATE": str(args.telegram_rate),
+        "DB_PATH": os.path.join(args.workdir, "loadtest.db"),
+        "HISTORY_DIR": os.path.join(args.workdir, "history"),
+        "LOG_FILE": os.path.join(args.workdir, "logs", "loadtest.log"),  # never the repo's logs/
+        "PROFILE_DIR": os.path.join(args.workdir, "logs"),
+        "METRICS_PORT": "0",
+    })
+    modules = tuple(importlib.import_module(m) for m in
+                    ("bot", "database.alerts", "database.storage", "services.price_checker"))
+
+    # Keep the console readable; the file log still receives everything
+    for handler in logging.getLogger("Coin Tracker Bot").handlers:
+        if isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.FileHandler):
+            handler.setLevel(logging.WARNING)
+
+    results = []
+    try:
+        for spec in args.scenarios.split(","):
+            users, alerts = (int(x) for x in spec.lower().split("x"))
+            print(f"scenario: {users} users × {alerts} alerts …", file=sys.stderr)
+            results.append(await run_scenario(args, users, alerts, fake_binance, fake_telegram, modules))
+    finally:
+        await fake_binance.stop()
+        await fake_telegram.stop()
+
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "feed": args.feed,
+        "check_interval_s": args.check_interval,
+        "telegram_rate": args.telegram_rate,
+        "scenarios": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the bot against local fake Binance/Telegram servers")
+    parser.add_argument("--scenarios", default="100x1000,1000x10000,5000x100000",
+                        help="comma-separated USERSxALERTS list")
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--feed", choices=("poll", "stream"), default="poll")
+    parser.add_argument("--check-interval", type=int, default=1)
+    parser.add_argument("--telegram-rate", type=float, default=1000,
+                        help="global msg/s limit (real Telegram: 30)")
+    parser.add_argument("--send-latency", type=float, default=0.0, help="fake Telegram delay per message (s)")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds of idle cycles before moving prices")
+    parser.add_argument("--phase-timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        args.workdir = workdir
+        report = asyncio.run(run(args))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+# benchmarks/replay.py - Replay recorded Binance price series through the trigger engine on a virtual clock
+#
+# Feeds kline / aggTrade CSV dumps (https://data.binance.vision) through process_prices() — the code path
+# the price checker runs — as fast as the engine goes, with notifications captured instead of sent.
+# Reports alerts fired, detection delay against the true crossing time, and ticks processed per second.
+#
+#   python -m benchmarks.replay BTCUSDT-aggTrades-2024-03-01.csv --alerts 10000
+#   python -m benchmarks.replay BTCUSDT-1m-2024-03.csv ETHUSDT-1m-2024-03.csv --interval 15
+#   python -m benchmarks.replay --synthetic 1000000 --alerts 50000 --engine numpy   # + cross-check every tick
+
+import argparse
+import csv
+import heapq
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import accumulate, repeat
+from typing import Dict, List, Tuple
+from benchmarks.loadtest import percentiles
+
+SCHEMA_VERSION = 1
+QUOTE = "USDT"
+
+Series = Tuple[array, array]  # (unix times, prices), time-ordered
+
+
+# ---------- LOADING ----------
+def symbol_from_path(path: str) -> str:
+    """"BTC" for ".../BTCUSDT-aggTrades-2024-03-01.csv"."""
+    return os.path.basename(path).split("-")[0].split(".")[0].upper().removesuffix(QUOTE)
+
+
+def _seconds(value: str) -> float:
+    """Binance dumps use milliseconds (microseconds in newer spot files)."""
+    t = float(value)
+    if t > 1e14:
+        return t / 1e6
+    if t > 1e11:
+        return t / 1e3
+    return t
+
+
+def read_series(path: str) -> Series:
+    """
+    Load one CSV dump. Kline rows (12 columns) become four ticks per bar — open, then low
+    and high in the order the bar most likely took (down first for an up bar), then close —
+    since the path inside a bar isn't recorded. aggTrade rows (7–8 columns) are one tick each.
+    """
+    times, prices = array("d"), array("d")
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip().isdigit():
+                continue  # header line (newer dumps have one)
+            if len(row) >= 11:
+                start, end = _seconds(row[0]), _seconds(row[6])
+                o, h, l, c = (float(x) for x in row[1:5])
+                first, second = (l, h) if c >= o else (h, l)
+                step = (end - start) / 3
+                times.extend((start, start + step, start + 2 * step, end))
+                prices.extend((o, first, second, c))
+            elif len(row) >= 6:
+                times.append(_seconds(row[5]))
+                prices.append(float(row[1]))
+            else:
+                raise ValueError(f"{path}: unrecognized row {row!r} (expected kline or aggTrade columns)")
+
+    if any(times[i] > times[i + 1] for i in range(len(times) - 1)):
+        order = sorted(range(len(times)), key=times.__getitem__)
+        times, prices = array("d", (times[i] for i in order)), array("d", (prices[i] for i in order))
+    return times, prices
+
+
+def synthetic_series(symbols: int, ticks: int, seed: int = 1) -> Dict[str, Series]:
+    """Random-walk ticks (10 per second per symbol) when no dumps are at hand."""
+    rnd = random.Random(seed)
+    series = {}
+    per_symbol = max(2, ticks // symbols)
+    for s in range(symbols):
+        price = rnd.uniform(1, 1000)
+        times, prices = array("d"), array("d")
+        for i in range(per_symbol):
+            price *= 1 + rnd.gauss(0, 0.0005)
+            times.append(1_700_000_000 + i * 0.1)
+            prices.append(price)
+        series[f"SYM{s}"] = (times, prices)
+    return series
+
+
+# ---------- ALERTS ----------
+def make_alerts(series: Dict[str, Series], count: int, users: int, seed: int = 1) -> List[tuple]:
+    """
+    (chat_id, symbol, price, type) rows: up targets above and down targets below each
+    symbol's first price, spread over 120% of the range the series actually covers,
+    so most (not all) of them are crossed during the replay.
+    """
+    rnd = random.Random(seed)
+    symbols = list(series)
+    rows = []
+    for i in range(count):
+        symbol = symbols[i % len(symbols)]
+        _, prices = series[symbol]
+        first = prices[0]
+        if i % 2:
+            target = first + rnd.uniform(0, 1.2) * (max(prices) - first) or first * 1.001
+            rows.append((1_000_000 + rnd.randrange(users), symbol, target, "up"))
+        else:
+            target = first - rnd.uniform(0, 1.2) * (first - min(prices)) or first * 0.999
+            rows.append((1_000_000 + rnd.randrange(users), symbol, max(target, first * 0.01), "down"))
+    return rows
+
+
+# ---------- GROUND TRUTH ----------
+def true_crossings(series: Series, alerts: List[dict]) -> Dict[int, float]:
+    """
+    alert id → time of the first tick at or beyond its target, for every alert the series crosses.
+    Running max / min are monotonic, so each alert is one bisect.
+    """
+    times, prices = series
+    running_max = list(accumulate(prices, max))
+    running_min_neg = [-p for p in accumulate(prices, min)]  # nondecreasing → bisect-able
+
+    truth = {}
+    for alert in alerts:
+        if alert["type"] == "up":
+            i = bisect_left(running_max, alert["price"])
+        else:
+            i = bisect_left(running_min_neg, -alert["price"])
+        if i < len(times):
+            truth[alert["id"]] = times[i]
+    return truth
+
+
+# ---------- CAPTURE SINK ----------
+class VirtualClock:
+    now = 0.0
+
+
+class CaptureSink:
+    """Stands in for notify_triggered(): formats the messages as the notifier would and records when."""
+
+    def __init__(self, clock: VirtualClock):
+        self.clock = clock
+        self.fired_at: Dict[int, float] = {}
+        self.messages = 0
+
+    def __call__(self, fired: List[dict], prices: Dict[str, float]):
+        from services.notifier import _format_messages
+
+        per_chat = defaultdict(list)
+        for alert in fired:
+            self.fired_at[alert["id"]] = self.clock.now
+            per_chat[alert["chat_id"]].append(alert)
+        for chat_alerts in per_chat.values():
+            self.messages += len(_format_messages(chat_alerts, prices))
+
+
+# ---------- REPLAY ----------
+def replay(series: Dict[str, Series], interval: float, process_prices, sink: CaptureSink) -> dict:
+    """
+    Drive the engine through every tick in time order.
+    interval 0 → every tick is evaluated on its own (stream feed);
+    interval > 0 → the latest price of every symbol is evaluated once per interval (poll feed).
+    """
+    clock = sink.clock
+    merged = heapq.merge(*(zip(times, prices, repeat(symbol))
+                           for symbol, (times, prices) in series.items()))
+    ticks = evaluations = 0
+    started = time.perf_counter()
+
+    if interval <= 0:
+        for t, price, symbol in merged:
+            clock.now = t
+            process_prices({symbol: price}, t, sink)
+            ticks += 1
+        evaluations = ticks
+    else:
+        latest: Dict[str, float] = {}
+        next_poll = None
+        for t, price, symbol in merged:
+            if next_poll is None:
+                next_poll = t
+            while t >= next_poll:
+                if latest:
+                    clock.now = next_poll
+                    process_prices(dict(latest), next_poll, sink)
+                    evaluations += 1
+                next_poll += interval
+            latest[symbol] = price
+            ticks += 1
+        if latest:
+            clock.now = next_poll
+            process_prices(dict(latest), next_poll, sink)
+            evaluations += 1
+
+    elapsed = time.perf_counter() - started
+    return {"ticks": ticks, "evaluations": evaluations, "wall_s": round(elapsed, 3),
+            "ticks_per_sec": round(ticks / elapsed) if elapsed else None}
+
+
+def run(args) -> dict:
+    # config.py reads the environment at import time → set it before importing the engine
+    os.environ.setdefault("BOT_TOKEN", "123456:REPLAY")
+    os.environ.update({
+        "DB_PATH": os.path.join(args.workdir, "replay.db"),
+        "HISTORY_DIR": "",
+        "LOG_FILE": os.path.join(args.workdir, "logs", "replay.log"),  # never the repo's logs/
+        "PROFILE_DIR": os.path.join(args.workdir, "logs"),
+        "TRIGGER_ENGINE": args.engine,
+    })
+    from database import alerts as alert_db, storage
+    from services.price_checker import process_prices
+
+    if args.synthetic:
+        series = synthetic_series(args.symbols, args.synthetic)
+    else:
+        series = {}
+        for path in args.files:
+            symbol = symbol_from_path(path)
+            times, prices = read_series(path)
+            if symbol in series:
+                # Several dumps of one symbol (e.g. consecutive days) → one series
+                old_times, old_prices = series[symbol]
+                times, prices = old_times + times, old_prices + prices
+            series[symbol] = (times, prices)
+    series = {s: v for s, v in series.items() if len(v[0])}
+    if not series:
+        raise SystemExit("no ticks to replay")
+
+    # Register the alerts through the bulk path (one batched insert per chat)
+    alert_db.load_alerts()
+    per_chat = defaultdict(list)
+    for chat_id, symbol, price, alert_type in make_alerts(series, args.alerts, args.users):
+        per_chat[chat_id].append((symbol, price, alert_type, None))
+    for chat_id, rows in per_chat.items():
+        alert_db.add_alerts(chat_id, rows)
+
+    truth = {}
+    by_symbol = defaultdict(list)
+    for alert in alert_db.all_alerts():
+        by_symbol[alert["symbol"]].append(alert)
+    for symbol, symbol_alerts in by_symbol.items():
+        truth.update(true_crossings(series[symbol], symbol_alerts))
+
+    sink = CaptureSink(VirtualClock())
+    result = replay(series, args.interval, process_prices, sink)
+    storage.close_storage()
+
+    delays = [sink.fired_at[i] - truth[i] for i in sink.fired_at if i in truth]
+    first = min(times[0] for times, _ in series.values())
+    last = max(times[-1] for times, _ in series.values())
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "engine": "numpy" if alert_db.use_numpy else "index",
+        "interval_s": args.interval,
+        "symbols": len(series),
+        "virtual_span_s": round(last - first, 3),
+        "alerts": args.alerts,
+        **result,
+        "speedup_vs_real_time": round((last - first) / result["wall_s"]) if result["wall_s"] else None,
+        "alerts_fired": len(sink.fired_at),
+        "alerts_crossed": len(truth),
+        # Correctness: every crossed alert fires, never before its crossing, and nothing else fires
+        "missed": len(truth.keys() - sink.fired_at.keys()),
+        "fired_without_crossing": len(sink.fired_at.keys() - truth.keys()),
+        "fired_early": sum(1 for d in delays if d < 0),
+        "detection_delay_ms": percentiles(delays),
+        "messages": sink.messages,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay Binance kline / aggTrade CSV dumps through the alert engine")
+    parser.add_argument("files", nargs="*", help="CSV dumps named like BTCUSDT-aggTrades-….csv / BTCUSDT-1m-….csv")
+    parser.add_argument("--synthetic", type=int, default=0, help="replay this many random-walk ticks instead")
+    parser.add_argument("--symbols", type=int, default=10, help="symbols for --synthetic")
+    parser.add_argument("--alerts", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--interval", type=float, default=0,
+                        help="poll every N virtual seconds (0 = evaluate every tick, like the stream feed)")
+    parser.add_argument("--engine", choices=("index", "numpy"), default="index")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+    if not args.files and not args.synthetic:
+        parser.error("give CSV files or --synthetic N")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        args.workdir = workdir
+        report = run(args)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
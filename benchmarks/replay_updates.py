@@ -0,0 +1,100 @@
+# benchmarks/replay_updates.py - POST recorded (or synthetic) Telegram updates to a webhook
+#
+# Start the bot with UPDATE_MODE=webhook (and TELEGRAM_API_URL pointing at a fake server),
+# then replay updates against it:
+#
+#   python -m benchmarks.replay_updates --url http://127.0.0.1:8080/telegram/webhook --file updates.jsonl
+#   python -m benchmarks.replay_updates --url ... --synthetic 5000 --concurrency 200 --secret s3cret
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+import aiohttp
+from benchmarks.loadtest import percentiles
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+COMMANDS = ["/price BTC", "/price ETH", "/list", "/help", "/up BTC 1000000", "/down ETH 1", "/price BTCC"]
+
+
+# ---------- UPDATES ----------
+def load_updates(path: str) -> list:
+    """One Update JSON object per line (as received from Telegram)."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthetic_updates(count: int, users: int = 100, seed: int = 1) -> list:
+    """Private-chat command messages from `users` different users."""
+    rnd = random.Random(seed)
+    now = int(time.time())
+    updates = []
+
+    for i in range(count):
+        user_id = 1000 + rnd.randrange(users)
+        text = rnd.choice(COMMANDS)
+        updates.append({
+            "update_id": i + 1,
+            "message": {
+                "message_id": i + 1,
+                "date": now,
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"},
+                "text": text,
+                "entities": [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}],
+            },
+        })
+
+    return updates
+
+
+# ---------- REPLAY ----------
+async def replay(url: str, updates: list, concurrency: int = 50, secret: str | None = None) -> dict:
+    """POST every update with at most `concurrency` requests in flight; report statuses and latency."""
+    headers = {SECRET_HEADER: secret} if secret else {}
+    statuses, latencies = Counter(), []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with aiohttp.ClientSession(headers=headers) as session:
+
+        async def post(update: dict):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    async with session.post(url, json=update) as resp:
+                        statuses[resp.status] += 1
+                except aiohttp.ClientError:
+                    statuses["error"] += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(post(u) for u in updates))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "updates": len(updates),
+        "statuses": {str(k): v for k, v in statuses.items()},
+        "elapsed_s": round(elapsed, 3),
+        "updates_per_sec": round(len(updates) / elapsed, 1) if elapsed else None,
+        "latency_ms": percentiles(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", required=True, help="webhook URL, e.g. http://127.0.0.1:8080/telegram/webhook")
+    parser.add_argument("--file", help="JSONL file of recorded updates")
+    parser.add_argument("--synthetic", type=int, default=0, help="generate this many command updates instead")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--secret", help="value for the secret-token header")
+    args = parser.parse_args()
+
+    updates = load_updates(args.file) if args.file else synthetic_updates(args.synthetic or 1000)
+    report = asyncio.run(replay(args.url, updates, args.concurrency, args.secret))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
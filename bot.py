@@ -1,19 +1,37 @@
-# bot.py - Initialize the bot, setup handlers, and start polling safely
+# bot.py - Initialize the bot, setup handlers, and start polling (or the webhook) safely
 
 import asyncio
 import logging
-from aiogram import Dispatcher
+import signal
+import sys
+from aiogram import Dispatcher, F
 from aiogram.filters import Command
-from aiogram import Bot, exceptions
-from config import BOT_TOKEN
-from services.price_checker import price_checker
+from aiogram import exceptions
+from services.session import create_bot
+from services.price_checker import price_checker, process_prices
+from services.sharding import ShardManager
+from services.symbols import refresh_catalog, catalog_refresher
+from services.webhook import run_webhook
+from services import watchdog
+from database.alerts import load_alerts
+from database.history import history_writer
+from services.notifier import start_notifier
 from utils.logger import log
+from config import SHARDS, UPDATE_MODE, USE_UVLOOP
 
 # Import handlers
 from handlers.start import start_handler
 from handlers.price import price_handler
-from handlers.alerts import up_handler, down_handler, list_handler, clear_handler
+from handlers.alerts import (
+    up_handler, down_handler, move_handler, trail_handler, list_handler, clear_handler,
+    list_callback, delete_callback,
+)
+from handlers.bulk import import_handler, export_handler
 from handlers.help import help_handler
+from handlers.stats import stats_handler
+from handlers.profile import profile_handler
+from handlers.middlewares import MetricsMiddleware, FloodControlMiddleware
+from services.metrics_server import start_metrics_server
 
 from services.shutdown import graceful_shutdown
 
@@ -46,10 +64,11 @@ async def main():
     """
     Set up the Telegram bot lifecycle: initialize bot/configs,
     register handlers and middlewares,
-    and start long-polling to process incoming updates.
+    and start receiving updates (long polling or webhook).
     """
     
-    bot = Bot(token=BOT_TOKEN)
+    # Optional custom Bot API server (self-hosted or a local stand-in), see config.py
+    bot = create_bot()
     dp = Dispatcher()
 
     # Register handlers
@@ -57,22 +76,73 @@ async def main():
     dp.message.register(price_handler, Command("price"))
     dp.message.register(up_handler, Command("up"))
     dp.message.register(down_handler, Command("down"))
+    dp.message.register(move_handler, Command("move"))
+    dp.message.register(trail_handler, Command("trail"))
     dp.message.register(list_handler, Command("list"))
     dp.message.register(clear_handler, Command("clear"))
+    dp.message.register(import_handler, Command("import"))
+    dp.message.register(export_handler, Command("export"))
     dp.message.register(help_handler, Command("help"))
-
-    # Start background price checker
-    task_checker = asyncio.create_task(price_checker(bot))
+    dp.message.register(stats_handler, Command("stats"))
+    dp.message.register(profile_handler, Command("profile"))
+
+    # /list page navigation and per-alert delete buttons
+    dp.callback_query.register(list_callback, F.data.startswith("l:"))
+    dp.callback_query.register(delete_callback, F.data.startswith("x:"))
+
+    # Register middlewares (outermost first): timing, then per-chat flood control
+    dp.message.middleware(MetricsMiddleware())
+    dp.message.middleware(FloodControlMiddleware())
+
+    # Restore persisted alerts before anything can trigger
+    load_alerts()
+
+    # Watch event-loop lag; the sampling profiler attributes hot stacks to the checker / each handler
+    task_watchdog = await watchdog.start_watchdog()
+    watchdog.sampler.track("price_checker", price_checker)
+    watchdog.sampler.track("price_checker: triggers", process_prices)
+    for handler in dp.message.handlers + dp.callback_query.handlers:
+        watchdog.sampler.track(handler.callback.__name__, handler.callback)
+    if hasattr(signal, "SIGUSR1"):
+        # `kill -USR1 <pid>` toggles the profiler too (report goes to the log)
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, watchdog.toggle_profiling)
+
+    # Load the symbol catalog so handlers can reject typos without asking Binance
+    await refresh_catalog()
+    task_catalog = asyncio.create_task(catalog_refresher())
+    task_catalog.add_done_callback(handle_task_exception)
+
+    # Append finished 1m / 1h price bars to the local history (read by /price)
+    task_history = asyncio.create_task(history_writer())
+    task_history.add_done_callback(handle_task_exception)
+
+    # Expose Prometheus metrics
+    await start_metrics_server()
+
+    # Start notification senders (rate-limited, independent of price checking)
+    start_notifier(bot)
+
+    # Start background price checking: in-process, or fetcher + shard processes
+    if SHARDS > 0:
+        shard_manager = ShardManager(SHARDS)
+        await shard_manager.start()
+        task_checker = asyncio.create_task(shard_manager.run())
+    else:
+        task_checker = asyncio.create_task(price_checker(bot))
     task_checker.add_done_callback(handle_task_exception)
 
-    # Wrap polling in a task so we can handle exceptions cleanly
-    polling_task = asyncio.create_task(dp.start_polling(bot))
+    # Receive updates (long polling or webhook) in a task so we can handle exceptions cleanly
+    if UPDATE_MODE == "webhook":
+        polling_task = asyncio.create_task(run_webhook(bot, dp))
+    else:
+        polling_task = asyncio.create_task(dp.start_polling(bot))
     polling_task.add_done_callback(handle_task_exception)
 
 
     try:
         # Wait for the polling task to run normally.
-        await polling_task
+        # Shielded: if main() is cancelled, polling is stopped cleanly in graceful_shutdown
+        await asyncio.shield(polling_task)
 
     except exceptions.TelegramNetworkError as e:
         # Handle Telegram network-related issues (timeouts, disconnects, DNS failures).
@@ -89,10 +159,25 @@ async def main():
     finally:
         # Start the cleanup sequence and terminate background tasks.
         log.info("Stopping background tasks...")
-        await graceful_shutdown(bot, task_checker, polling_task)
+        await graceful_shutdown(bot, task_checker, polling_task, dp, background=[task_catalog, task_history, task_watchdog])
+
+
+# ---------- OPTIONAL UVLOOP ----------
+def install_uvloop():
+    """Use uvloop's faster event loop when requested (USE_UVLOOP=1 or --uvloop) and installed."""
+    try:
+        import uvloop
+    except ImportError:
+        log.warning("uvloop requested but not installed (pip install uvloop) — using asyncio's loop")
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    log.info("Using uvloop event loop")
 
 
 if __name__ == "__main__":
+    if USE_UVLOOP or "--uvloop" in sys.argv:
+        install_uvloop()
+
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -9,4 +9,110 @@ BOT_TOKEN = os.getenv("BOT_TOKEN")
 if not BOT_TOKEN:
     raise ValueError("BOT_TOKEN not found in .env file!")
 
-CHECK_INTERVAL = 15  # seconds
\ No newline at end of file
+CHECK_INTERVAL = int(os.getenv("CHECK_INTERVAL", 15))  # seconds
+
+# ---------- ENDPOINTS ----------
+# Overridable so the bot can run against local stand-ins (see benchmarks/loadtest.py)
+BINANCE_API_URL = os.getenv("BINANCE_API_URL", "https://api.binance.com")
+# REST hosts rotated on failure; defaults to Binance's mirrors for the official URL, else BINANCE_API_URL only
+BINANCE_API_HOSTS = [h.strip().rstrip("/") for h in os.getenv("BINANCE_API_HOSTS", "").split(",") if h.strip()] or (
+    [BINANCE_API_URL] + [f"https://api{i}.binance.com" for i in range(1, 5)]
+    if BINANCE_API_URL == "https://api.binance.com" else [BINANCE_API_URL]
+)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL")  # None → official api.telegram.org
+OKX_API_URL = os.getenv("OKX_API_URL", "https://www.okx.com")
+BYBIT_API_URL = os.getenv("BYBIT_API_URL", "https://api.bybit.com")
+
+# ---------- HTTP CLIENT ----------
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", 100))          # open connections, all hosts
+HTTP_POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", 20))     # open connections to one host
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 10))               # seconds per request attempt
+BINANCE_MAX_RETRIES = int(os.getenv("BINANCE_MAX_RETRIES", 2))    # extra attempts on 5xx / network errors
+BINANCE_WEIGHT_LIMIT = int(os.getenv("BINANCE_WEIGHT_LIMIT", 6000))  # request weight per minute per IP
+# Quotes tried in order for coins without a trading USDT pair (priced in USDT via stablecoin parity / BTCUSDT)
+BINANCE_QUOTE_FALLBACKS = [q.strip().upper() for q in os.getenv("BINANCE_QUOTE_FALLBACKS", "USDC,FDUSD,BTC").split(",")
+                           if q.strip()]
+
+# ---------- PRICE PROVIDERS ----------
+# Exchanges asked for live prices, in order of preference (services/providers.py); e.g. "binance,okx,bybit"
+# adds OKX and Bybit as backups (opt-in: their tickers can differ from Binance's coins)
+PRICE_PROVIDERS = [p.strip().lower() for p in os.getenv("PRICE_PROVIDERS", "binance").split(",")
+                   if p.strip()]
+PROVIDER_HEDGE_DELAY = float(os.getenv("PROVIDER_HEDGE_DELAY", 0.5))  # max seconds before the next provider joins
+PROVIDER_HEDGE_MIN = float(os.getenv("PROVIDER_HEDGE_MIN", 0.05))     # min seconds (usual budget: 3× typical latency)
+PROVIDER_MAX_DEVIATION = float(os.getenv("PROVIDER_MAX_DEVIATION", 10))  # % off the first provider's price → rejected
+
+# ---------- RECEIVING UPDATES ----------
+# "polling" → long polling (getUpdates); "webhook" → Telegram POSTs updates to our HTTP server
+UPDATE_MODE = os.getenv("UPDATE_MODE", "polling")
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")            # public https base URL; unset → webhook isn't registered
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram/webhook")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", 8080))
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")      # checked against X-Telegram-Bot-Api-Secret-Token
+WEBHOOK_CONCURRENCY = int(os.getenv("WEBHOOK_CONCURRENCY", 16))    # updates handled at the same time
+WEBHOOK_MAX_PENDING = int(os.getenv("WEBHOOK_MAX_PENDING", 1000))  # queued updates before answering 503
+
+# ---------- SYMBOL CATALOG ----------
+SYMBOL_REFRESH_INTERVAL = int(os.getenv("SYMBOL_REFRESH_INTERVAL", 3600))  # seconds between exchangeInfo reloads
+
+# ---------- PRICE FEED ----------
+# "poll"   → bulk REST snapshot every CHECK_INTERVAL seconds
+# "stream" → Binance WebSocket, falls back to polling when the stream keeps failing
+PRICE_FEED = os.getenv("PRICE_FEED", "poll")
+BINANCE_WS_URL = os.getenv("BINANCE_WS_URL", "wss://stream.binance.com:9443/ws")
+BINANCE_WS_STREAM = os.getenv("BINANCE_WS_STREAM", "miniTicker")
+STREAM_FALLBACK_PERIOD = 300  # seconds of REST polling before retrying the stream
+
+# Adaptive polling: symbols near a threshold (or volatile) are polled more often
+POLL_MIN_INTERVAL = float(os.getenv("POLL_MIN_INTERVAL", 1))                   # seconds
+POLL_MAX_INTERVAL = float(os.getenv("POLL_MAX_INTERVAL", CHECK_INTERVAL * 2))  # seconds
+POLL_NEAR_PCT = float(os.getenv("POLL_NEAR_PCT", 1.0))  # within this % of a threshold → min interval
+
+# ---------- TRIGGER EVALUATION ----------
+TRIGGER_ENGINE = os.getenv("TRIGGER_ENGINE", "index")  # "numpy" cross-checks the index with a full scan (diagnostic, slower)
+
+# Sharded mode: N>0 runs one price-fetcher process plus N alert-shard processes (see services/sharding.py)
+SHARDS = int(os.getenv("SHARDS", 0))
+
+# ---------- STORAGE ----------
+DB_PATH = os.getenv("DB_PATH", "data/alerts.db")
+
+# ---------- FLOOD CONTROL ----------
+FLOOD_RATE = float(os.getenv("FLOOD_RATE", 0.5))   # commands per second one chat may sustain…
+FLOOD_BURST = float(os.getenv("FLOOD_BURST", 5))   # …after a burst of this many
+IO_CONCURRENCY = int(os.getenv("IO_CONCURRENCY", 32))        # handlers calling Binance at the same time, all chats
+IO_WAIT_TIMEOUT = float(os.getenv("IO_WAIT_TIMEOUT", 5))     # seconds to wait for a free slot before "busy"
+
+# ---------- PRICE HISTORY ----------
+HISTORY_DIR = os.getenv("HISTORY_DIR", "data/history")  # one binary file per symbol and resolution; "" disables
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", 10))  # seconds between appends
+HISTORY_1M_DAYS = int(os.getenv("HISTORY_1M_DAYS", 7))  # 1m bars kept (1h bars are kept for good)
+
+# ---------- NOTIFICATIONS ----------
+NOTIFY_WORKERS = 8            # concurrent sender tasks
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", 30))  # messages per second, all chats together
+TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", 1))       # messages per second to one chat
+
+# ---------- PRICE CACHE ----------
+PRICE_CACHE_TTL = float(os.getenv("PRICE_CACHE_TTL", CHECK_INTERVAL + 5))  # seconds
+
+# ---------- LOGGING ----------
+LOG_FILE = os.getenv("LOG_FILE", "logs/crypto_alert_bot.log")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")            # "text" or "json" (one object per line)
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 2**20))  # rotate the file at this size…
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "")      # …or by time instead, e.g. "midnight", "H"
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", 5))          # rotated files kept
+
+# ---------- EVENT LOOP HEALTH ----------
+USE_UVLOOP = os.getenv("USE_UVLOOP", "0") == "1"             # or `python bot.py --uvloop` (needs uvloop installed)
+LOOP_LAG_INTERVAL = 0.5                                       # seconds between event-loop lag probes
+LOOP_LAG_WARN = float(os.getenv("LOOP_LAG_WARN", 0.5))        # log a warning when lag reaches this (seconds)
+LOOP_BLOCK_DUMP = float(os.getenv("LOOP_BLOCK_DUMP", 2))      # loop stuck this long → log its stack (0 = off)
+SLOW_CALLBACK_SECONDS = float(os.getenv("SLOW_CALLBACK_SECONDS", 0))  # >0 → asyncio debug slow-callback log
+PROFILE_DIR = os.getenv("PROFILE_DIR", "logs")                # where /profile writes folded stacks
+
+# ---------- METRICS & ADMIN ----------
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9108))  # 0 disables the /metrics endpoint
+ADMIN_IDS = {int(i) for i in os.getenv("ADMIN_IDS", "").replace(" ", "").split(",") if i}  # may use /stats, /profile
@@ -0,0 +1,128 @@
+# database/alert_index.py - Per-symbol sorted threshold index
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Tuple
+
+
+class ThresholdIndex:
+    """
+    Keep alert slots grouped by symbol with their thresholds sorted so a new
+    price only touches the alerts that actually crossed.
+
+    "up" alerts are kept ascending by price  → fired alerts are a prefix (price <= current).
+    "down" alerts are kept descending by price (stored negated, ascending)
+    → fired alerts are also a prefix (price >= current).
+    A check therefore costs O(log n + k) for k fired alerts.
+
+    Keys and slots live in typed arrays (float64 / int64), not lists of objects.
+    """
+
+    def __init__(self):
+        # symbol → {"up": (keys, slots), "down": (keys, slots)}
+        self._books: Dict[str, Dict[str, Tuple[array, array]]] = {}
+
+    # ---------- KEY HELPERS ----------
+    @staticmethod
+    def _key(alert_type: str, price: float) -> float:
+        return price if alert_type == "up" else -price
+
+    def _side(self, symbol: str, alert_type: str, create: bool = False):
+        book = self._books.get(symbol)
+        if book is None:
+            if not create:
+                return None
+            book = self._books[symbol] = {"up": (array("d"), array("q")), "down": (array("d"), array("q"))}
+        return book[alert_type]
+
+    # ---------- ADD ----------
+    def add(self, symbol: str, alert_type: str, price: float, slot: int):
+        """Insert an alert slot keeping its side of the book sorted."""
+        keys, slots = self._side(symbol, alert_type, create=True)
+        key = self._key(alert_type, price)
+
+        # Insert after equal keys so alerts with the same price stay in creation order
+        pos = bisect_right(keys, key)
+        keys.insert(pos, key)
+        slots.insert(pos, slot)
+
+    # ---------- BULK LOAD ----------
+    def rebuild(self, entries: Iterable[Tuple[str, str, float, int]]):
+        """Replace the index contents from (symbol, type, price, slot) tuples with one sort per side."""
+        grouped: Dict[Tuple[str, str], List[Tuple[float, int]]] = {}
+        for symbol, alert_type, price, slot in entries:
+            grouped.setdefault((symbol, alert_type), []).append((self._key(alert_type, price), slot))
+
+        self._books.clear()
+        for (symbol, alert_type), pairs in grouped.items():
+            # sort() is stable, so equal thresholds keep their load order
+            pairs.sort(key=lambda p: p[0])
+            keys, slots = self._side(symbol, alert_type, create=True)
+            keys.extend(k for k, _ in pairs)
+            slots.extend(s for _, s in pairs)
+
+    # ---------- REMOVE ----------
+    def remove(self, symbol: str, alert_type: str, price: float, slot: int) -> bool:
+        """Remove one specific alert slot. Returns False if it is not indexed."""
+        side = self._side(symbol, alert_type)
+        if side is None:
+            return False
+
+        keys, slots = side
+        key = self._key(alert_type, price)
+
+        # Only scan the run of equal thresholds
+        i = bisect_left(keys, key)
+        while i < len(keys) and keys[i] == key:
+            if slots[i] == slot:
+                del keys[i]
+                del slots[i]
+                self._drop_if_empty(symbol)
+                return True
+            i += 1
+
+        return False
+
+    # ---------- POP TRIGGERED ----------
+    def pop_triggered(self, symbol: str, price: float) -> List[int]:
+        """Remove and return the slots of every alert on this symbol crossed by the given price."""
+        book = self._books.get(symbol)
+        if book is None:
+            return []
+
+        fired = []
+        for alert_type in ("up", "down"):
+            keys, slots = book[alert_type]
+            n = bisect_right(keys, self._key(alert_type, price))
+            if n:
+                fired.extend(slots[:n])
+                del keys[:n]
+                del slots[:n]
+
+        if fired:
+            self._drop_if_empty(symbol)
+        return fired
+
+    # ---------- INTROSPECTION ----------
+    def symbols(self) -> List[str]:
+        """Symbols that currently have at least one pending alert."""
+        return list(self._books)
+
+    def nearest(self, symbol: str) -> Tuple[float | None, float | None]:
+        """Return (lowest pending up threshold, highest pending down threshold)."""
+        book = self._books.get(symbol)
+        if book is None:
+            return None, None
+
+        up_keys = book["up"][0]
+        down_keys = book["down"][0]
+        return (up_keys[0] if up_keys else None,
+                -down_keys[0] if down_keys else None)
+
+    def __len__(self) -> int:
+        return sum(len(b["up"][0]) + len(b["down"][0]) for b in self._books.values())
+
+    def _drop_if_empty(self, symbol: str):
+        book = self._books[symbol]
+        if not book["up"][0] and not book["down"][0]:
+            del self._books[symbol]
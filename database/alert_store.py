@@ -0,0 +1,136 @@
+# database/alert_store.py - Compact columnar alert storage
+
+from array import array
+from typing import Dict, Iterator, List
+
+UP, DOWN, FREE = 0, 1, 255  # packed direction byte (FREE marks a reusable slot)
+MOVE, MOVE_UP, MOVE_DOWN, TRAIL = 2, 3, 4, 5  # rolling alerts, see database/rolling.py
+DIRECTIONS = {"up": UP, "down": DOWN, "move": MOVE, "move_up": MOVE_UP, "move_down": MOVE_DOWN, "trail": TRAIL}
+DIRECTION_NAMES = {code: name for name, code in DIRECTIONS.items()}
+ROLLING_TYPES = {"move", "move_up", "move_down", "trail"}  # "price" holds a percentage for these
+
+
+class AlertStore:
+    """
+    Keep alerts as parallel typed arrays instead of one dict per alert.
+
+    A slot (row number) identifies an alert in memory:
+    - ids        int64   stable alert id (also the SQLite primary key)
+    - chat_ids   int64
+    - prices     float64 threshold (percentage for move / trailing alerts)
+    - symbol_ids int32   index into the interned `symbols` table
+    - directions uint8   alert type code (UP / DOWN / MOVE… / TRAIL) or FREE
+
+    Move alerts keep their window (seconds) and trailing alerts their peak at creation
+    in the `params` side table, so plain up/down alerts pay nothing for them.
+
+    Deleted slots go on a free list and are reused by the next add,
+    so the arrays never need compaction.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Drop every alert and the symbol table."""
+        self.ids = array("q")
+        self.chat_ids = array("q")
+        self.prices = array("d")
+        self.symbol_ids = array("i")
+        self.directions = bytearray()
+        self.params: Dict[int, float] = {}     # slot → window / peak, rolling alerts only
+
+        self.symbols: List[str] = []           # symbol id → symbol
+        self._symbol_ids: Dict[str, int] = {}  # symbol → symbol id
+        self._free: List[int] = []
+        self._count = 0
+
+    # ---------- SYMBOL INTERNING ----------
+    def intern(self, symbol: str) -> int:
+        """Return the id of a symbol, assigning a new one on first use."""
+        sid = self._symbol_ids.get(symbol)
+        if sid is None:
+            sid = self._symbol_ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return sid
+
+    def symbol_id(self, symbol: str) -> int | None:
+        """The id of a symbol already in the table (None if no alert ever used it)."""
+        return self._symbol_ids.get(symbol)
+
+    # ---------- ADD ----------
+    def add(self, alert_id: int, chat_id: int, symbol: str, price: float, alert_type: str,
+            param: float | None = None) -> int:
+        """Store an alert and return its slot."""
+        sid = self.intern(symbol)
+        direction = DIRECTIONS[alert_type]
+
+        if self._free:
+            slot = self._free.pop()
+            self.ids[slot] = alert_id
+            self.chat_ids[slot] = chat_id
+            self.prices[slot] = price
+            self.symbol_ids[slot] = sid
+            self.directions[slot] = direction
+        else:
+            slot = len(self.ids)
+            self.ids.append(alert_id)
+            self.chat_ids.append(chat_id)
+            self.prices.append(price)
+            self.symbol_ids.append(sid)
+            self.directions.append(direction)
+
+        if param is not None:
+            self.params[slot] = param
+
+        self._count += 1
+        return slot
+
+    # ---------- REMOVE ----------
+    def remove(self, slot: int):
+        """Free a slot for reuse."""
+        if self.directions[slot] == FREE:
+            return
+        self.directions[slot] = FREE
+        self.params.pop(slot, None)
+        self._free.append(slot)
+        self._count -= 1
+
+    # ---------- READ ----------
+    def is_live(self, slot: int, alert_id: int) -> bool:
+        """True if the slot still holds this alert (slots are reused after delete)."""
+        return 0 <= slot < len(self.ids) and self.directions[slot] != FREE and self.ids[slot] == alert_id
+
+    def get(self, slot: int) -> dict:
+        """Materialize one alert as the dict shape handlers and the notifier use."""
+        alert = {
+            "id": self.ids[slot],
+            "slot": slot,
+            "chat_id": self.chat_ids[slot],
+            "symbol": self.symbols[self.symbol_ids[slot]],
+            "price": self.prices[slot],
+            "type": DIRECTION_NAMES[self.directions[slot]],
+        }
+        param = self.params.get(slot)
+        if param is not None:
+            alert["param"] = param
+        return alert
+
+    def slots(self) -> Iterator[int]:
+        """Iterate over every live slot."""
+        return (slot for slot, d in enumerate(self.directions) if d != FREE)
+
+    def symbol_of(self, slot: int) -> str:
+        return self.symbols[self.symbol_ids[slot]]
+
+    def type_of(self, slot: int) -> str:
+        return DIRECTION_NAMES[self.directions[slot]]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the column buffers."""
+        return (self.ids.itemsize * len(self.ids) + self.chat_ids.itemsize * len(self.chat_ids)
+                + self.prices.itemsize * len(self.prices) + self.symbol_ids.itemsize * len(self.symbol_ids)
+                + len(self.directions))
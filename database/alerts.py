@@ -1,40 +1,304 @@
 # database/alerts.py
 
-from typing import List, Dict
+import time
+from collections import Counter
+from typing import Callable, List, Dict, Tuple
+from database.alert_index import ThresholdIndex
+from database.alert_store import AlertStore, ROLLING_TYPES
+from database.rolling import RollingAlerts
+from database.user_index import UserAlerts
+from database import storage, vector_engine
 from utils.logger import log
+from utils.metrics import ALERTS_EVALUATED, ALERTS_TRIGGERED
+from config import TRIGGER_ENGINE
 
-alerts: List[Dict[str, object]] = []  # each dict: {"chat_id": int, "symbol": str, "price": float, "type": str}
-inactive_users = set()  # Users who cleared all their alerts
+store = AlertStore()      # columnar arrays: one row (slot) per alert, see alert_store.py
+index = ThresholdIndex()  # symbol → sorted up/down thresholds (slots), used by the price checker
+rolling = RollingAlerts() # move / trailing alerts over rolling per-symbol price windows
+user_slots: Dict[int, UserAlerts] = {}       # chat_id → the user's slots in id order (pages for /list)
+symbol_refs: Dict[str, int] = {}             # symbol → number of pending alerts (the watched set)
+_next_id = 1  # ids are assigned in memory so adding an alert never waits on the database
+
+# The sorted per-symbol thresholds (O(log n + k)) always decide what fires. "numpy" additionally
+# re-derives the fired set with one vectorized pass over all alerts and logs any disagreement:
+# a diagnostic cross-check that adds an O(N) scan per tick, not an optimisation.
+use_numpy = TRIGGER_ENGINE == "numpy" and vector_engine.available()
+if TRIGGER_ENGINE == "numpy" and not use_numpy:
+    log.warning("TRIGGER_ENGINE=numpy but NumPy is not installed — skipping the cross-check")
+
+# Called as listener(event, alert) with event "add" / "remove" (user actions only, not triggers)
+_listeners: List[Callable[[str, dict], None]] = []
+
+# Alerts handed out by this module are plain dicts:
+# {"id": int, "slot": int, "chat_id": int, "symbol": str, "price": float, "type": str}
+# Move alerts add "param" (window seconds) and trailing alerts "param" (peak at creation);
+# for both, "price" is the percentage. Fired rolling alerts also carry "ref" (window low/high or peak).
+
+
+# ---------- LOAD ALERTS AT STARTUP ----------
+def load_alerts():
+    """Open the SQLite store and rebuild the in-memory working set from it."""
+    global _next_id
+
+    rows, last_id = storage.init_storage()
+
+    store.clear()
+    rolling.clear()
+    user_slots.clear()
+    symbol_refs.clear()
+    entries = []
+    for alert_id, chat_id, symbol, price, alert_type, param in rows:
+        slot = store.add(alert_id, chat_id, symbol, price, alert_type, param)
+        _track(slot, chat_id, symbol)
+        if alert_type in ROLLING_TYPES:
+            rolling.add(slot, alert_id, symbol, alert_type, price, param)
+        else:
+            entries.append((symbol, alert_type, price, slot))
+    index.rebuild(entries)
+
+    _next_id = last_id + 1
 
 
 # ---------- ADD NEW ALERT ----------
-def add_alert(chat_id: int, symbol: str, price: float, alert_type: str):
-    """Register a new price alert for the user."""
-    global alerts, inactive_users
-    
-    # Add a new alert entry to the in-memory alerts list
-    alerts.append({
-        "chat_id": chat_id,
-        "symbol": symbol,
-        "price": price,
-        "type": alert_type
-    })
-    
-    # Activate user if they were previously inactive
-    inactive_users.discard(chat_id)
+def add_alert(chat_id: int, symbol: str, price: float, alert_type: str, param: float | None = None):
+    """
+    Register a new price alert for the user.
+    Move / trailing alerts pass a percentage as `price` and the window (seconds) / current peak as `param`.
+    """
+    alert = _insert(chat_id, symbol, price, alert_type, param)
+
+    # Persist in the background (batched with other writes)
+    storage.save_alert(alert)
+    _emit("add", alert)
     
     # Log successful creation of the alert for this user
-    log.info(f"Alert added: User {chat_id} → {symbol} {alert_type.upper()} at {price:,.2f} USD")
+    if alert_type in ROLLING_TYPES:
+        log.info(f"Alert added: User {chat_id} → {symbol} {alert_type.upper()} {price:g}%")
+    else:
+        log.info(f"Alert added: User {chat_id} → {symbol} {alert_type.upper()} at {price:,.2f} USD")
+
+
+# ---------- ADD MANY ALERTS (IMPORT) ----------
+def add_alerts(chat_id: int, rows: List[tuple]) -> List[dict]:
+    """
+    Register many already-validated alerts for one user at once,
+    given as (symbol, price, type, param) rows. One queued insert, one log line.
+    """
+    added = [_insert(chat_id, symbol, price, alert_type, param) for symbol, price, alert_type, param in rows]
+
+    storage.save_alerts(added)
+    for alert in added:
+        _emit("add", alert)
+
+    if added:
+        log.info(f"Alerts imported: User {chat_id} → {len(added)} alerts",
+                 extra={"event": "alerts_imported", "count": len(added)})
+    return added
+
+
+def _insert(chat_id: int, symbol: str, price: float, alert_type: str, param: float | None) -> dict:
+    """Add one alert to the column store, its trigger structure and the per-user index."""
+    global _next_id
+
+    slot = store.add(_next_id, chat_id, symbol, price, alert_type, param)
+    if alert_type in ROLLING_TYPES:
+        rolling.add(slot, _next_id, symbol, alert_type, price, param)
+    else:
+        index.add(symbol, alert_type, price, slot)
+    _track(slot, chat_id, symbol)
+    _next_id += 1
+    return store.get(slot)
 
 
 # ---------- REMOVE ALERT ----------
 def remove_alert(alert_item: dict):
     """Remove a specific alert from memory."""
+    slot = alert_item["slot"]
+
+    # The slot may have been reused since this dict was handed out
+    if not store.is_live(slot, alert_item["id"]):
+        return
+
+    # Delete the alert from the trigger index and free its row
+    _unindex(alert_item)
+    _free(slot)
+    storage.delete_alerts([alert_item["id"]])
+    _emit("remove", alert_item)
+
+    _log_removed(alert_item)
+
+
+# ---------- REMOVE ALERTS FIRED ELSEWHERE ----------
+def remove_fired(fired: List[tuple]):
+    """
+    Drop alerts that were triggered (and notified) by another process,
+    given as (alert id, slot) pairs. Stale pairs are ignored.
+    """
+    removed = []
+    for alert_id, slot in fired:
+        if store.is_live(slot, alert_id):
+            _unindex(store.get(slot))
+            _free(slot)
+            removed.append(alert_id)
+
+    # One queued delete → one transaction
+    storage.delete_alerts(removed)
+    if removed:
+        log.info(f"{len(removed):,} alerts removed after triggering in a shard",
+                 extra={"event": "alerts_removed", "count": len(removed)})
+    return len(removed)
+
+
+# ---------- POP TRIGGERED ALERTS ----------
+def pop_triggered(prices: Dict[str, float], now: float | None = None) -> List[dict]:
+    """
+    Remove and return every alert crossed by the given {symbol: price} snapshot.
+    Only the alerts that fired are touched in the index.
+    `now` is the snapshot's time for rolling windows (a replay passes its virtual clock).
+    """
+    # Walk whichever side is smaller: a streamed update usually carries one symbol
+    if len(prices) < len(symbol_refs):
+        candidates = [(s, p) for s, p in prices.items() if s in symbol_refs]
+    else:
+        candidates = [(s, prices[s]) for s in symbol_refs if s in prices]
+
+    ALERTS_EVALUATED.inc(sum(symbol_refs[s] for s, _ in candidates))
+
+    # Scanned before the index pops anything (freed slots no longer match)
+    expected = set(vector_engine.fired_slots(store, dict(candidates))) if use_numpy else None
+
+    fired = []
+    for symbol, price in candidates:
+        for slot in index.pop_triggered(symbol, price):
+            fired.append(store.get(slot))
+            _free(slot)
+
+    if expected is not None:
+        _cross_check({a["slot"] for a in fired}, expected)
+
+    # Move / trailing alerts: every tick also feeds the symbol's rolling window
+    if len(rolling):
+        now = time.time() if now is None else now
+        for symbol, price in candidates:
+            for slot, ref in rolling.update(symbol, price, now):
+                alert = store.get(slot)
+                alert["ref"] = ref
+                fired.append(alert)
+                _free(slot)
+
+    if fired:
+        ALERTS_TRIGGERED.inc(len(fired))
+
+        # One queued delete → one transaction, however many alerts fired
+        storage.delete_alerts([a["id"] for a in fired])
+        _log_fired(fired, prices)
+
+    return fired
+
+
+def _cross_check(indexed: set, scanned: set):
+    """TRIGGER_ENGINE=numpy: the index and the full scan must fire exactly the same alerts."""
+    if indexed != scanned:
+        log.error(f"Trigger cross-check failed: index fired {len(indexed):,}, vector scan {len(scanned):,} "
+                  f"(index only: {sorted(indexed - scanned)[:5]}, scan only: {sorted(scanned - indexed)[:5]})")
+
 
-    # Delete the alert item from the in-memory list
-    alerts.remove(alert_item)
+# ---------- WATCHED SYMBOLS ----------
+def watched_symbols() -> List[str]:
+    """Symbols that have at least one pending alert (maintained incrementally)."""
+    return list(symbol_refs)
 
-    # Extract all alert fields from the stored alert_item dict (chat_id, symbol, price, type)
+
+def recent_move(symbol: str, window: int, price: float) -> Tuple[float, float] | None:
+    """(% above the low, % below the high) of `price` within the last `window` seconds, if tracked."""
+    return rolling.current_move(symbol, window, price)
+
+
+def save_trailing_peaks():
+    """Queue the current peak of every trailing stop (called at shutdown, so restarts keep them)."""
+    storage.update_params(rolling.peaks())
+
+
+def nearest_thresholds(symbol: str):
+    """
+    (lowest pending up threshold, highest pending down threshold) for a symbol,
+    including the prices at which its move / trailing alerts would currently fire.
+    """
+    up, down = index.nearest(symbol)
+    if len(rolling):
+        rolling_up, rolling_down = rolling.nearest(symbol)
+        up = min((p for p in (up, rolling_up) if p is not None), default=None)
+        down = max((p for p in (down, rolling_down) if p is not None), default=None)
+    return up, down
+
+
+# ---------- CHANGE LISTENERS ----------
+def add_listener(listener: Callable[[str, dict], None]):
+    """Get notified of user-driven adds/removes (used to mirror alerts into shard workers)."""
+    _listeners.append(listener)
+
+
+def remove_listener(listener: Callable[[str, dict], None]):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def all_alerts() -> List[dict]:
+    """Every pending alert (startup / rebalancing only — O(N))."""
+    return [store.get(slot) for slot in store.slots()]
+
+
+def _emit(event: str, alert: dict):
+    for listener in _listeners:
+        listener(event, alert)
+
+
+# ---------- PER-USER / PER-SYMBOL BOOKKEEPING ----------
+def _track(slot: int, chat_id: int, symbol: str):
+    user = user_slots.get(chat_id)
+    if user is None:
+        user = user_slots[chat_id] = UserAlerts(store)
+    user.add(slot)
+    symbol_refs[symbol] = symbol_refs.get(symbol, 0) + 1
+
+
+def _unindex(alert: dict):
+    """Take an alert out of whichever trigger structure holds it."""
+    if alert["type"] in ROLLING_TYPES:
+        rolling.remove(alert["slot"])
+    else:
+        index.remove(alert["symbol"], alert["type"], alert["price"], alert["slot"])
+
+
+def _free(slot: int):
+    """Forget a slot everywhere except the threshold index (callers handle that)."""
+    chat_id = store.chat_ids[slot]
+    symbol = store.symbol_of(slot)
+
+    user = user_slots.get(chat_id)
+    if user is not None:
+        user.remove(store.ids[slot])
+        if not user:
+            del user_slots[chat_id]
+
+    refs = symbol_refs.get(symbol, 0) - 1
+    if refs > 0:
+        symbol_refs[symbol] = refs
+    else:
+        symbol_refs.pop(symbol, None)
+
+    store.remove(slot)
+
+
+def _log_fired(fired: List[dict], prices: Dict[str, float]):
+    """One line per symbol instead of one per alert: a single tick can fire thousands."""
+    for symbol, count in Counter(a["symbol"] for a in fired).items():
+        log.info(f"{count:,} alerts removed for {symbol} this tick (price {prices[symbol]:,.4f})",
+                 extra={"event": "alerts_triggered", "symbol": symbol, "count": count})
+
+
+def _log_removed(alert_item: dict):
+    # Extract all alert fields from the alert_item dict (chat_id, symbol, price, type)
     chat_id = alert_item["chat_id"]
     symbol = alert_item["symbol"]
     price = alert_item["price"]
@@ -46,22 +310,66 @@ def remove_alert(alert_item: dict):
 
 # ---------- GET USER ALERTS ----------
 def get_user_alerts(chat_id: int):
-    """Return all alerts for a specific user."""
-    return [a for a in alerts if a["chat_id"] == chat_id]
+    """Return all alerts for a specific user, oldest first."""
+    return [store.get(slot) for slot in user_slots.get(chat_id, ())]
+
+
+def count_user_alerts(chat_id: int) -> int:
+    user = user_slots.get(chat_id)
+    return len(user) if user is not None else 0
+
+
+def get_user_alert(chat_id: int, alert_id: int) -> dict | None:
+    """One of the user's alerts by its stable id, in O(log k)."""
+    user = user_slots.get(chat_id)
+    slot = user.find(alert_id) if user is not None else None
+    return store.get(slot) if slot is not None else None
+
+
+def user_alert_page(chat_id: int, limit: int, after: int | None = None, before: int | None = None,
+                    start: int | None = None, symbol: str | None = None) -> Tuple[List[dict], bool, bool]:
+    """
+    One page of the user's alerts in id order, positioned by alert id (see UserAlerts.page).
+    Returns (alerts, has_previous, has_next); only the page's alerts are materialized.
+    """
+    user = user_slots.get(chat_id)
+    if user is None:
+        return [], False, False
+    slots, has_prev, has_next = user.page(limit, after=after, before=before, start=start, symbol=symbol)
+    return [store.get(slot) for slot in slots], has_prev, has_next
+
+
+def user_symbols(chat_id: int) -> List[str]:
+    """Symbols the user has alerts for, alphabetically."""
+    user = user_slots.get(chat_id)
+    if user is None:
+        return []
+    return sorted(user.symbols())
+
+
+# ---------- REMOVE ONE ALERT BY ID ----------
+def remove_user_alert(chat_id: int, alert_id: int) -> dict | None:
+    """Remove one of the user's alerts by its stable id. Returns the alert, or None if it's gone."""
+    alert = get_user_alert(chat_id, alert_id)
+    if alert is not None:
+        remove_alert(alert)
+    return alert
 
 
 # ---------- CLEAR USER ALERTS ----------
 def clear_user_alerts(chat_id: int):
-    """Clear all alerts for a user and mark them inactive."""
-    global alerts, inactive_users
+    """Clear all alerts for a user."""
     
-    before_count = len(alerts)
-    alerts = [a for a in alerts if a["chat_id"] != chat_id]
-    removed = before_count - len(alerts)
+    # O(k) for the user's k alerts — nobody else's alerts are touched
+    removed = 0
+    for alert in get_user_alerts(chat_id):
+        _unindex(alert)
+        _free(alert["slot"])
+        _emit("remove", alert)
+        removed += 1
     
     if removed > 0:
-        # Mark user as inactive to skip checks until a new alert is added
-        inactive_users.add(chat_id)
-        log.info(f"User {chat_id}: removed {removed} alerts → remaining: {len(alerts)}")
+        storage.delete_chat_alerts(chat_id)
+        log.info(f"User {chat_id}: removed {removed} alerts → remaining: {len(store)}")
     
     return removed
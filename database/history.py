@@ -0,0 +1,287 @@
+# database/history.py - Append-only binary price history per symbol, with 1m / 1h rollups
+
+import asyncio
+import mmap
+import os
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List
+from utils.logger import log
+from config import HISTORY_DIR, HISTORY_FLUSH_INTERVAL, HISTORY_1M_DAYS
+
+# One record = 5 little-endian float64: bar start (unix time), open, high, low, close.
+# Files are plain arrays of records, sorted by time: `<dir>/<SYMBOL>.1m.bin`, `<dir>/<SYMBOL>.1h.bin`
+FIELDS = 5
+RECORD = FIELDS * 8
+MINUTE, HOUR = 60, 3600
+SPARK = "▁▂▃▄▅▆▇█"
+
+_minute: Dict[str, list] = {}         # symbol → open 1m bar [start, open, high, low, close]
+_hour: Dict[str, list] = {}           # symbol → open 1h bar (closed 1m bars folded in)
+_pending: Dict[Path, array] = {}      # file → finished records waiting for the writer
+_writing: Dict[Path, array] = {}      # batch the writer thread is appending right now (still readable)
+
+
+# ---------- RECORD (CALLED FOR EVERY SNAPSHOT) ----------
+def record(prices: Dict[str, float], now: float | None = None):
+    """
+    Fold a {symbol: price} snapshot into the open 1m bars. Pure in-memory work:
+    a bar reaches the disk queue only when its minute (or hour) is over.
+    """
+    if not HISTORY_DIR:
+        return
+    now = time.time() if now is None else now
+    minute = now - now % MINUTE
+
+    for symbol, price in prices.items():
+        bar = _minute.get(symbol)
+        if bar is None:
+            _minute[symbol] = [minute, price, price, price, price]
+        elif bar[0] == minute:
+            if price > bar[2]:
+                bar[2] = price
+            elif price < bar[3]:
+                bar[3] = price
+            bar[4] = price
+        elif minute > bar[0]:
+            _close_minute(symbol, bar)
+            _minute[symbol] = [minute, price, price, price, price]
+
+
+def _close_minute(symbol: str, bar: list):
+    _queue(_path(symbol, "1m"), bar)
+
+    hour = bar[0] - bar[0] % HOUR
+    hour_bar = _hour.get(symbol)
+    if hour_bar is None:
+        # The part of this hour written before a restart is merged in by restore_hours()
+        _hour[symbol] = [hour, *bar[1:]]
+    elif hour_bar[0] == hour:
+        hour_bar[2] = max(hour_bar[2], bar[2])
+        hour_bar[3] = min(hour_bar[3], bar[3])
+        hour_bar[4] = bar[4]
+    else:
+        _queue(_path(symbol, "1h"), hour_bar)
+        _hour[symbol] = [hour, *bar[1:]]
+
+
+def _queue(path: Path, bar: list):
+    _pending.setdefault(path, array("d")).extend(bar)
+
+
+def _rollup(rows: List[list], start: float) -> list | None:
+    """Combine consecutive bars into one starting at `start`."""
+    if not rows:
+        return None
+    return [start, rows[0][1], max(r[2] for r in rows), min(r[3] for r in rows), rows[-1][4]]
+
+
+def _path(symbol: str, resolution: str) -> Path:
+    return Path(HISTORY_DIR) / f"{symbol}.{resolution}.bin"
+
+
+# ---------- RESTORE AFTER A RESTART ----------
+async def restore_hours(now: float | None = None):
+    """
+    Pick up the part of the current hour written before a restart, so its 1h bar isn't
+    missing those minutes. Files are read once, in a worker thread; bars folded in since
+    startup are merged with what was on disk.
+    """
+    if not HISTORY_DIR:
+        return
+    now = time.time() if now is None else now
+    hour = now - now % HOUR
+    try:
+        restored = await asyncio.to_thread(_read_hours, hour)
+    except OSError as e:
+        log.error(f"History restore failed: {e}")
+        return
+
+    for symbol, old in restored.items():
+        hour_bar = _hour.get(symbol)
+        if hour_bar is None:
+            _hour[symbol] = old
+        elif hour_bar[0] == hour:
+            _hour[symbol] = _rollup([old, hour_bar], hour)
+    if restored:
+        log.info(f"History: restored the current hour of {len(restored)} symbols")
+
+
+def _read_hours(hour: float) -> Dict[str, list]:
+    """{symbol: 1m bars since `hour` rolled into one} for files written to during that hour."""
+    restored = {}
+    for path in Path(HISTORY_DIR).glob("*.1m.bin"):
+        if path.stat().st_mtime < hour:
+            continue
+        bar = _rollup(_read(path, hour), hour)
+        if bar is not None:
+            restored[path.name[:-len(".1m.bin")]] = bar
+    return restored
+
+
+# ---------- WRITER ----------
+async def history_writer(interval: float = HISTORY_FLUSH_INTERVAL):
+    """Background task: restore the current hour, then append finished bars to their files off the event loop."""
+    try:
+        await restore_hours()
+        while True:
+            await asyncio.sleep(interval)
+            await flush()
+    except asyncio.CancelledError:
+        log.info("History writer cancelled.")
+        raise
+
+
+async def flush():
+    """Write every queued bar (one append per file) in a worker thread."""
+    global _pending, _writing
+    if not _pending:
+        return
+    _writing, _pending = _pending, {}
+    try:
+        await asyncio.to_thread(_write, _writing)
+    except OSError as e:
+        log.error(f"History write failed: {e}")
+    finally:
+        _writing = {}
+
+
+def close_history():
+    """Write whatever is queued (shutdown). The open bars are dropped: at most a minute per symbol."""
+    global _pending
+    batch, _pending = _pending, {}
+    _write(batch)
+
+
+def _write(batch: Dict[Path, array]):
+    if not batch:
+        return
+    Path(HISTORY_DIR).mkdir(parents=True, exist_ok=True)
+    keep = HISTORY_1M_DAYS * 86400 // MINUTE
+    for path, records in batch.items():
+        with open(path, "ab") as f:
+            records.tofile(f)
+            size = f.tell()
+        if path.name.endswith(".1m.bin") and size > 2 * keep * RECORD:
+            _compact(path, keep)
+
+
+def _compact(path: Path, keep: int):
+    """Drop all but the newest `keep` records. Replaced atomically, so open mappings stay valid."""
+    with open(path, "rb") as f:
+        f.seek(-keep * RECORD, os.SEEK_END)
+        tail = f.read()
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(tail)
+    os.replace(tmp, path)
+
+
+# ---------- READ ----------
+def bars(symbol: str, resolution: str, since: float, live: bool = True) -> List[list]:
+    """
+    Bars of one symbol starting at or after `since`: the file (memory-mapped, binary-searched),
+    then anything not written yet, then the bar still open (unless live=False).
+    """
+    path = _path(symbol, resolution)
+    rows = _read(path, since)
+    for batch in (_writing, _pending):
+        records = batch.get(path)
+        if records:
+            # Skip what the writer thread already appended to the file
+            after = rows[-1][0] if rows else since - 1
+            rows += [r for r in _split(records.tolist()) if r[0] >= since and r[0] > after]
+
+    if live:
+        open_bars = [_minute.get(symbol)] if resolution == "1m" else _open_hours(symbol)
+        rows += [list(bar) for bar in open_bars if bar is not None and bar[0] >= since]
+    return rows
+
+
+def _read(path: Path, since: float) -> List[list]:
+    try:
+        with open(path, "rb") as f:
+            n = os.fstat(f.fileno()).st_size // RECORD
+            if n == 0:
+                return []
+            with mmap.mmap(f.fileno(), n * RECORD, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm).cast("d")
+                try:
+                    first = bisect_left(range(n), since, key=lambda i: view[i * FIELDS])
+                    return _split(view[first * FIELDS:n * FIELDS].tolist())
+                finally:
+                    view.release()
+    except FileNotFoundError:
+        return []
+
+
+def _split(values: List[float]) -> List[list]:
+    return [values[i:i + FIELDS] for i in range(0, len(values), FIELDS)]
+
+
+def _open_hours(symbol: str) -> List[list]:
+    """
+    The current hour so far (folded 1m bars plus the open minute), preceded by the
+    previous hour if it is over but not queued yet (that happens when the next minute closes).
+    """
+    hour_bar, minute_bar = _hour.get(symbol), _minute.get(symbol)
+    if minute_bar is None:
+        return [hour_bar] if hour_bar is not None else []
+    hour = minute_bar[0] - minute_bar[0] % HOUR
+    if hour_bar is None:
+        return [[hour, *minute_bar[1:]]]
+    if hour_bar[0] != hour:
+        return [hour_bar, [hour, *minute_bar[1:]]]
+    return [_rollup([hour_bar, minute_bar], hour)]
+
+
+# ---------- STATS / CHARTS ----------
+def window_stats(symbol: str, window: float, price: float, now: float | None = None) -> dict | None:
+    """
+    Change / high / low over the last `window` seconds from local data, or None without history.
+    "covered" is how many seconds of that window the history actually spans.
+    """
+    now = time.time() if now is None else now
+    rows = bars(symbol, "1m" if window <= 2 * 86400 else "1h", now - window)
+    if not rows:
+        return None
+    first = rows[0][1]
+    return {
+        "change": (price / first - 1) * 100,
+        "high": max(price, max(r[2] for r in rows)),
+        "low": min(price, min(r[3] for r in rows)),
+        "covered": now - rows[0][0],
+    }
+
+
+def sparkline(symbol: str, span: float, width: int = 24, now: float | None = None) -> str | None:
+    """Closing prices over the last `span` seconds as a one-line text chart, or None if too little data."""
+    now = time.time() if now is None else now
+    start = now - span
+    rows = bars(symbol, "1m" if span <= 2 * 86400 else "1h", start)
+    if len(rows) < 2:
+        return None
+
+    # Less history than the span (recording started recently): stretch what there is
+    start = max(start, rows[0][0])
+    span = max(now - start, 1.0)
+
+    # Last close per column; columns without data repeat the previous one
+    columns: List[float | None] = [None] * width
+    for r in rows:
+        columns[min(width - 1, max(0, int((r[0] - start) / span * width)))] = r[4]
+    filled, last = [], None
+    for c in columns:
+        last = c if c is not None else last
+        if last is not None:
+            filled.append(last)
+
+    low, high = min(filled), max(filled)
+    scale = (len(SPARK) - 1) / (high - low) if high > low else 0
+    return "".join(SPARK[round((c - low) * scale)] for c in filled)
+
+
+def history_size() -> int:
+    """Symbols with recorded history this session."""
+    return len(_minute)
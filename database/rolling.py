@@ -0,0 +1,317 @@
+# database/rolling.py - Percentage-move and trailing alerts over per-symbol rolling price windows
+
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List, Tuple
+from database.alert_index import ThresholdIndex
+
+BUCKET_SECONDS = 30        # ring buffer resolution: one (low, high) pair per 30 s
+MAX_WINDOW = 24 * 3600     # longest move window supported (seconds)
+MOVE_WINDOWS = {"5m": 300, "15m": 900, "1h": 3600, "4h": 4 * 3600, "24h": MAX_WINDOW}
+
+
+def window_label(seconds: float) -> str:
+    """"1h" for 3600 etc. (falls back to minutes for windows outside the presets)."""
+    for label, window in MOVE_WINDOWS.items():
+        if window == seconds:
+            return label
+    return f"{seconds / 60:g}m"
+
+
+# ---------- ROLLING WINDOW (RING BUFFER + MONOTONIC DEQUES) ----------
+class PriceWindow:
+    """
+    Recent prices of one symbol as a fixed-size ring buffer of buckets (start time, low, high).
+
+    For every window length in use, two monotonic deques of bucket sequence numbers
+    give the rolling minimum and maximum: lows increase and highs decrease from the
+    front, so the extreme is always deque[0]. Each tick pushes/pops every bucket at
+    most once → O(1) amortized per window, however many alerts watch it.
+    """
+
+    def __init__(self, bucket_seconds: int = BUCKET_SECONDS, max_window: int = MAX_WINDOW):
+        self.bucket = bucket_seconds
+        self.capacity = max_window // bucket_seconds + 2
+        self.starts = array("d", bytes(8 * self.capacity))
+        self.lows = array("d", bytes(8 * self.capacity))
+        self.highs = array("d", bytes(8 * self.capacity))
+        self.head = -1  # sequence number of the newest bucket (ring index = seq % capacity)
+        self.now = 0.0  # time of the latest push
+        self.deques: Dict[int, Tuple[deque, deque]] = {}  # window → (min deque, max deque)
+        self.refs: Dict[int, int] = {}                    # window → alerts using it
+
+    # ---------- WINDOWS ----------
+    def acquire(self, window: int):
+        """Start tracking a window (seeded from the buffered history)."""
+        self.refs[window] = self.refs.get(window, 0) + 1
+        if window in self.deques:
+            return
+        lows, highs = deque(), deque()
+        self.deques[window] = (lows, highs)
+        for seq in range(max(0, self.head - self.capacity + 1), self.head + 1):
+            self._push_seq(lows, highs, seq)
+        self._evict(lows, highs, self.now - window)
+
+    def release(self, window: int):
+        refs = self.refs.get(window, 0) - 1
+        if refs > 0:
+            self.refs[window] = refs
+        else:
+            self.refs.pop(window, None)
+            self.deques.pop(window, None)
+
+    # ---------- UPDATE ----------
+    def push(self, price: float, now: float):
+        """Add one observed price; the newest bucket's low/high are updated in place."""
+        self.now = now
+        start = now - now % self.bucket
+        i = self.head % self.capacity
+        if self.head < 0 or self.starts[i] != start:
+            self.head += 1
+            i = self.head % self.capacity
+            self.starts[i], self.lows[i], self.highs[i] = start, price, price
+        else:
+            self.lows[i] = min(self.lows[i], price)
+            self.highs[i] = max(self.highs[i], price)
+
+        for window, (lows, highs) in self.deques.items():
+            self._push_seq(lows, highs, self.head)
+            self._evict(lows, highs, now - window)
+
+    def _push_seq(self, lows: deque, highs: deque, seq: int):
+        i = seq % self.capacity
+        if lows and lows[-1] == seq:
+            lows.pop()  # the newest bucket changed: re-insert it
+        while lows and self.lows[lows[-1] % self.capacity] >= self.lows[i]:
+            lows.pop()
+        lows.append(seq)
+
+        if highs and highs[-1] == seq:
+            highs.pop()
+        while highs and self.highs[highs[-1] % self.capacity] <= self.highs[i]:
+            highs.pop()
+        highs.append(seq)
+
+    def _evict(self, lows: deque, highs: deque, cutoff: float):
+        """Drop buckets that ended before the window start (or were overwritten in the ring)."""
+        oldest = self.head - self.capacity + 1
+        for d in (lows, highs):
+            while d and (d[0] < oldest or self.starts[d[0] % self.capacity] + self.bucket <= cutoff):
+                d.popleft()
+
+    def range(self, window: int) -> Tuple[float, float] | None:
+        """(lowest, highest) price within the window, or None without data."""
+        tracked = self.deques.get(window)
+        if tracked is not None:
+            lows, highs = tracked
+            if not lows:
+                return None
+            return self.lows[lows[0] % self.capacity], self.highs[highs[0] % self.capacity]
+
+        # Untracked window (e.g. checked before an alert is added): scan the ring once
+        if self.head < 0:
+            return None
+        cutoff = self.now - window
+        seqs = [seq for seq in range(max(0, self.head - self.capacity + 1), self.head + 1)
+                if self.starts[seq % self.capacity] + self.bucket > cutoff]
+        return (min(self.lows[s % self.capacity] for s in seqs),
+                max(self.highs[s % self.capacity] for s in seqs))
+
+
+# ---------- TRAILING STOPS (MONOTONIC STACK OF PEAK GROUPS) ----------
+class TrailingBook:
+    """
+    Trailing stops of one symbol, grouped by the peak they have seen.
+
+    `stack` holds [peak, heap of (pct, slot, alert id)] with peaks strictly decreasing
+    from bottom to top. A new high merges every group at or below it into one
+    (their peak is now the same), so groups only ever shrink in number.
+    A group fires its alerts with pct <= 1 - price / peak, smallest pct first.
+    """
+
+    def __init__(self):
+        self.stack: List[list] = []
+
+    def add(self, peak: float, pct: float, slot: int, alert_id: int):
+        # Peaks are descending: find the group with this peak or the spot to insert one
+        peaks = [-g[0] for g in self.stack]
+        pos = bisect_left(peaks, -peak)
+        if pos < len(self.stack) and self.stack[pos][0] == peak:
+            heapq.heappush(self.stack[pos][1], (pct, slot, alert_id))
+        else:
+            self.stack.insert(pos, [peak, [(pct, slot, alert_id)]])
+
+    def update(self, price: float, is_live) -> List[Tuple[int, float]]:
+        """Raise peaks to `price` where it is a new high and return (slot, peak) of fired alerts."""
+        merged = None
+        while self.stack and self.stack[-1][0] <= price:
+            group = self.stack.pop()
+            if merged is None:
+                merged = group
+            else:
+                # Small-to-large: each entry moves O(log n) times overall
+                small, large = sorted((merged[1], group[1]), key=len)
+                for entry in small:
+                    heapq.heappush(large, entry)
+                merged = [price, large]
+        if merged is not None:
+            merged[0] = price  # a new high for these alerts: nothing in this group can fire now
+            self.stack.append(merged)
+
+        fired, emptied = [], False
+        for peak, heap in self.stack:
+            drop = 1 - price / peak
+            while heap and heap[0][0] <= drop:
+                pct, slot, alert_id = heapq.heappop(heap)
+                if is_live(slot, alert_id):
+                    fired.append((slot, peak))
+            emptied = emptied or not heap
+        if emptied:
+            self.stack = [g for g in self.stack if g[1]]
+        return fired
+
+    def peaks(self, is_live) -> List[Tuple[float, int]]:
+        return [(peak, alert_id) for peak, heap in self.stack
+                for _, slot, alert_id in heap if is_live(slot, alert_id)]
+
+    def __bool__(self) -> bool:
+        return bool(self.stack)
+
+
+# ---------- ENGINE ----------
+class RollingAlerts:
+    """
+    Move alerts ("±3% within 1h") and trailing stops ("5% below the peak since creation"),
+    evaluated from prices the checker already fetched — no history requests.
+
+    Move thresholds sit in a ThresholdIndex keyed "SYMBOL/window/up|down" whose "up"
+    side fires every pct <= the current rise (or fall), so a tick costs O(log n + k).
+    A two-sided "move" alert is indexed on both sides; firing on one drops the other.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.windows: Dict[str, PriceWindow] = {}
+        self.moves = ThresholdIndex()
+        self.trails: Dict[str, TrailingBook] = {}
+        self.alerts: Dict[int, tuple] = {}  # slot → (alert id, symbol, type, pct, param)
+
+    def is_live(self, slot: int, alert_id: int) -> bool:
+        entry = self.alerts.get(slot)
+        return entry is not None and entry[0] == alert_id
+
+    # ---------- ADD / REMOVE ----------
+    def add(self, slot: int, alert_id: int, symbol: str, alert_type: str, pct: float, param: float):
+        """`param` is the window in seconds for move alerts, the starting peak for trailing ones."""
+        self.alerts[slot] = (alert_id, symbol, alert_type, pct, param)
+
+        if alert_type == "trail":
+            self.trails.setdefault(symbol, TrailingBook()).add(param, pct / 100, slot, alert_id)
+            return
+
+        window = int(param)
+        self.windows.setdefault(symbol, PriceWindow()).acquire(window)
+        for side in self._sides(alert_type):
+            self.moves.add(f"{symbol}/{window}/{side}", "up", pct / 100, slot)
+
+    def remove(self, slot: int):
+        entry = self.alerts.pop(slot, None)
+        if entry is None:
+            return
+        _, symbol, alert_type, pct, param = entry
+
+        if alert_type == "trail":
+            return  # lazily skipped by TrailingBook.update (dead entries fail is_live)
+
+        window = int(param)
+        for side in self._sides(alert_type):
+            self.moves.remove(f"{symbol}/{window}/{side}", "up", pct / 100, slot)
+        self.windows[symbol].release(window)
+        if not self.windows[symbol].refs:
+            del self.windows[symbol]
+
+    @staticmethod
+    def _sides(alert_type: str) -> Tuple[str, ...]:
+        return {"move": ("up", "down"), "move_up": ("up",), "move_down": ("down",)}[alert_type]
+
+    # ---------- EVALUATE ----------
+    def update(self, symbol: str, price: float, now: float) -> List[Tuple[int, float]]:
+        """Feed one price; return (slot, reference price) for every alert it fires and forget them."""
+        fired = []
+
+        window_set = self.windows.get(symbol)
+        if window_set is not None:
+            window_set.push(price, now)
+            for window in list(window_set.deques):
+                span = window_set.range(window)
+                if span is None:
+                    continue  # released by an alert that just fired
+                low, high = span
+                rise = price / low - 1
+                fall = 1 - price / high
+                for side, move, ref in (("up", rise, low), ("down", fall, high)):
+                    for slot in self.moves.pop_triggered(f"{symbol}/{window}/{side}", move):
+                        if slot in self.alerts:  # a two-sided alert may fire on both sides at once
+                            fired.append((slot, ref))
+                            self.remove(slot)
+
+        book = self.trails.get(symbol)
+        if book is not None:
+            for slot, peak in book.update(price, self.is_live):
+                fired.append((slot, peak))
+                self.alerts.pop(slot, None)
+            if not book:
+                del self.trails[symbol]
+
+        return fired
+
+    # ---------- INTROSPECTION ----------
+    def current_move(self, symbol: str, window: int, price: float) -> Tuple[float, float] | None:
+        """(% above the window low, % below the window high) for `price`, if the symbol has history."""
+        window_set = self.windows.get(symbol)
+        span = window_set.range(window) if window_set is not None else None
+        if span is None:
+            return None
+        low, high = min(span[0], price), max(span[1], price)
+        return (price / low - 1) * 100, (1 - price / high) * 100
+
+    def nearest(self, symbol: str) -> Tuple[float | None, float | None]:
+        """
+        (lowest price that fires a move alert upwards, highest price that fires one downwards
+        or a trailing stop) at the current window lows/highs and peaks — for poll scheduling.
+        """
+        ups, downs = [], []
+        window_set = self.windows.get(symbol)
+        if window_set is not None:
+            for window in window_set.deques:
+                span = window_set.range(window)
+                if span is None:
+                    continue
+                low, high = span
+                rise = self.moves.nearest(f"{symbol}/{window}/up")[0]
+                fall = self.moves.nearest(f"{symbol}/{window}/down")[0]
+                if rise is not None:
+                    ups.append(low * (1 + rise))
+                if fall is not None:
+                    downs.append(high * (1 - fall))
+
+        book = self.trails.get(symbol)
+        if book is not None:
+            downs.extend(peak * (1 - heap[0][0]) for peak, heap in book.stack if heap)
+
+        return min(ups, default=None), max(downs, default=None)
+
+    def symbols(self) -> List[str]:
+        """Symbols with move windows or trailing stops."""
+        return list(self.windows.keys() | self.trails.keys())
+
+    def peaks(self) -> List[Tuple[float, int]]:
+        """(current peak, alert id) of every pending trailing stop, for persisting."""
+        return [p for book in self.trails.values() for p in book.peaks(self.is_live)]
+
+    def __len__(self) -> int:
+        return len(self.alerts)
@@ -0,0 +1,180 @@
+# database/storage.py - SQLite persistence for alerts (WAL mode, group-committed writes)
+
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Tuple
+from utils.logger import log
+from config import DB_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,  -- ids are never reused
+    chat_id    INTEGER NOT NULL,
+    symbol     TEXT    NOT NULL,
+    price      REAL    NOT NULL,  -- threshold, or percentage for move / trailing alerts
+    type       TEXT    NOT NULL,
+    created_at REAL    NOT NULL,
+    param      REAL               -- move window (seconds) / trailing peak, NULL otherwise
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_trigger ON alerts (symbol, type, price);
+CREATE INDEX IF NOT EXISTS idx_alerts_chat ON alerts (chat_id);
+"""
+
+BATCH_LINGER = 0.05    # seconds to wait for more writes before committing a batch
+BATCH_MAX_OPS = 5000   # upper bound of queued operations per transaction
+
+_queue: queue.Queue = queue.Queue()
+_writer: threading.Thread | None = None
+_db_path: str = DB_PATH
+
+
+# ---------- CONNECTION ----------
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # safe with WAL, far fewer fsyncs
+    return conn
+
+
+# ---------- INIT & LOAD ----------
+def init_storage(path: str = DB_PATH) -> Tuple[List[Tuple], int]:
+    """
+    Create the database if needed and start the background writer.
+    Returns every stored alert as (id, chat_id, symbol, price, type, param) rows,
+    plus the highest id ever issued.
+    """
+    global _writer, _db_path
+
+    _db_path = path
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    conn = _connect(path)
+    try:
+        conn.executescript(SCHEMA)
+        _migrate(conn)
+        # One sequential scan in primary-key order: cheap even for millions of rows
+        rows = conn.execute("SELECT id, chat_id, symbol, price, type, param FROM alerts ORDER BY id").fetchall()
+        seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'alerts'").fetchone()
+    finally:
+        conn.close()
+
+    if _writer is None or not _writer.is_alive():
+        _writer = threading.Thread(target=_writer_loop, name="alert-db-writer", daemon=True)
+        _writer.start()
+
+    log.info(f"Alert storage ready: {path} ({len(rows)} alerts loaded)")
+    return rows, seq[0] if seq else 0
+
+
+def _migrate(conn: sqlite3.Connection):
+    """Bring databases created by older versions up to the current schema."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(alerts)")}
+    if "param" not in columns:
+        conn.execute("ALTER TABLE alerts ADD COLUMN param REAL")
+        conn.commit()
+
+
+# ---------- QUEUED WRITES (NON-BLOCKING) ----------
+def save_alert(alert: dict):
+    """Queue an INSERT for a new alert."""
+    save_alerts([alert])
+
+
+def save_alerts(alerts: List[dict]):
+    """Queue INSERTs for many alerts — committed as part of a single transaction."""
+    if alerts:
+        now = time.time()
+        _queue.put(("insert", [(a["id"], a["chat_id"], a["symbol"], a["price"], a["type"], now, a.get("param"))
+                               for a in alerts]))
+
+
+def delete_alerts(alert_ids: List[int]):
+    """Queue a DELETE for many alerts — committed as part of a single transaction."""
+    if alert_ids:
+        _queue.put(("delete", [(i,) for i in alert_ids]))
+
+
+def update_params(pairs: List[Tuple[float, int]]):
+    """Queue new `param` values as (param, alert id) pairs, e.g. trailing-stop peaks."""
+    if pairs:
+        _queue.put(("param", pairs))
+
+
+def delete_chat_alerts(chat_id: int):
+    """Queue a DELETE of every alert belonging to one chat."""
+    _queue.put(("delete_chat", chat_id))
+
+
+def flush(timeout: float | None = None) -> bool:
+    """Block until everything queued so far is committed."""
+    done = threading.Event()
+    _queue.put(("flush", done))
+    return done.wait(timeout)
+
+
+def close_storage(timeout: float = 10):
+    """Commit pending writes and stop the writer thread."""
+    global _writer
+
+    if _writer is None:
+        return
+    _queue.put(None)
+    _writer.join(timeout)
+    _writer = None
+
+
+# ---------- BACKGROUND WRITER ----------
+def _writer_loop():
+    """Drain the queue in batches: every batch is one transaction (group commit)."""
+    conn = _connect(_db_path)
+
+    try:
+        while True:
+            ops = [_queue.get()]
+
+            # Linger briefly so bursts (e.g. thousands of triggers) share one commit
+            deadline = time.monotonic() + BATCH_LINGER
+            while len(ops) < BATCH_MAX_OPS and ops[-1] is not None:
+                remaining = deadline - time.monotonic()
+                try:
+                    ops.append(_queue.get(timeout=remaining) if remaining > 0 else _queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = ops[-1] is None
+            if stop:
+                ops.pop()
+
+            _apply_batch(conn, ops)
+
+            if stop:
+                return
+    finally:
+        conn.close()
+
+
+def _apply_batch(conn: sqlite3.Connection, ops: list):
+    waiters = []
+
+    try:
+        with conn:  # BEGIN … COMMIT
+            for kind, payload in ops:
+                if kind == "insert":
+                    conn.executemany("INSERT OR REPLACE INTO alerts (id, chat_id, symbol, price, type, created_at, param) "
+                                     "VALUES (?, ?, ?, ?, ?, ?, ?)", payload)
+                elif kind == "delete":
+                    conn.executemany("DELETE FROM alerts WHERE id = ?", payload)
+                elif kind == "param":
+                    conn.executemany("UPDATE alerts SET param = ? WHERE id = ?", payload)
+                elif kind == "delete_chat":
+                    conn.execute("DELETE FROM alerts WHERE chat_id = ?", (payload,))
+                elif kind == "flush":
+                    waiters.append(payload)
+    except Exception as e:
+        log.error(f"Alert storage write failed ({len(ops)} ops): {e}")
+    finally:
+        for done in waiters:
+            done.set()
@@ -0,0 +1,95 @@
+# database/user_index.py - Per-user ordered alert index (paging through thousands of alerts)
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterator, List, Set, Tuple
+from database.alert_store import AlertStore
+
+
+class UserAlerts:
+    """
+    One user's alerts as an array of store slots in creation order, which is also
+    alert id order (ids only grow). 8 bytes per alert.
+
+    Positions are found by bisecting on the ids the store already holds for those
+    slots, so no second copy of the ids is kept. Filtering by symbol and listing the
+    user's symbols scan this user's alerts only, when a /list page is drawn.
+    """
+
+    __slots__ = ("slots", "store")
+
+    def __init__(self, store: AlertStore):
+        self.slots = array("q")
+        self.store = store
+
+    def _id(self, slot: int) -> int:
+        return self.store.ids[slot]
+
+    # ---------- ADD / REMOVE ----------
+    def add(self, slot: int):
+        """Append a new alert (its id is the highest so far)."""
+        self.slots.append(slot)
+
+    def find(self, alert_id: int) -> int | None:
+        """Slot of one of the user's alerts by id, in O(log k)."""
+        i = bisect_left(self.slots, alert_id, key=self._id)
+        if i < len(self.slots) and self._id(self.slots[i]) == alert_id:
+            return self.slots[i]
+        return None
+
+    def remove(self, alert_id: int):
+        i = bisect_left(self.slots, alert_id, key=self._id)
+        if i < len(self.slots) and self._id(self.slots[i]) == alert_id:
+            del self.slots[i]
+
+    # ---------- PAGES ----------
+    def page(self, limit: int, after: int | None = None, before: int | None = None,
+             start: int | None = None, symbol: str | None = None) -> Tuple[List[int], bool, bool]:
+        """
+        Up to `limit` slots in id order: right after alert id `after`, right before `before`,
+        from `start` on (inclusive), or the first ones. Returns (slots, has_previous, has_next).
+        """
+        sid = self.store.symbol_id(symbol) if symbol is not None else None
+        if symbol is not None and sid is None:
+            return [], False, False
+
+        if before is not None:
+            i = bisect_left(self.slots, before, key=self._id)
+            found = self._walk(i - 1, -1, limit + 1, sid)
+            has_prev = len(found) > limit
+            found = found[:limit][::-1]
+            return found, has_prev, bool(self._walk(i, 1, 1, sid))
+
+        if after is not None:
+            i = bisect_right(self.slots, after, key=self._id)
+        elif start is not None:
+            i = bisect_left(self.slots, start, key=self._id)
+        else:
+            i = 0
+        found = self._walk(i, 1, limit + 1, sid)
+        return found[:limit], bool(self._walk(i - 1, -1, 1, sid)), len(found) > limit
+
+    def _walk(self, i: int, step: int, count: int, sid: int | None) -> List[int]:
+        """Slots from position i in direction `step` (of symbol id `sid` if given), at most `count`."""
+        found, slots, symbol_ids = [], self.slots, self.store.symbol_ids
+        while 0 <= i < len(slots) and len(found) < count:
+            if sid is None or symbol_ids[slots[i]] == sid:
+                found.append(slots[i])
+            i += step
+        return found
+
+    def symbols(self) -> Set[str]:
+        """Symbols the user has alerts for."""
+        store = self.store
+        return {store.symbols[sid] for sid in {store.symbol_ids[slot] for slot in self.slots}}
+
+    # ---------- CONTAINER ----------
+    def __iter__(self) -> Iterator[int]:
+        """Slots, oldest alert first."""
+        return iter(self.slots)
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def __bool__(self) -> bool:
+        return bool(self.slots)
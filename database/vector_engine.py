@@ -0,0 +1,41 @@
+# database/vector_engine.py - Vectorized (NumPy) trigger evaluation over the column store
+
+from typing import Dict, List
+from database.alert_store import AlertStore, UP, DOWN
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+
+def available() -> bool:
+    """True if NumPy is installed."""
+    return np is not None
+
+
+# ---------- FIRED SLOTS ----------
+def fired_slots(store: AlertStore, prices: Dict[str, float]) -> List[int]:
+    """
+    Return the slots of every live alert crossed by the snapshot, in one vectorized pass:
+    gather each alert's current price by symbol id, compare against the threshold column
+    and combine with the direction column.
+    """
+    n = len(store.ids)
+    if n == 0 or not prices:
+        return []
+
+    # Price vector indexed by symbol id; NaN for symbols missing from the snapshot
+    # (every comparison with NaN is False, so those alerts never fire)
+    price_by_symbol = np.array([prices.get(s, np.nan) for s in store.symbols], dtype=np.float64)
+
+    # Zero-copy views over the array.array columns. They are locals, released on return:
+    # an array.array cannot grow while a buffer view on it exists.
+    thresholds = np.frombuffer(store.prices, dtype=np.float64, count=n)
+    symbol_ids = np.frombuffer(store.symbol_ids, dtype=np.int32, count=n)
+    directions = np.frombuffer(store.directions, dtype=np.uint8, count=n)
+
+    current = price_by_symbol[symbol_ids]
+    fired = ((directions == UP) & (current >= thresholds)) | ((directions == DOWN) & (current <= thresholds))
+
+    return np.flatnonzero(fired).tolist()
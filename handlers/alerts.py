@@ -1,9 +1,23 @@
 # handlers/alerts.py - Smart & user-friendly
 
+import heapq
+import math
 from aiogram import types, Bot
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command
-from database.alerts import add_alert, get_user_alerts, clear_user_alerts
-from services.binance import get_price
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from database.alerts import (
+    add_alert, get_user_alerts, clear_user_alerts, recent_move,
+    count_user_alerts, user_alert_page, user_symbols, remove_user_alert,
+)
+from database.rolling import MOVE_WINDOWS, window_label
+from services.price_cache import get_cached_price
+from services.snapshot import get_snapshot
+from services.symbols import symbol_error
+
+PAGE_SIZE = 10        # alerts per /list page
+FILTER_BUTTONS = 6    # symbol filter buttons shown when the user has at most this many symbols
+MAX_FILTER_LEN = 20   # longer /list filters can't be a coin (and would overflow callback data)
 
 
 # ---------- HANDLE /UP COMMAND ----------
@@ -18,6 +32,99 @@ async def down_handler(message: types.Message):
     await _create_alert(message, "down", "down")
 
 
+# ---------- HANDLE /MOVE COMMAND ----------
+async def move_handler(message: types.Message):
+    """
+    Handle /move SYMBOL [+|-]PCT [WINDOW]: alert when the price moves PCT% within the window.
+    "+3" only watches rises from the window low, "-3" only falls from the window high.
+    """
+    args = message.text.split()
+    if len(args) not in (3, 4):
+        return await message.answer(
+            "ℹ Example: /move BTC 3 1h  (±3% within an hour)\n"
+            "Use +3 or -3 for one direction only. Windows: " + ", ".join(MOVE_WINDOWS)
+        )
+
+    symbol = args[1].upper()
+    error = symbol_error(symbol)
+    if error:
+        return await message.answer(error)
+
+    raw = args[2].rstrip("%")
+    alert_type = {"+": "move_up", "-": "move_down"}.get(raw[:1], "move")
+    pct = _parse_percent(raw.lstrip("+-"))
+    if pct is None:
+        return await message.answer("The percentage must be a number between 0 and 100!")
+
+    label = args[3].lower() if len(args) == 4 else "1h"
+    window = MOVE_WINDOWS.get(label)
+    if window is None:
+        return await message.answer("Unknown window. Choose one of: " + ", ".join(MOVE_WINDOWS))
+
+    current_price = await get_cached_price(symbol)
+    if current_price is None:
+        return await message.answer(f"I can't fetch the current price of {symbol} from Binance. Try again.")
+
+    # Already moved that much within the window (only known if the symbol's window is being tracked)?
+    moved = recent_move(symbol, window, current_price)
+    if moved is not None:
+        rise, fall = moved
+        if (alert_type != "move_down" and rise >= pct) or (alert_type != "move_up" and fall >= pct):
+            return await message.answer(
+                f"This alert would trigger immediately! ⚠\n\n"
+                f"{symbol} is already up {rise:.2f}% from its {label} low "
+                f"and down {fall:.2f}% from its {label} high."
+            )
+
+    add_alert(message.chat.id, symbol, pct, alert_type, window)
+
+    direction_text = {"move": "up or down", "move_up": "up", "move_down": "down"}[alert_type]
+    return await message.answer(
+        f"✔ Alert successfully registered!\n\n"
+        f"{symbol}/USDT now: {current_price:,.4f} dollars\n"
+        f"When it moves {direction_text} {pct:g}% within {label} → I'll notify you."
+    )
+
+
+# ---------- HANDLE /TRAIL COMMAND ----------
+async def trail_handler(message: types.Message):
+    """Handle /trail SYMBOL PCT: alert when the price drops PCT% below its highest price since now."""
+    args = message.text.split()
+    if len(args) != 3:
+        return await message.answer("ℹ Example: /trail BTC 5  (5% below the peak)")
+
+    symbol = args[1].upper()
+    error = symbol_error(symbol)
+    if error:
+        return await message.answer(error)
+
+    pct = _parse_percent(args[2].rstrip("%"))
+    if pct is None:
+        return await message.answer("The percentage must be a number between 0 and 100!")
+
+    current_price = await get_cached_price(symbol)
+    if current_price is None:
+        return await message.answer(f"I can't fetch the current price of {symbol} from Binance. Try again.")
+
+    # The peak starts at the current price and follows every new high
+    add_alert(message.chat.id, symbol, pct, "trail", current_price)
+
+    return await message.answer(
+        f"✔ Trailing stop registered!\n\n"
+        f"{symbol}/USDT now: {current_price:,.4f} dollars\n"
+        f"When it falls {pct:g}% below its highest price from now on "
+        f"(currently {current_price * (1 - pct / 100):,.4f}) → I'll notify you."
+    )
+
+
+def _parse_percent(text: str) -> float | None:
+    try:
+        pct = float(text)
+    except ValueError:
+        return None
+    return pct if 0 < pct < 100 else None
+
+
 # ---------- MAIN HANDLER ----------
 async def _create_alert(message: types.Message, alert_type: str, direction_text: str):
     """Main orchestrator for creating alerts."""
@@ -27,7 +134,7 @@ async def _create_alert(message: types.Message, alert_type: str, direction_text:
         return
     symbol, target_price = parsed
 
-    current_price = await get_price(symbol)
+    current_price = await get_cached_price(symbol)
     if current_price is None:
         return await message.answer(f"I can't fetch the current price of {symbol} from Binance. Try again.")
 
@@ -64,6 +171,11 @@ async def _parse_and_validate(message: types.Message, alert_type: str):
 
     symbol = args[1].upper()
 
+    error = symbol_error(symbol)
+    if error:
+        await message.answer(error)
+        return None
+
     try:
         target_price = float(args[2])
         if target_price <= 0:
@@ -78,11 +190,8 @@ async def _parse_and_validate(message: types.Message, alert_type: str):
 # ---------- 2) CHECK IF ALERT WOULD TRIGGER NOW ----------
 async def _check_alert_immediate(message, alert_type, symbol, current_price, target_price):
     """Check if alert criteria already satisfied right now."""
-    if alert_type == "up" and current_price >= target_price:
-        reason = f"Current price is *{current_price:,.4f}* — above *{target_price:,}*"
-    elif alert_type == "down" and current_price <= target_price:
-        reason = f"Current price is *{current_price:,.4f}* — below *{target_price:,}*"
-    else:
+    reason = immediate_reason(alert_type, current_price, target_price)
+    if reason is None:
         return False
 
     await message.answer(
@@ -95,13 +204,24 @@ async def _check_alert_immediate(message, alert_type, symbol, current_price, tar
     return True
 
 
+def immediate_reason(alert_type: str, current_price: float, target_price: float) -> str | None:
+    """Why an up/down alert would fire right away (Markdown), or None if it wouldn't."""
+    if alert_type == "up" and current_price >= target_price:
+        return f"Current price is *{current_price:,.4f}* — above *{target_price:,}*"
+    if alert_type == "down" and current_price <= target_price:
+        return f"Current price is *{current_price:,.4f}* — below *{target_price:,}*"
+    return None
+
+
 # ---------- 3) CHECK FOR COMMON USER MISTAKES ----------
 async def _check_common_mistakes(message, symbol, current_price, target_price, direction_text):
     """Detect common mistakes such as missing decimals or unrealistic targets."""
+    suggestion = mistake_suggestion(current_price, target_price)
+    if suggestion is None:
+        return False
 
     # e.g. SOL price = 4$ → user writes 4000$
-    if target_price > 10000 and current_price < 10:
-        suggestion = f"Maybe you meant {target_price/100:.2f} or {target_price/1000:.4f}?"
+    if target_price > current_price:
         await message.answer(
             f"Warning!\n"
             f"The current price of {symbol} is only {current_price:,.4f}\n"
@@ -109,11 +229,8 @@ async def _check_common_mistakes(message, symbol, current_price, target_price, d
             f"{suggestion}\n"
             f"If you're sure, send it again."
         )
-        return True
-
     # e.g. BTC = 40,000$ → user writes 40$
-    if target_price < 100 and current_price > 10000:
-        suggestion = f"Maybe you meant {target_price * 1000:,}?"
+    else:
         await message.answer(
             f"Warning!\n"
             f"{symbol} is currently around {current_price:,.0f} dollars\n"
@@ -121,27 +238,202 @@ async def _check_common_mistakes(message, symbol, current_price, target_price, d
             f"{suggestion}\n"
             f"If you're sure, send it again."
         )
-        return True
+    return True
 
-    return False
+
+def mistake_suggestion(current_price: float, target_price: float) -> str | None:
+    """"Maybe you meant …?" for targets that look like a misplaced decimal point, else None."""
+    if target_price > 10000 and current_price < 10:
+        return f"Maybe you meant {target_price/100:.2f} or {target_price/1000:.4f}?"
+    if target_price < 100 and current_price > 10000:
+        return f"Maybe you meant {target_price * 1000:,}?"
+    return None
 
 
 # ---------- HANDLE /LIST COMMAND ----------
 async def list_handler(message: types.Message):
-    """Show all active alerts for the user."""
-    
-    # Get alerts for this user
-    user_alerts = get_user_alerts(message.chat.id)
-    if not user_alerts:
+    """
+    Show the user's alerts one page at a time: /list [SYMBOL] [near].
+    "near" sorts by distance from the current price instead of by creation.
+    """
+    sort, symbol = "t", None
+    for arg in message.text.split()[1:]:
+        if arg.lower() in ("near", "distance"):
+            sort = "d"
+        else:
+            symbol = arg.upper()
+
+    if count_user_alerts(message.chat.id) == 0:
         return await message.answer("You have no warning.")
 
-    text = "*📃 Your active alerts:*\n\n"
+    # The filter ends up in the Markdown header and the buttons' callback data
+    if symbol and symbol not in user_symbols(message.chat.id):
+        valid = symbol.isascii() and symbol.isalnum() and len(symbol) <= MAX_FILTER_LEN
+        error = symbol_error(symbol) if valid else "ℹ Example: /list BTC or /list near"
+        if error:
+            return await message.answer(error)
+
+    text, keyboard = _render_page(message.chat.id, sort, symbol, "", "")
+    await message.answer(text, reply_markup=keyboard, parse_mode="Markdown")
+
+
+# ---------- /LIST BUTTONS ----------
+# Callback data (Telegram allows 64 bytes):
+#   "l:<sort>:<symbol>:<mode>:<cursor>"               show a page
+#   "x:<alert id>:<sort>:<symbol>:<first cursor>"     delete one alert, then redraw the same page
+# sort: "t" creation order, "d" distance from price; mode: "a" after / "b" before / "s" from cursor, "" first page.
+# Cursors are an alert id ("t") or "<distance>/<alert id>" ("d"), so pages stay stable as alerts come and go.
+# Buttons from an older format (or forged data) are answered with "Expired".
+async def list_callback(callback: types.CallbackQuery):
+    """Navigate /list pages or change their sort / filter."""
+    try:
+        _, sort, symbol, mode, cursor = callback.data.split(":", 4)
+        _check_view(sort, mode, cursor)
+    except ValueError:
+        return await callback.answer("Expired")
+    await _redraw(callback, sort, symbol or None, mode, cursor)
+    await callback.answer()
+
+
+async def delete_callback(callback: types.CallbackQuery):
+    """Remove one alert by its stable id from a /list page."""
+    try:
+        _, alert_id, sort, symbol, cursor = callback.data.split(":", 4)
+        alert_id = int(alert_id)
+        _check_view(sort, "s", cursor)
+    except ValueError:
+        return await callback.answer("Expired")
+    removed = remove_user_alert(callback.message.chat.id, alert_id)
+    await _redraw(callback, sort, symbol or None, "s", cursor)
+    await callback.answer(f"Alert #{alert_id} removed" if removed else f"Alert #{alert_id} is already gone")
+
+
+def _check_view(sort: str, mode: str, cursor: str):
+    """Raise ValueError unless sort, mode and cursor are ones _render_page puts on its buttons."""
+    if sort not in ("t", "d") or mode not in ("", "a", "b", "s"):
+        raise ValueError(f"unknown /list view {sort!r}/{mode!r}")
+    if mode:
+        _parse_cursor(cursor) if sort == "d" else int(cursor)
+
+
+async def _redraw(callback: types.CallbackQuery, sort: str, symbol: str | None, mode: str, cursor: str):
+    chat_id = callback.message.chat.id
+    if count_user_alerts(chat_id) == 0:
+        return await callback.message.edit_text("You have no warning.")
+
+    text, keyboard = _render_page(chat_id, sort, symbol, mode, cursor)
+    try:
+        await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="Markdown")
+    except TelegramBadRequest:
+        pass  # "message is not modified": same page clicked twice
+
+
+def _render_page(chat_id: int, sort: str, symbol: str | None, mode: str, cursor: str):
+    """Text and inline keyboard of one /list page."""
+    prices, _ = get_snapshot()
+    alerts, has_prev, has_next = _page(chat_id, sort, symbol, mode, cursor, prices)
+    if not alerts and mode:
+        # The page emptied out (e.g. its last alert was deleted) → back to the first one
+        alerts, has_prev, has_next = _page(chat_id, sort, symbol, "", "", prices)
+
+    total = count_user_alerts(chat_id)
+    header = f"*📃 Your active alerts ({total:,})*"
+    if symbol:
+        header += f" · {symbol} only"
+    if sort == "d":
+        header += " · nearest first"
+    lines = [header, ""]
+    for a in alerts:
+        distance = _distance(a, prices)
+        suffix = f" ({distance * 100:+.2f}% away)" if distance != math.inf else ""
+        lines.append(f"#{a['id']} {_describe(a)}{suffix}")
+    if not alerts:
+        lines.append(f"No alerts for {symbol}." if symbol else "No alerts.")
+
+    sym = symbol or ""
+    first = _cursor(alerts[0], sort, prices) if alerts else ""
+    buttons = [InlineKeyboardButton(text=f"✖ #{a['id']}", callback_data=f"x:{a['id']}:{sort}:{sym}:{first}")
+               for a in alerts]
+    rows = [buttons[i:i + 5] for i in range(0, len(buttons), 5)]
+
+    nav = []
+    if has_prev:
+        nav.append(InlineKeyboardButton(text="◀ Prev", callback_data=f"l:{sort}:{sym}:b:{first}"))
+    if has_next:
+        nav.append(InlineKeyboardButton(text="Next ▶", callback_data=f"l:{sort}:{sym}:a:{_cursor(alerts[-1], sort, prices)}"))
+    if nav:
+        rows.append(nav)
+
+    options = [InlineKeyboardButton(text="🕒 By date" if sort == "d" else "🎯 Nearest first",
+                                    callback_data=f"l:{'t' if sort == 'd' else 'd'}:{sym}::")]
+    if symbol:
+        options.append(InlineKeyboardButton(text="All symbols", callback_data=f"l:{sort}:::"))
+    rows.append(options)
+
+    if not symbol:
+        symbols = user_symbols(chat_id)
+        if 1 < len(symbols) <= FILTER_BUTTONS:
+            rows.append([InlineKeyboardButton(text=s, callback_data=f"l:{sort}:{s}::") for s in symbols])
+
+    return "\n".join(lines), InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+def _page(chat_id: int, sort: str, symbol: str | None, mode: str, cursor: str, prices: dict):
+    """(alerts, has_previous, has_next) for one page."""
+    if sort != "d":
+        position = {"a": "after", "b": "before", "s": "start"}.get(mode)
+        kwargs = {position: int(cursor)} if position else {}
+        return user_alert_page(chat_id, PAGE_SIZE, symbol=symbol, **kwargs)
+
+    # Distance order changes with every tick, so there is no stored index for it:
+    # key the user's alerts once and keep only a page worth (O(n log k))
+    keyed = [((abs(_distance(a, prices)), a["id"]), a) for a in get_user_alerts(chat_id)
+             if symbol is None or a["symbol"] == symbol]
+    key = _parse_cursor(cursor) if mode else None
+    if mode == "b":
+        found = heapq.nlargest(PAGE_SIZE + 1, (k for k in keyed if k[0] < key), key=lambda k: k[0])
+        page = found[:PAGE_SIZE][::-1]
+        return [a for _, a in page], len(found) > PAGE_SIZE, bool(page) and any(k[0] > page[-1][0] for k in keyed)
+
+    if mode == "a":
+        candidates = (k for k in keyed if k[0] > key)
+    elif mode == "s":
+        candidates = (k for k in keyed if k[0] >= key)
+    else:
+        candidates = keyed
+    found = heapq.nsmallest(PAGE_SIZE + 1, candidates, key=lambda k: k[0])
+    page = found[:PAGE_SIZE]
+    return [a for _, a in page], bool(page) and any(k[0] < page[0][0] for k in keyed), len(found) > PAGE_SIZE
+
+
+def _distance(alert: dict, prices: dict) -> float:
+    """Signed fraction the price must move to reach an up/down target (inf for other types / no price)."""
+    current = prices.get(alert["symbol"])
+    if current is None or alert["type"] not in ("up", "down"):
+        return math.inf
+    return alert["price"] / current - 1
+
+
+def _cursor(alert: dict, sort: str, prices: dict) -> str:
+    if sort != "d":
+        return str(alert["id"])
+    return f"{abs(_distance(alert, prices))!r}/{alert['id']}"
+
+
+def _parse_cursor(cursor: str) -> tuple:
+    distance, alert_id = cursor.split("/")
+    return float(distance), int(alert_id)
+
 
-    # Build alerts text
-    for i, a in enumerate(user_alerts, 1):
-        direction = "up" if a["type"] == "up" else "down"
-        text += f"{i}. {a['symbol']} {direction} {a['price']:,.0f}\n"
-    await message.answer(text, parse_mode="Markdown")
+def _describe(alert: dict) -> str:
+    """One-line summary of an alert of any type."""
+    symbol, alert_type = alert["symbol"], alert["type"]
+    if alert_type == "trail":
+        return f"{symbol} trailing {alert['price']:g}% (peak {alert['param']:,.4f})"
+    if alert_type.startswith("move"):
+        sign = {"move": "±", "move_up": "+", "move_down": "-"}[alert_type]
+        return f"{symbol} move {sign}{alert['price']:g}% in {window_label(alert['param'])}"
+    return f"{symbol} {alert_type} {alert['price']:,.0f}"
     
 
 # ---------- CLEAR USER ALERTS ----------
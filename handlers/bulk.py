@@ -0,0 +1,223 @@
+# handlers/bulk.py - Import many alerts from one message / CSV file, export them in the same format
+
+import io
+from typing import Dict, List, Tuple
+from aiogram import types
+from aiogram.types import BufferedInputFile
+from database.alerts import add_alerts, get_user_alerts, recent_move
+from database.rolling import MOVE_WINDOWS, window_label
+from handlers.alerts import immediate_reason, mistake_suggestion
+from services.providers import get_prices
+from services.snapshot import get_snapshot, snapshot_age
+from services.symbols import symbol_error
+from config import PRICE_CACHE_TTL
+
+MAX_IMPORT_LINES = 200        # alerts per import
+MAX_IMPORT_BYTES = 64 * 1024  # uploaded CSV size
+BATCH_LIMIT = 100             # more symbols than this → fetch the full ticker list instead of a batch
+EXPORT_INLINE = 50            # larger exports are sent as a CSV file
+MAX_REJECTS_SHOWN = 20
+
+USAGE = (
+    "ℹ Send one alert per line after /import, or upload a CSV file with /import as its caption:\n\n"
+    "`/import\n"
+    "BTC up 65000\n"
+    "ETH down 3000\n"
+    "SOL move 5 1h\n"
+    "BNB trail 4`\n\n"
+    "Commas work as separators too (`BTC,up,65000`). /export gives your alerts in this format."
+)
+
+
+# ---------- HANDLE /IMPORT COMMAND ----------
+async def import_handler(message: types.Message):
+    """Validate every line against one price snapshot, add the good ones in one batch, reply once."""
+    lines = await _read_lines(message)
+    if lines is None:
+        return
+    if not lines:
+        return await message.answer(USAGE, parse_mode="Markdown")
+    if len(lines) > MAX_IMPORT_LINES:
+        return await message.answer(f"Too many lines ({len(lines)}). Import at most {MAX_IMPORT_LINES} at once.")
+
+    # 1) Syntax and symbols — no network
+    parsed, rejected = [], []
+    for number, line in lines:
+        result = _parse_line(line)
+        if isinstance(result, str):
+            rejected.append((number, line, result))
+        else:
+            parsed.append((number, line, result))
+
+    # 2) One price snapshot for every symbol in the import
+    prices = await _snapshot_for({row[0] for _, _, row in parsed})
+
+    # 3) Same checks as /up, /down, /move, /trail, against that snapshot
+    existing = {_key(a) for a in get_user_alerts(message.chat.id)}
+    accepted = []
+    for number, line, (symbol, value, alert_type, param) in parsed:
+        current = prices.get(symbol)
+        if current is None:
+            rejected.append((number, line, "no price available right now"))
+            continue
+
+        key = (symbol, alert_type, value, param)
+        reason = _check(symbol, value, alert_type, param, current)
+        if reason is None and key in existing:
+            reason = "you already have this alert"
+        if reason is not None:
+            rejected.append((number, line, reason))
+            continue
+
+        existing.add(key)
+        if alert_type == "trail":
+            param = current  # the peak starts at the current price
+        accepted.append((symbol, value, alert_type, param))
+
+    # 4) One batched insert
+    add_alerts(message.chat.id, accepted)
+    await message.answer(_summary(len(accepted), sorted(rejected)))
+
+
+def _check(symbol: str, value: float, alert_type: str, param, current: float) -> str | None:
+    """Reason to reject an alert given the current price, or None."""
+    if alert_type in ("up", "down"):
+        if immediate_reason(alert_type, current, value) is not None:
+            return f"would trigger immediately (now {current:,.4f})"
+        suggestion = mistake_suggestion(current, value)
+        if suggestion is not None:
+            return f"looks mistyped, {symbol} is at {current:,.4f}. {suggestion}"
+        return None
+
+    if alert_type.startswith("move"):
+        moved = recent_move(symbol, int(param), current)
+        if moved is not None:
+            rise, fall = moved
+            if (alert_type != "move_down" and rise >= value) or (alert_type != "move_up" and fall >= value):
+                return f"already moved {max(rise, fall):.2f}% within {window_label(param)}"
+    return None
+
+
+def _summary(accepted: int, rejected: List[Tuple[int, str, str]]) -> str:
+    text = f"✔ {accepted} alert{'s' if accepted != 1 else ''} imported"
+    if not rejected:
+        return text + "."
+    text += f", ✖ {len(rejected)} rejected:\n"
+    for number, line, reason in rejected[:MAX_REJECTS_SHOWN]:
+        text += f"\nLine {number}: {line[:40]} → {reason}"
+    if len(rejected) > MAX_REJECTS_SHOWN:
+        text += f"\n… and {len(rejected) - MAX_REJECTS_SHOWN} more"
+    return text
+
+
+# ---------- INPUT ----------
+async def _read_lines(message: types.Message) -> List[Tuple[int, str]] | None:
+    """Numbered non-empty lines from the message body or the attached CSV (None if already answered)."""
+    if message.document is not None:
+        if message.document.file_size and message.document.file_size > MAX_IMPORT_BYTES:
+            await message.answer(f"The file is too large (max {MAX_IMPORT_BYTES // 1024} KB).")
+            return None
+        buffer = await message.bot.download(message.document)
+        try:
+            text = buffer.read().decode("utf-8-sig")
+        except UnicodeDecodeError:
+            await message.answer("The file must be UTF-8 text (CSV).")
+            return None
+        first = 1
+    else:
+        text = message.text or ""
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        first = 2  # line 1 is the /import command itself
+
+    lines = []
+    for number, line in enumerate(text.splitlines(), first):
+        line = line.strip()
+        # Blank lines, comments and a CSV header row are skipped
+        if line and not line.startswith("#") and line.lower().split(",")[0] != "symbol":
+            lines.append((number, line))
+    return lines
+
+
+def _parse_line(line: str):
+    """(symbol, value, type, param) for a valid line, else the reason it's invalid."""
+    fields = line.replace(",", " ").replace(";", " ").split()
+    if len(fields) < 3:
+        return "expected SYMBOL TYPE VALUE"
+
+    symbol, alert_type = fields[0].upper().removesuffix("/USDT"), fields[1].lower()
+    error = symbol_error(symbol)
+    if error:
+        return error.replace("\n", " ")
+
+    try:
+        value = float(fields[2].rstrip("%"))
+    except ValueError:
+        return f"{fields[2]} is not a number"
+
+    if alert_type in ("up", "down"):
+        if value <= 0:
+            return "the price must be positive"
+        return symbol, value, alert_type, None
+
+    if alert_type in ("move", "move_up", "move_down", "trail"):
+        if not 0 < value < 100:
+            return "the percentage must be between 0 and 100"
+        if alert_type == "trail":
+            return symbol, value, alert_type, None
+        label = fields[3].lower() if len(fields) > 3 else "1h"
+        if label not in MOVE_WINDOWS:
+            return "window must be one of " + ", ".join(MOVE_WINDOWS)
+        return symbol, value, alert_type, MOVE_WINDOWS[label]
+
+    return f"unknown type {fields[1]} (up, down, move, move_up, move_down, trail)"
+
+
+async def _snapshot_for(symbols) -> Dict[str, float]:
+    """Prices for every symbol from one snapshot: the checker's if fresh and complete, else one request."""
+    prices, _ = get_snapshot()
+    if symbols and snapshot_age(symbols) <= PRICE_CACHE_TTL:  # every symbol priced recently
+        return {s: prices[s] for s in symbols}
+    if not symbols:
+        return {}
+
+    fetched = await get_prices(symbols if len(symbols) <= BATCH_LIMIT else None)
+    if fetched is None and len(symbols) <= BATCH_LIMIT:
+        # A batch fails as a whole (e.g. a symbol the catalog didn't know yet) → full ticker list
+        fetched = await get_prices()
+    return fetched or {}
+
+
+def _key(alert: dict) -> tuple:
+    """Identity used to skip duplicate imports (trailing stops differ by peak, so only pct counts)."""
+    param = alert.get("param") if alert["type"] != "trail" else None
+    return alert["symbol"], alert["type"], alert["price"], param
+
+
+# ---------- HANDLE /EXPORT COMMAND ----------
+async def export_handler(message: types.Message):
+    """Send the user's alerts as /import lines (a CSV file when there are many)."""
+    user_alerts = get_user_alerts(message.chat.id)
+    if not user_alerts:
+        return await message.answer("You have no alerts to export.")
+
+    rows = [export_fields(a) for a in user_alerts]
+    if len(rows) <= EXPORT_INLINE:
+        lines = "\n".join(" ".join(fields) for fields in rows)
+        return await message.answer(f"/import\n{lines}")
+
+    csv = io.StringIO()
+    csv.write("symbol,type,value,window\n")
+    for fields in rows:
+        csv.write(",".join(fields) + "\n")
+    await message.answer_document(
+        BufferedInputFile(csv.getvalue().encode(), filename="alerts.csv"),
+        caption=f"{len(rows)} alerts — send this file back with the caption /import to restore them.",
+    )
+
+
+def export_fields(alert: dict) -> List[str]:
+    """[symbol, type, value(, window)] — the inverse of _parse_line."""
+    fields = [alert["symbol"], alert["type"], f"{alert['price']:.12g}"]
+    if alert["type"].startswith("move"):
+        fields.append(window_label(alert["param"]))
+    return fields
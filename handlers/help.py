@@ -12,9 +12,10 @@ async def help_handler(message: types.Message):
         
         "Use the commands below to get prices or set alerts:\n\n"
 
-        "• /price SYMBOL\n"
-        "  Get the current market price of a cryptocurrency.\n"
-        "  Example: `/price BTC`\n\n"
+        "• /price SYMBOL [1h|24h|7d|30d]\n"
+        "  Get the current market price of a cryptocurrency,\n"
+        "  with its 1h / 24h change, high, low and a small chart of the chosen period.\n"
+        "  Example: `/price BTC` or `/price BTC 7d`\n\n"
 
         "• /up SYMBOL TARGET_PRICE\n"
         "  Alert triggers when the price goes *above* the target.\n"
@@ -24,9 +25,26 @@ async def help_handler(message: types.Message):
         "  Alert triggers when the price goes *below* the target.\n"
         "  Example: `/down ETH 3000`\n\n"
 
-        "• /list\n"
-        "  Shows all active alerts you have.\n"
-        "  Useful when you've set multiple alerts.\n\n"
+        "• /move SYMBOL PERCENT [WINDOW]\n"
+        "  Alert triggers when the price moves that much within the window (5m, 15m, 1h, 4h, 24h; default 1h).\n"
+        "  Use +3 or -3 to watch one direction only.\n"
+        "  Example: `/move BTC 3 1h`\n\n"
+
+        "• /trail SYMBOL PERCENT\n"
+        "  Trailing stop: triggers when the price falls that much below its highest price since you set it.\n"
+        "  Example: `/trail ETH 5`\n\n"
+
+        "• /list [SYMBOL] [near]\n"
+        "  Shows your active alerts, 10 per page, with buttons to page through them and delete single alerts.\n"
+        "  Add a symbol to see only its alerts, or `near` to see the alerts closest to triggering first.\n"
+        "  Example: `/list BTC near`\n\n"
+
+        "• /import\n"
+        "  Add many alerts at once: one `SYMBOL up|down PRICE` per line after the command,\n"
+        "  or a CSV file sent with /import as its caption. You get one summary reply.\n\n"
+
+        "• /export\n"
+        "  Your alerts in the same format, ready to /import again.\n\n"
 
         "• /clear\n"
         "  Deletes all your alerts at once.\n"
@@ -0,0 +1,120 @@
+# handlers/middlewares.py - Dispatcher middlewares
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Set, Tuple
+from aiogram import BaseMiddleware
+from aiogram.types import Message
+from utils.metrics import HANDLER_SECONDS, FLOOD_CONTROL
+from utils.token_bucket import TokenBucket
+from config import ADMIN_IDS, FLOOD_RATE, FLOOD_BURST, IO_CONCURRENCY, IO_WAIT_TIMEOUT
+
+# Commands that may call Binance (price lookups): full bucket cost and a global concurrency slot
+IO_COMMANDS = {"/price", "/up", "/down", "/move", "/trail", "/import"}
+LIGHT_COST = 0.25             # bucket tokens for the other commands (served from memory)
+REJECT_REPLY_INTERVAL = 10    # seconds: a chat hears "slow down" at most once per interval
+
+# Canned replies: rejecting costs no formatting and at most one send per interval
+THROTTLED_TEXT = "⏳ You're sending commands too fast. Please wait a few seconds and try again."
+BUSY_TEXT = "⏳ The bot is very busy right now. Please try again in a moment."
+
+
+# ---------- COMMAND NAME ----------
+def command_name(message: Message) -> str:
+    """Return "/price" for "/price@MyBot BTC", or "other" for non-command messages."""
+    text = message.text or message.caption or ""
+    if not text.startswith("/"):
+        return "other"
+    return text.split(maxsplit=1)[0].split("@", 1)[0].lower()
+
+
+# ---------- HANDLER LATENCY ----------
+class MetricsMiddleware(BaseMiddleware):
+    """Time every handled message, labelled by command."""
+
+    async def __call__(
+        self,
+        handler: Callable[[Message, Dict[str, Any]], Awaitable[Any]],
+        event: Message,
+        data: Dict[str, Any],
+    ) -> Any:
+        with HANDLER_SECONDS.time(command=command_name(event)):
+            return await handler(event, data)
+
+
+# ---------- FLOOD CONTROL ----------
+class FloodControlMiddleware(BaseMiddleware):
+    """
+    Keep one chat from burning the shared Binance budget:
+    - a token bucket per chat (FLOOD_RATE commands/s, bursts of FLOOD_BURST);
+    - at most IO_CONCURRENCY handlers that may call Binance running at once, all chats together;
+    - an identical command from the same chat while the first is still running is dropped
+      (coalesced: the first one's reply answers both).
+    Rejected commands get a canned reply, sent at most once per REJECT_REPLY_INTERVAL per chat.
+    Admins are never limited.
+    """
+
+    def __init__(self, rate: float = FLOOD_RATE, burst: float = FLOOD_BURST,
+                 io_concurrency: int = IO_CONCURRENCY, io_wait: float = IO_WAIT_TIMEOUT):
+        self.rate = rate
+        self.burst = burst
+        self.io_wait = io_wait
+        self.io_slots = asyncio.Semaphore(io_concurrency)
+        self.buckets: Dict[int, TokenBucket] = {}
+        self.inflight: Set[Tuple[int, str]] = set()   # (chat id, normalized command text)
+        self.replied: Dict[int, float] = {}           # chat id → time.monotonic() of the last rejection reply
+
+    async def __call__(
+        self,
+        handler: Callable[[Message, Dict[str, Any]], Awaitable[Any]],
+        event: Message,
+        data: Dict[str, Any],
+    ) -> Any:
+        command = command_name(event)
+        if command == "other" or (event.from_user is not None and event.from_user.id in ADMIN_IDS):
+            return await handler(event, data)
+
+        chat_id = event.chat.id
+        key = (chat_id, " ".join((event.text or event.caption or "").upper().split()))
+        if key in self.inflight:
+            FLOOD_CONTROL.inc(outcome="coalesced")
+            return None
+
+        io = command in IO_COMMANDS
+        if not self._bucket(chat_id).try_acquire(1.0 if io else LIGHT_COST):
+            FLOOD_CONTROL.inc(outcome="throttled")
+            return await self._reject(event, THROTTLED_TEXT)
+
+        self.inflight.add(key)
+        try:
+            if not io:
+                return await handler(event, data)
+
+            try:
+                await asyncio.wait_for(self.io_slots.acquire(), self.io_wait)
+            except asyncio.TimeoutError:
+                FLOOD_CONTROL.inc(outcome="busy")
+                return await self._reject(event, BUSY_TEXT)
+            try:
+                return await handler(event, data)
+            finally:
+                self.io_slots.release()
+        finally:
+            self.inflight.discard(key)
+
+    def _bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self.buckets.get(chat_id)
+        if bucket is None:
+            # Forget chats whose buckets have fully refilled (keeps the dict small)
+            if len(self.buckets) > 10_000:
+                for idle in [c for c, b in self.buckets.items() if b.is_idle()]:
+                    del self.buckets[idle]
+                    self.replied.pop(idle, None)
+            bucket = self.buckets[chat_id] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    async def _reject(self, event: Message, text: str):
+        now = time.monotonic()
+        if now - self.replied.get(event.chat.id, -REJECT_REPLY_INTERVAL) >= REJECT_REPLY_INTERVAL:
+            self.replied[event.chat.id] = now
+            await event.answer(text)
@@ -2,14 +2,20 @@
 
 from aiogram import types
 from aiogram.filters import Command
-from services.binance import get_price
+from services.price_cache import get_cached_price
+from services.symbols import symbol_error, quote_asset
+from database.history import window_stats, sparkline
+
+CHART_SPANS = {"1h": 3600, "24h": 86400, "7d": 7 * 86400, "30d": 30 * 86400}  # /price BTC 7d
+STAT_WINDOWS = {"1h": 3600, "24h": 86400}
 
 
 # ---------- HANDLE PRICE COMMAND ----------
 async def price_handler(message: types.Message):
     """
     Handle /price command.
-    Fetches the current price of the given cryptocurrency symbol and replies to the user.
+    Fetches the current price of the given cryptocurrency symbol and replies to the user,
+    with 1h / 24h change, high, low and a chart from the local price history (no extra requests).
     """
     # Split the incoming message into command arguments
     args = message.text.split()
@@ -20,15 +26,48 @@ async def price_handler(message: types.Message):
     # Convert the symbol argument to uppercase for consistency
     symbol = args[1].upper()
 
-    # Fetch the current price from Binance API
-    price = await get_price(symbol)
+    # Unknown / halted symbols are rejected from the local catalog, without a Binance request
+    error = symbol_error(symbol)
+    if error:
+        return await message.answer(error)
+
+    span = args[2].lower() if len(args) > 2 else "24h"
+    if span not in CHART_SPANS:
+        return await message.answer("Chart span must be one of: " + ", ".join(CHART_SPANS))
+
+    # Served from the shared price cache; a miss makes one (coalesced) request to the price providers
+    price = await get_cached_price(symbol)
 
     if price is not None:
+        quote = quote_asset(symbol)
+        pair = f"{symbol}/USDT" if quote == "USDT" else f"{symbol}/USDT (via {symbol}/{quote})"
         await message.answer(
         f"*📌 Live Price*\n\n"
-        f"{symbol}/USDT\n"
-        f"💲 {price:,.2f} dollars",
+        f"{pair}\n"
+        f"💲 {price:,.2f} dollars"
+        f"{_history_text(symbol, price, span)}",
         parse_mode="Markdown"
     )
     else:
         await message.answer(f"🛑 Currency {symbol} not found or there is an error")
+
+
+# ---------- LOCAL HISTORY ----------
+def _history_text(symbol: str, price: float, span: str) -> str:
+    """1h / 24h stats and a sparkline from recorded snapshots ("" until there is history)."""
+    lines = []
+    for label, window in STAT_WINDOWS.items():
+        stats = window_stats(symbol, window, price)
+        if stats is None:
+            continue
+        # History younger than the window (e.g. just started recording): say what it covers
+        covered = f" (last {stats['covered'] / 60:,.0f}m)" if stats["covered"] < window - 60 else ""
+        lines.append(
+            f"{label}: {stats['change']:+.2f}% · H {stats['high']:,.2f} · L {stats['low']:,.2f}{covered}"
+        )
+
+    chart = sparkline(symbol, CHART_SPANS[span])
+    if chart:
+        lines.append(f"{span}: {chart}")
+
+    return "\n\n" + "\n".join(lines) if lines else ""
@@ -0,0 +1,21 @@
+# handlers/profile.py
+
+from aiogram import types
+from services.watchdog import toggle_profiling
+from config import ADMIN_IDS
+
+MAX_REPLY_LEN = 4000
+
+
+# ---------- PROFILE COMMAND HANDLER (ADMIN ONLY) ----------
+async def profile_handler(message: types.Message):
+    """Toggle the sampling profiler; the second call replies with the hottest stacks."""
+    if message.from_user is None or message.from_user.id not in ADMIN_IDS:
+        return await message.answer("⛔ This command is only available to admins.")
+
+    report = toggle_profiling()
+    if report is None:
+        return await message.answer("🔬 Profiler started. Send /profile again to stop it and get the report.")
+
+    # Plain text: stack frames are full of characters Markdown would choke on
+    await message.answer(f"🔬 Profiler stopped\n\n{report}"[:MAX_REPLY_LEN])
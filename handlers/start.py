@@ -2,7 +2,7 @@
 
 from aiogram import types
 from aiogram.filters import Command
-from config import CHECK_INTERVAL
+from config import POLL_MIN_INTERVAL, POLL_MAX_INTERVAL
 
 # ---------- START COMMAND HANDLER ----------
 async def start_handler(message: types.Message):
@@ -10,7 +10,8 @@ async def start_handler(message: types.Message):
     text = (
         "🚀 Welcome to *Coin Tracker Bot*!\n\n"
         "This bot provides cryptocurrency price alerts and notifications.\n"
-        f"Prices are updated every {CHECK_INTERVAL} seconds.\n\n"
+        f"Prices are checked every {POLL_MIN_INTERVAL:g}–{POLL_MAX_INTERVAL:g} seconds "
+        "(more often when close to your target).\n\n"
         "Use */help* to see all available commands and examples."
     )
     
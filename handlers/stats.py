@@ -0,0 +1,74 @@
+# handlers/stats.py
+
+from aiogram import types
+from database.alerts import store, user_slots, symbol_refs
+from services.binance_client import client as binance_client
+from services.notifier import queue_size
+from services.price_cache import cache_stats
+from services.providers import pool as provider_pool
+from services.snapshot import snapshot_age
+from services.symbols import catalog_size, catalog_age
+from database.history import history_size
+from services import watchdog
+from utils.metrics import (
+    CHECK_CYCLE_SECONDS, BINANCE_REQUESTS, BINANCE_REQUEST_SECONDS,
+    ALERTS_TRIGGERED, NOTIFICATIONS, NOTIFY_SEND_SECONDS, LOOP_LAG_SECONDS, FLOOD_CONTROL, PROVIDER_HEDGES,
+)
+from config import ADMIN_IDS
+
+
+# ---------- STATS COMMAND HANDLER (ADMIN ONLY) ----------
+async def stats_handler(message: types.Message):
+    """Show a short operational summary to bot admins."""
+    if message.from_user is None or message.from_user.id not in ADMIN_IDS:
+        return await message.answer("⛔ This command is only available to admins.")
+
+    cache = cache_stats()
+    requests = BINANCE_REQUESTS.values
+    errors = sum(v for (endpoint, status), v in requests.items() if str(status) != "200")
+
+    age = catalog_age()
+    catalog_text = f"{catalog_size():,} pairs, {age / 60:,.0f} min old" if age is not None else "not loaded"
+
+    providers = ", ".join(
+        f"{p['name']} {p['score']:.2f}" + (f" ({p['state'].replace('_', '-')})" if p["state"] != "closed" else "")
+        for p in provider_pool.health()
+    )
+
+    text = (
+        "📊 *Bot stats*\n\n"
+        f"Alerts pending: {len(store):,}\n"
+        f"Users with alerts: {len(user_slots):,}\n"
+        f"Symbols watched: {len(symbol_refs):,}\n"
+        f"Alerts triggered: {ALERTS_TRIGGERED.total():,.0f}\n\n"
+        f"Check cycles: {CHECK_CYCLE_SECONDS.count():,} "
+        f"(avg {CHECK_CYCLE_SECONDS.mean() * 1000:,.1f} ms, "
+        f"p99 ≤ {CHECK_CYCLE_SECONDS.quantile(0.99) * 1000:,.0f} ms)\n"
+        f"Snapshot age: {snapshot_age():,.1f} s\n"
+        f"Symbol catalog: {catalog_text}\n"
+        f"Price history: {history_size():,} symbols recording\n"
+        f"Event loop lag: {watchdog.last_lag * 1000:,.1f} ms now, "
+        f"p99 ≤ {LOOP_LAG_SECONDS.quantile(0.99) * 1000:,.0f} ms\n\n"
+        f"Binance requests: {sum(requests.values()):,.0f} ({errors:,.0f} failed), "
+        f"avg {_mean_ms(BINANCE_REQUEST_SECONDS):,.1f} ms\n"
+        f"Binance weight: {binance_client.used_weight:,}/{binance_client.weight_limit:,} per min, "
+        f"{binance_client.open_circuits()} of {len(binance_client.hosts)} hosts down\n"
+        f"Price providers: {providers}; {PROVIDER_HEDGES.total():,.0f} hedged requests\n"
+        f"Price cache: {cache['hits']:,} hits / {cache['misses']:,} misses / "
+        f"{cache['coalesced']:,} coalesced\n"
+        f"Flood control: {_count(FLOOD_CONTROL, 'throttled'):,.0f} throttled / "
+        f"{_count(FLOOD_CONTROL, 'coalesced'):,.0f} coalesced / {_count(FLOOD_CONTROL, 'busy'):,.0f} busy\n\n"
+        f"Notifications sent: {NOTIFICATIONS.values.get(('sent',), 0):,.0f}, "
+        f"queued: {queue_size():,}, avg send {NOTIFY_SEND_SECONDS.mean() * 1000:,.1f} ms"
+    )
+    await message.answer(text, parse_mode="Markdown")
+
+
+def _mean_ms(histogram) -> float:
+    """Mean across every label set of a histogram, in milliseconds."""
+    count = sum(sum(c) for c in histogram.counts.values())
+    return sum(histogram.sums.values()) / count * 1000 if count else 0.0
+
+
+def _count(counter, label: str) -> float:
+    return counter.values.get((label,), 0)
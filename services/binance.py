@@ -1,36 +1,249 @@
 # services/binance.py
 
+from typing import Awaitable, Callable, Dict, Iterable, Tuple
+import asyncio
+import json
+import aiohttp
+from services.binance_client import client
 from services.session import get_session
+from utils.circuit_breaker import backoff_delay
 from utils.logger import log
+from config import BINANCE_WS_URL, BINANCE_WS_STREAM, BINANCE_QUOTE_FALLBACKS
+
+TICKER_PATH = "/api/v3/ticker/price"
+EXCHANGE_INFO_PATH = "/api/v3/exchangeInfo"
+QUOTE_ASSET = "USDT"
+QUOTE_FALLBACKS = BINANCE_QUOTE_FALLBACKS  # tried in order for coins without a trading USDT pair
+STABLE_QUOTES = {"USDT", "USDC", "FDUSD"}  # priced 1:1 in USDT; other quotes via their own USDT pair
+
+# Request weights (see Binance API docs) — counted against the per-minute IP budget
+TICKER_WEIGHT = 2          # one symbol
+TICKER_BULK_WEIGHT = 4     # several symbols or all of them
+EXCHANGE_INFO_WEIGHT = 20
+
+WS_URL = BINANCE_WS_URL
+WS_STREAM = BINANCE_WS_STREAM  # "miniTicker" (1s updates) or "trade" (every trade)
+WS_RESYNC_INTERVAL = 1.0       # seconds between checks of the watched symbol set
+WS_BACKOFF_MAX = 30            # cap for reconnect delay (seconds)
+WS_MAX_FAILURES = 5            # consecutive failed connections before falling back to REST
+WS_MAX_STREAMS = 1024          # Binance's limit of streams per connection
+WS_ALL_MARKET = "!miniTicker@arr"  # every symbol's miniTicker, one array per second
+
+alt_quotes: Dict[str, str] = {}               # base asset → quote used instead of USDT (from the symbol catalog)
+_alt_pairs: Dict[str, Tuple[str, str]] = {}   # "XYZBTC" → ("XYZ", "BTC")
+_cross_rates: Dict[str, float] = {}           # non-stable quote → its latest USDT price seen on the stream
+
+
+# ---------- QUOTE ASSETS ----------
+def set_alt_quotes(mapping: Dict[str, str]):
+    """Coins quoted in something other than USDT (set by the symbol catalog on every refresh)."""
+    global alt_quotes, _alt_pairs
+    alt_quotes = dict(mapping)
+    _alt_pairs = {f"{base}{quote}": (base, quote) for base, quote in alt_quotes.items()}
+
+
+def pair_name(symbol: str) -> str:
+    """The Binance pair a coin is priced from: "BTCUSDT", or e.g. "XYZBTC" for a BTC-only listing."""
+    symbol = symbol.upper()
+    return f"{symbol}{alt_quotes.get(symbol, QUOTE_ASSET)}"
+
+
+def _cross_pairs(symbols: Iterable[str]) -> set:
+    """USDT pairs needed to convert the non-stable quotes these coins use (e.g. BTCUSDT)."""
+    return {f"{alt_quotes[s]}{QUOTE_ASSET}" for s in symbols
+            if s in alt_quotes and alt_quotes[s] not in STABLE_QUOTES}
+
+
+def _in_usdt(price: float, quote: str, usdt_prices: Dict[str, float]) -> float | None:
+    """Convert a price in `quote` to USDT (None while the quote's own USDT price is unknown)."""
+    if quote in STABLE_QUOTES:
+        return price
+    rate = usdt_prices.get(quote)
+    return price * rate if rate is not None else None
 
 
 # ---------- GET PRICE FROM BINANCE ----------
-async def get_price(symbol: str) -> float | None:
+async def get_price(symbol: str, raise_rejected: bool = False) -> float | None:
     """
     Fetch the latest USDT price for a given symbol using Binance API.
     Returns the price as float on success, or None on API/network failure.
+    Retries, failover and rate limiting happen in the client (services/binance_client.py).
+    With raise_rejected, an unknown symbol raises RequestRejected instead of returning None.
+    """
+    symbol = symbol.upper()
+    if symbol in alt_quotes:
+        # Priced from another quote → one batch with the conversion pair
+        prices = await get_prices([symbol], raise_rejected=raise_rejected)
+        return prices.get(symbol) if prices is not None else None
+
+    params = {"symbol": f"{symbol}{QUOTE_ASSET}"}
+    data = await client.get_json(TICKER_PATH, params, weight=TICKER_WEIGHT, endpoint="price",
+                                 raise_rejected=raise_rejected)
+    return float(data["price"]) if data is not None else None
+
+
+# ---------- GET MANY PRICES IN ONE REQUEST ----------
+async def get_prices(symbols: Iterable[str] | None = None,
+                     raise_rejected: bool = False) -> Dict[str, float] | None:
+    """
+    Fetch USDT prices for many symbols with a single Binance request.
+    With no symbols, every ticker is fetched (same request weight as a batch).
+    Returns a {symbol: price} map keyed by base asset, or None on failure.
+    Coins listed only against another quote are converted to USDT (see parse_tickers).
+    With raise_rejected, a batch Binance refuses (an unknown symbol in it) raises RequestRejected.
+    """
+
+    params = None
+    if symbols is not None:
+        symbols = [s.upper() for s in symbols]
+        if not symbols:
+            return {}
+        pairs = list(dict.fromkeys([pair_name(s) for s in symbols] + sorted(_cross_pairs(symbols))))
+        params = {"symbols": json.dumps(pairs, separators=(",", ":"))}
+
+    endpoint = "prices_all" if symbols is None else "prices_batch"
+    data = await client.get_json(TICKER_PATH, params, weight=TICKER_BULK_WEIGHT, endpoint=endpoint,
+                                 raise_rejected=raise_rejected)
+    return parse_tickers(data) if data is not None else None
+
+
+# ---------- EXCHANGE INFO (SYMBOL CATALOG) ----------
+async def get_exchange_info() -> list | None:
+    """
+    Fetch the trading rules of every spot pair (request weight 20, so call rarely).
+    Returns Binance's "symbols" list, or None on failure.
+    """
+    data = await client.get_json(EXCHANGE_INFO_PATH, weight=EXCHANGE_INFO_WEIGHT,
+                                 endpoint="exchange_info", timeout=30)
+    return data["symbols"] if data is not None else None
+
+
+# ---------- PARSE TICKER LIST ----------
+def parse_tickers(data: list) -> Dict[str, float]:
+    """
+    Turn Binance's [{"symbol": "BTCUSDT", "price": "..."}] list into {"BTC": price}.
+    Coins in alt_quotes are read from their own pair and converted to USDT.
     """
-    
-    # Build Binance price URL
-    url = f"https://api.binance.com/api/v3/ticker/price?symbol={symbol.upper()}USDT"
-
-    session = await get_session()   # shared session
-
-    try:
-        # Send GET request to Binance API
-        async with session.get(url, timeout=10) as resp:
-
-            # If request succeeded → parse JSON and extract price
-            if resp.status == 200:
-                data = await resp.json()     # Parse JSON response
-                return float(data["price"])  # Convert price to float
-            
-            # Non-200 status → Binance returned an error
-            else:
-                log.warning(f"Binance error {resp.status} for {symbol}")
-                return None
-            
-    # Network errors, timeout, JSON errors, etc.
-    except Exception as e:
-        log.error(f"Binance connection error for {symbol}: {e}")
-        return None
+    prices = {}
+    other = []
+    suffix_len = len(QUOTE_ASSET)
+
+    for item in data:
+        pair = item["symbol"]
+        if pair.endswith(QUOTE_ASSET) and len(pair) > suffix_len:
+            prices[pair[:-suffix_len]] = float(item["price"])
+        elif pair in _alt_pairs:
+            other.append((pair, float(item["price"])))
+
+    # Second pass: the conversion rate (e.g. BTCUSDT) may come later in the list
+    for pair, price in other:
+        base, quote = _alt_pairs[pair]
+        converted = _in_usdt(price, quote, prices)
+        if converted is not None:
+            prices[base] = converted
+
+    return prices
+
+
+# ---------- STREAMING PRICE FEED (WEBSOCKET) ----------
+def _stream_name(pair: str) -> str:
+    return f"{pair.lower()}@{WS_STREAM}"
+
+
+def _stream_names(symbols: Iterable[str]) -> set:
+    """
+    Streams for these coins, plus the USDT pairs that convert their non-stable quotes.
+    More than one connection allows → the all-market miniTicker stream instead.
+    """
+    symbols = [s.upper() for s in symbols]
+    names = {_stream_name(p) for p in [pair_name(s) for s in symbols] + list(_cross_pairs(symbols))}
+    return names if len(names) <= WS_MAX_STREAMS else {WS_ALL_MARKET}
+
+
+def parse_stream_message(data) -> Dict[str, float]:
+    """
+    Extract {symbol: price} from a miniTicker / trade event (or an array of them).
+    Subscription acks ({"result": null, "id": 1}) yield an empty dict.
+    Alt-quote pairs are converted with the last streamed rate of their quote.
+    """
+    events = data if isinstance(data, list) else [data.get("data", data)]
+    suffix_len = len(QUOTE_ASSET)
+    prices = {}
+
+    for event in events:
+        pair = event.get("s")
+        price = event.get("c", event.get("p"))  # miniTicker close / trade price
+        if not pair or price is None:
+            continue
+        if pair.endswith(QUOTE_ASSET):
+            base = pair[:-suffix_len]
+            prices[base] = float(price)
+            if base in QUOTE_FALLBACKS:
+                _cross_rates[base] = float(price)
+        elif pair in _alt_pairs:
+            base, quote = _alt_pairs[pair]
+            converted = _in_usdt(float(price), quote, _cross_rates)
+            if converted is not None:
+                prices[base] = converted
+
+    return prices
+
+
+async def stream_prices(
+    on_prices: Callable[[Dict[str, float]], Awaitable[None]],
+    get_symbols: Callable[[], Iterable[str]],
+    url: str = WS_URL,
+    max_failures: int = WS_MAX_FAILURES,
+):
+    """
+    Subscribe to per-symbol Binance streams (or the all-market one past WS_MAX_STREAMS)
+    and push every update to on_prices.
+
+    - Resubscribes (SUBSCRIBE / UNSUBSCRIBE) whenever get_symbols() changes
+    - Reconnects automatically with exponential backoff
+    - Returns after max_failures consecutive failed connections so the caller can fall back to REST
+    """
+    failures = 0
+    request_id = 0
+
+    while failures < max_failures:
+        session = await get_session()
+        subscribed: set = set()
+
+        try:
+            async with session.ws_connect(url, heartbeat=30, timeout=10) as ws:
+                log.info(f"Binance stream connected: {url}")
+                failures = 0
+
+                while True:
+                    # Keep subscriptions in sync with the watched symbols
+                    wanted = _stream_names(get_symbols())
+                    for method, streams in (("SUBSCRIBE", wanted - subscribed),
+                                            ("UNSUBSCRIBE", subscribed - wanted)):
+                        if streams:
+                            request_id += 1
+                            await ws.send_json({"method": method, "params": sorted(streams), "id": request_id})
+                    subscribed = wanted
+
+                    try:
+                        msg = await ws.receive(timeout=WS_RESYNC_INTERVAL)
+                    except asyncio.TimeoutError:
+                        continue  # no traffic, just re-check the symbol set
+
+                    if msg.type == aiohttp.WSMsgType.TEXT:
+                        prices = parse_stream_message(json.loads(msg.data))
+                        if prices:
+                            await on_prices(prices)
+                    elif msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED,
+                                      aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.ERROR):
+                        raise ConnectionError(f"stream closed ({msg.type.name})")
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            failures += 1
+            delay = backoff_delay(failures, base=1, cap=WS_BACKOFF_MAX)
+            log.warning(f"Binance stream error ({failures}/{max_failures}): {e} — reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    log.error(f"Binance stream failed {max_failures} times in a row — giving up")
@@ -0,0 +1,177 @@
+# services/binance_client.py - Binance REST client: retries, request-weight budget, mirror failover
+
+import asyncio
+import time
+from typing import Any, Dict, List
+import aiohttp
+from services.session import get_session
+from utils.circuit_breaker import CircuitBreaker, backoff_delay
+from utils.logger import log
+from utils.metrics import BINANCE_REQUEST_SECONDS, BINANCE_REQUESTS, BINANCE_RETRIES
+from config import BINANCE_API_HOSTS, BINANCE_MAX_RETRIES, BINANCE_WEIGHT_LIMIT, PROVIDER_HEDGE_DELAY
+
+WEIGHT_HEADER = "X-MBX-USED-WEIGHT-1M"
+WEIGHT_SAFETY = 0.9       # throttle ourselves at 90% of the per-minute budget
+MAX_THROTTLE_WAIT = 10    # seconds a request may wait for budget before giving up
+BREAKER_THRESHOLD = 5     # consecutive failures that take a host out of rotation
+BREAKER_COOLDOWN = 30     # seconds before a failed host gets a trial request
+BAN_STATUSES = (429, 418)  # rate limited / IP banned → stop sending until Retry-After
+SLOW_CANCEL = PROVIDER_HEDGE_DELAY  # a request cancelled after this many seconds counts as a slow (failed) one
+
+
+class RequestRejected(Exception):
+    """Binance answered 4xx (other than a rate limit): the request is wrong, e.g. an unknown symbol."""
+
+
+class BinanceClient:
+    """
+    GET JSON from Binance with:
+    - one shared keep-alive connection pool (services.session)
+    - jittered exponential backoff on 5xx and network errors, moving to the next mirror host
+    - a circuit breaker per host, so a dead mirror is skipped instead of timing out every call
+    - the IP-wide request-weight budget tracked from X-MBX-USED-WEIGHT-1M, throttling before a 429
+    - a full stop until Retry-After once Binance does answer 429 / 418
+    """
+
+    def __init__(self, hosts: List[str], max_retries: int = BINANCE_MAX_RETRIES,
+                 weight_limit: int = BINANCE_WEIGHT_LIMIT):
+        self.hosts = list(hosts)
+        self.max_retries = max_retries
+        self.weight_limit = weight_limit
+        self.breakers: Dict[str, CircuitBreaker] = {
+            h: CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN) for h in self.hosts
+        }
+        self.used_weight = 0      # weight used in the current minute (Binance's count when known)
+        self._window = 0          # minute the count belongs to (Binance resets weight each minute)
+        self._current = 0         # index of the preferred host (kept while it works → warm connections)
+        self.banned_until = 0.0   # time.time() before which nothing is sent
+
+    # ---------- REQUEST ----------
+    async def get_json(self, path: str, params: dict | None = None, weight: int = 1,
+                       endpoint: str = "other", timeout: float | None = None,
+                       raise_rejected: bool = False) -> Any | None:
+        """
+        Return the decoded JSON of a 200 response, or None (failures are logged here).
+        `timeout` (seconds per attempt) overrides the session's HTTP_TIMEOUT; None keeps it.
+        With raise_rejected, a 4xx raises RequestRejected instead, so callers can tell it from an outage.
+        """
+        session = await get_session()
+        # timeout=None would mean "no timeout" to aiohttp → only pass one when asked to
+        request_timeout = {"timeout": aiohttp.ClientTimeout(total=timeout)} if timeout else {}
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                BINANCE_RETRIES.inc(endpoint=endpoint)
+                await asyncio.sleep(backoff_delay(attempt - 1))
+
+            if not await self._reserve(weight, endpoint):
+                return None
+
+            host = self._pick_host()
+            if host is None:
+                log.warning(f"All Binance hosts are unavailable (circuit open) — skipping {endpoint}")
+                BINANCE_REQUESTS.inc(endpoint=endpoint, status="circuit_open")
+                return None
+
+            breaker = self.breakers[host]
+            status, started = "error", time.perf_counter()
+            try:
+                async with session.get(f"{host}{path}", params=params, **request_timeout) as resp:
+                    status = resp.status
+                    self._track_weight(resp.headers)
+
+                    if resp.status == 200:
+                        breaker.success()
+                        return await resp.json()
+
+                    if resp.status in BAN_STATUSES:
+                        breaker.success()  # the host is fine, we are over the limit
+                        retry_after = float(resp.headers.get("Retry-After", 60))
+                        self.banned_until = time.time() + retry_after
+                        log.error(f"Binance rate limit hit ({resp.status}) — pausing requests for {retry_after:g}s")
+                        return None
+
+                    if resp.status < 500:
+                        breaker.success()  # our request is wrong (e.g. unknown symbol) → don't retry
+                        log.warning(f"Binance error {resp.status} for {endpoint} {params or ''}")
+                        if raise_rejected:
+                            raise RequestRejected(f"HTTP {resp.status}")
+                        return None
+
+                    breaker.failure()
+                    log.warning(f"Binance error {resp.status} from {host} ({endpoint}), attempt {attempt + 1}")
+
+            except asyncio.CancelledError:
+                if time.perf_counter() - started >= SLOW_CANCEL:
+                    # Cancelled after the hedge budget (a backup provider won) → this host was slow
+                    breaker.failure()
+                    self._rotate()
+                else:
+                    breaker.release()  # frees a half-open trial slot, keeps the failure count
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                breaker.failure()
+                log.warning(f"Binance connection error from {host} ({endpoint}), attempt {attempt + 1}: "
+                            f"{e or type(e).__name__}")
+            finally:
+                BINANCE_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+                BINANCE_REQUESTS.inc(endpoint=endpoint, status=status)
+
+            self._rotate()
+
+        log.error(f"Binance {endpoint} request failed after {self.max_retries + 1} attempts")
+        return None
+
+    # ---------- HOSTS ----------
+    def _pick_host(self) -> str | None:
+        """The preferred host if its circuit allows, else the next one that does."""
+        for offset in range(len(self.hosts)):
+            i = (self._current + offset) % len(self.hosts)
+            if self.breakers[self.hosts[i]].allow():
+                self._current = i
+                return self.hosts[i]
+        return None
+
+    def _rotate(self):
+        self._current = (self._current + 1) % len(self.hosts)
+
+    def open_circuits(self) -> int:
+        return sum(1 for b in self.breakers.values() if b.state == "open")
+
+    # ---------- WEIGHT BUDGET ----------
+    def _roll_window(self):
+        window = int(time.time() // 60)
+        if window != self._window:
+            self._window = window
+            self.used_weight = 0
+
+    async def _reserve(self, weight: int, endpoint: str) -> bool:
+        """Count `weight` against this minute's budget, waiting for the next minute if it's spent."""
+        now = time.time()
+        if now < self.banned_until:
+            BINANCE_REQUESTS.inc(endpoint=endpoint, status="banned")
+            return False
+
+        self._roll_window()
+        if self.used_weight + weight > self.weight_limit * WEIGHT_SAFETY:
+            wait = (self._window + 1) * 60 - now
+            if wait > MAX_THROTTLE_WAIT:
+                log.warning(f"Binance weight budget spent ({self.used_weight}/{self.weight_limit}) — "
+                            f"skipping {endpoint}")
+                BINANCE_REQUESTS.inc(endpoint=endpoint, status="throttled")
+                return False
+            await asyncio.sleep(wait)
+            self._roll_window()
+
+        self.used_weight += weight
+        return True
+
+    def _track_weight(self, headers):
+        """Adopt Binance's own count; keep ours if it's higher (requests still in flight)."""
+        value = headers.get(WEIGHT_HEADER)
+        if value is not None:
+            self._roll_window()
+            self.used_weight = max(self.used_weight, int(value))
+
+
+client = BinanceClient(BINANCE_API_HOSTS)
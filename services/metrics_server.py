@@ -0,0 +1,58 @@
+# services/metrics_server.py - Prometheus /metrics HTTP endpoint
+
+from aiohttp import web
+from database.alerts import store, user_slots, symbol_refs
+from services.binance_client import client as binance_client
+from services.notifier import queue_size
+from services.price_cache import cache_stats
+from services.webhook import pending_updates
+from utils.logger import log
+from utils.metrics import Gauge, render_prometheus
+from config import METRICS_HOST, METRICS_PORT
+
+# State gauges are read at scrape time, so they cost nothing between scrapes
+Gauge("alerts_pending", "Alerts waiting to trigger", callback=lambda: len(store))
+Gauge("users_with_alerts", "Chats with at least one alert", callback=lambda: len(user_slots))
+Gauge("symbols_watched", "Symbols with at least one alert", callback=lambda: len(symbol_refs))
+Gauge("binance_used_weight", "Binance request weight used this minute", callback=lambda: binance_client.used_weight)
+Gauge("binance_open_circuits", "Binance hosts currently skipped by the circuit breaker",
+      callback=binance_client.open_circuits)
+Gauge("notification_queue_depth", "Messages waiting to be sent", callback=queue_size)
+Gauge("webhook_pending_updates", "Webhook updates waiting for a handler", callback=pending_updates)
+Gauge("price_cache_hits", "Price cache hits since start", callback=lambda: cache_stats()["hits"])
+Gauge("price_cache_misses", "Price cache misses since start", callback=lambda: cache_stats()["misses"])
+Gauge("price_cache_coalesced", "Requests served by another caller's in-flight fetch",
+      callback=lambda: cache_stats()["coalesced"])
+
+_runner: web.AppRunner | None = None
+
+
+# ---------- HTTP HANDLER ----------
+async def metrics_handler(request: web.Request) -> web.Response:
+    return web.Response(text=render_prometheus(), content_type="text/plain", charset="utf-8",
+                        headers={"X-Content-Type-Options": "nosniff"})
+
+
+# ---------- START / STOP ----------
+async def start_metrics_server(host: str = METRICS_HOST, port: int = METRICS_PORT):
+    """Serve GET /metrics (disabled when port is 0)."""
+    global _runner
+
+    if not port:
+        return
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics_handler)
+
+    _runner = web.AppRunner(app, access_log=None)
+    await _runner.setup()
+    await web.TCPSite(_runner, host, port).start()
+    log.info(f"Metrics endpoint: http://{host}:{port}/metrics")
+
+
+async def stop_metrics_server():
+    global _runner
+
+    if _runner is not None:
+        await _runner.cleanup()
+        _runner = None
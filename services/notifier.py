@@ -0,0 +1,210 @@
+# services/notifier.py - Rate-limited notification queue, decoupled from price checking
+
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, List
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramBadRequest, TelegramRetryAfter
+from database.rolling import window_label
+from utils.logger import log
+from utils.metrics import NOTIFY_SEND_SECONDS, NOTIFICATIONS
+from utils.token_bucket import TokenBucket
+from config import NOTIFY_WORKERS, TELEGRAM_GLOBAL_RATE, TELEGRAM_CHAT_RATE
+
+MAX_MESSAGE_LEN = 4000   # Telegram hard limit is 4096 characters
+MAX_ATTEMPTS = 3         # attempts per message on unexpected errors (RetryAfter doesn't count)
+
+_queue: asyncio.Queue | None = None
+_workers: List[asyncio.Task] = []
+_global_bucket = TokenBucket(TELEGRAM_GLOBAL_RATE)
+_chat_buckets: Dict[int, TokenBucket] = {}
+_paused_until = 0.0  # set by flood-control errors: nobody sends before this moment
+_delayed = 0         # messages parked until their chat may receive again (not in the queue)
+
+
+# ---------- START / STOP ----------
+def start_notifier(bot: Bot, workers: int = NOTIFY_WORKERS, global_rate: float = TELEGRAM_GLOBAL_RATE):
+    """
+    Create the dispatch queue and spawn the sender workers.
+    `global_rate` lets each shard process take its share of the bot-wide limit.
+    """
+    global _queue, _global_bucket
+
+    _queue = asyncio.Queue()
+    _global_bucket = TokenBucket(global_rate)
+    for i in range(workers):
+        _workers.append(asyncio.create_task(_worker(bot), name=f"notifier-{i}"))
+
+    log.info(f"Notifier started — {workers} workers, {global_rate:g} msg/s global limit")
+
+
+async def stop_notifier(timeout: float = 10):
+    """Give queued messages a chance to go out, then stop the workers."""
+    if _queue is not None:
+        try:
+            await asyncio.wait_for(_drained(), timeout)
+        except asyncio.TimeoutError:
+            log.warning(f"Notifier stopped with {queue_size()} messages still queued")
+
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+
+# ---------- ENQUEUE TRIGGERED ALERTS ----------
+def notify_triggered(fired: List[dict], prices: Dict[str, float]):
+    """
+    Queue notifications for alerts fired in one tick. Never blocks:
+    all of a user's alerts from the same tick are combined into one message.
+    """
+    if _queue is None:
+        log.warning(f"Notifier not started — dropping {len(fired)} notifications")
+        return
+
+    per_chat = defaultdict(list)
+    for alert in fired:
+        per_chat[alert["chat_id"]].append(alert)
+
+    for chat_id, chat_alerts in per_chat.items():
+        for text in _format_messages(chat_alerts, prices):
+            _queue.put_nowait((chat_id, text, 0, False))
+
+
+def queue_size() -> int:
+    return _queue.qsize() + _delayed if _queue is not None else 0
+
+
+async def _drained():
+    """Wait until nothing is queued, being sent, or parked for its chat's rate limit."""
+    await _queue.join()
+    while _delayed:
+        await asyncio.sleep(0.1)
+        await _queue.join()
+
+
+# ---------- MESSAGE FORMATTING ----------
+def _format_alert(alert: dict, current: float) -> str:
+    if alert["type"] == "trail":
+        return (
+            f"{alert['symbol']}/USDT trailing stop hit!\n"
+            f"Current price: {current:,.4f} USD\n"
+            f"Down {(1 - current / alert['ref']) * 100:.2f}% from the peak of {alert['ref']:,.4f} "
+            f"(stop: {alert['price']:g}%)"
+        )
+    if alert["type"] in ("move", "move_up", "move_down"):
+        window = window_label(alert["param"])
+        if current >= alert["ref"]:
+            moved = f"Up {(current / alert['ref'] - 1) * 100:.2f}% from the {window} low of {alert['ref']:,.4f}"
+        else:
+            moved = f"Down {(1 - current / alert['ref']) * 100:.2f}% from the {window} high of {alert['ref']:,.4f}"
+        return (
+            f"{alert['symbol']}/USDT moved {alert['price']:g}% within {window}!\n"
+            f"Current price: {current:,.4f} USD\n"
+            f"{moved}"
+        )
+    return (
+        f"{alert['symbol']}/USDT has reached your target!\n"
+        f"Current price: {current:,.4f} USD\n"
+        f"Target: {'above' if alert['type']=='up' else 'below'} {alert['price']:,.0f}"
+    )
+
+
+def _format_messages(chat_alerts: List[dict], prices: Dict[str, float]) -> List[str]:
+    """Build one message per chat, split only if it would exceed Telegram's size limit."""
+    if len(chat_alerts) == 1:
+        alert = chat_alerts[0]
+        return ["⚠️ Price Alert!\n\n" + _format_alert(alert, prices[alert["symbol"]])]
+
+    header = f"⚠️ {len(chat_alerts)} Price Alerts!\n\n"
+    messages, text = [], header
+    for alert in chat_alerts:
+        block = _format_alert(alert, prices[alert["symbol"]]) + "\n\n"
+        if len(text) + len(block) > MAX_MESSAGE_LEN:
+            messages.append(text.rstrip())
+            text = header
+        text += block
+    messages.append(text.rstrip())
+    return messages
+
+
+# ---------- SENDER WORKER ----------
+async def _worker(bot: Bot):
+    """Take messages off the queue and send them within the rate limits."""
+    while True:
+        chat_id, text, attempts, reserved = await _queue.get()
+        try:
+            await _send(bot, chat_id, text, attempts, reserved)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # One bad message must never take the worker down
+            log.error(f"Notifier: unexpected error for chat {chat_id}: {e}")
+        finally:
+            _queue.task_done()
+
+
+def _park(item: tuple, delay: float):
+    """Put a message back on the queue after `delay` seconds, without holding a worker meanwhile."""
+    global _delayed
+
+    def release():
+        global _delayed
+        _delayed -= 1
+        _queue.put_nowait(item)
+
+    _delayed += 1
+    asyncio.get_running_loop().call_later(delay, release)
+
+
+async def _send(bot: Bot, chat_id: int, text: str, attempts: int, reserved: bool):
+    global _paused_until
+
+    # Respect a flood-control pause requested by Telegram
+    pause = _paused_until - time.monotonic()
+    if pause > 0:
+        await asyncio.sleep(pause)
+
+    if not reserved:
+        bucket = _chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = _chat_buckets[chat_id] = TokenBucket(TELEGRAM_CHAT_RATE, 1)
+        # Book this chat's next slot (in order, so its messages keep their order);
+        # if it isn't due yet, the worker moves on to other chats
+        wait = bucket.reserve()
+        if wait > 0:
+            _park((chat_id, text, attempts, True), wait)
+            return
+    await _global_bucket.acquire()
+
+    try:
+        with NOTIFY_SEND_SECONDS.time():
+            await bot.send_message(chat_id, text)
+        NOTIFICATIONS.inc(status="sent")
+
+    except TelegramRetryAfter as e:
+        NOTIFICATIONS.inc(status="retry_after")
+        # Pause everyone and put the message back at the end of the queue
+        _paused_until = max(_paused_until, time.monotonic() + e.retry_after)
+        log.warning(f"Flood control: pausing sends for {e.retry_after}s")
+        _queue.put_nowait((chat_id, text, attempts, False))
+
+    except (TelegramForbiddenError, TelegramBadRequest) as e:
+        # Bot blocked / chat gone → retrying won't help
+        NOTIFICATIONS.inc(status="dropped")
+        log.warning(f"Notifier: dropping message for chat {chat_id}: {e}")
+
+    except Exception as e:
+        NOTIFICATIONS.inc(status="error")
+        if attempts + 1 < MAX_ATTEMPTS:
+            log.warning(f"Notifier: send to {chat_id} failed ({e}), retrying")
+            _queue.put_nowait((chat_id, text, attempts + 1, False))
+        else:
+            log.error(f"Notifier: giving up on chat {chat_id} after {MAX_ATTEMPTS} attempts: {e}")
+
+    finally:
+        # Forget per-chat buckets that have fully refilled (keeps the dict small)
+        if len(_chat_buckets) > 10_000:
+            for idle in [c for c, b in _chat_buckets.items() if b.is_idle()]:
+                del _chat_buckets[idle]
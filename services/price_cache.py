@@ -0,0 +1,60 @@
+# services/price_cache.py - TTL price cache with single-flight (coalesced) requests
+
+import asyncio
+import time
+from typing import Dict, Tuple
+from services.providers import get_price
+from config import PRICE_CACHE_TTL
+
+_entries: Dict[str, Tuple[float, float]] = {}    # symbol → (price, time.monotonic() when stored)
+_inflight: Dict[str, asyncio.Task] = {}          # symbol → pending live request shared by all callers
+stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+
+# ---------- WRITE (CHECKER / STREAM) ----------
+def put_prices(prices: Dict[str, float]):
+    """Store many prices at once (called for every snapshot the checker fetches)."""
+    now = time.monotonic()
+    for symbol, price in prices.items():
+        _entries[symbol] = (price, now)
+
+
+# ---------- READ (HANDLERS) ----------
+async def get_cached_price(symbol: str, ttl: float = PRICE_CACHE_TTL) -> float | None:
+    """
+    Return a price no older than `ttl` seconds.
+    On a miss, concurrent callers for the same symbol share one (hedged) provider request.
+    """
+    symbol = symbol.upper()
+
+    entry = _entries.get(symbol)
+    if entry is not None and time.monotonic() - entry[1] <= ttl:
+        stats["hits"] += 1
+        return entry[0]
+
+    # Someone is already fetching this symbol → wait for their answer
+    pending = _inflight.get(symbol)
+    if pending is not None:
+        stats["coalesced"] += 1
+    else:
+        stats["misses"] += 1
+        pending = _inflight[symbol] = asyncio.create_task(_fetch(symbol))
+
+    # Shielded: a caller that is cancelled stops waiting, the fetch goes on for the others
+    return await asyncio.shield(pending)
+
+
+async def _fetch(symbol: str) -> float | None:
+    """The one live request for a symbol, in its own task so no single caller can cancel it."""
+    try:
+        price = await get_price(symbol)
+        if price is not None:
+            _entries[symbol] = (price, time.monotonic())
+        return price
+    finally:
+        del _inflight[symbol]
+
+
+def cache_stats() -> Dict[str, int]:
+    """Hit / miss / coalesced counters plus the number of cached symbols."""
+    return {**stats, "size": len(_entries)}
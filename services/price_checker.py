@@ -3,59 +3,117 @@
 import asyncio
 from typing import Dict
 from aiogram import Bot
-from database.alerts import alerts, remove_alert
-from services.binance import get_price
+from database.alerts import pop_triggered, watched_symbols, nearest_thresholds
+from services.binance import stream_prices
+from services.providers import get_price, get_prices
+from services.notifier import notify_triggered
+from services.scheduler import PollScheduler
+from services.snapshot import refresh_snapshot, update_snapshot, listed_symbols
 from utils.logger import log
-from database.alerts import inactive_users
-from config import CHECK_INTERVAL
+from utils.metrics import CHECK_CYCLE_SECONDS
+from config import CHECK_INTERVAL, PRICE_FEED, STREAM_FALLBACK_PERIOD, POLL_MIN_INTERVAL
+
+BATCH_LIMIT = 100  # more due symbols than this → fetch the full ticker list instead of a batch
 
 
 # ---------- PRICE CHECKING BACKGROUND TASK ----------
 async def price_checker(bot: Bot):
     """Continuously check prices and trigger alerts for active users only."""
-    log.info(f"Price checking task started — interval: {CHECK_INTERVAL}s")
+    log.info(f"Price checking task started — feed: {PRICE_FEED}, interval: {CHECK_INTERVAL}s")
 
     try:
-        while True:
-            if not alerts:
-                await asyncio.sleep(CHECK_INTERVAL)
-                continue
-
-            # Only check symbols for users who are not inactive
-            active_alerts = [a for a in alerts if a["chat_id"] not in inactive_users]
-            if not active_alerts:
-                await asyncio.sleep(CHECK_INTERVAL)
-                continue
-
-            symbols = {a["symbol"] for a in active_alerts}
-            prices = {}
-
-            for sym in symbols:
-                price = await get_price(sym)
-                if price is not None:
-                    prices[sym] = price
-                await asyncio.sleep(0.5)
-
-            triggered = []
-            for alert in active_alerts[:]:  # Copy to avoid deletion issues
-                if alert["symbol"] in prices:
-                    current = prices[alert["symbol"]]
-                    if (alert["type"] == "up" and current >= alert["price"]) or \
-                       (alert["type"] == "down" and current <= alert["price"]):
-
-                        await bot.send_message(
-                            alert["chat_id"],
-                            f"⚠️ Price Alert!\n\n"
-                            f"{alert['symbol']}/USDT has reached your target!\n"
-                            f"Current price: {current:,.4f} USD\n"
-                            f"Target: {'above' if alert['type']=='up' else 'below'} {alert['price']:,.0f}"
-                        )
-                        triggered.append(alert)
-
-            for t in triggered:
-                remove_alert(t)
-
-            await asyncio.sleep(CHECK_INTERVAL)
+        if PRICE_FEED == "stream":
+            await _stream_loop()
+        else:
+            await _poll_loop()
     except asyncio.CancelledError:
         log.info("Price checker task cancelled.")
-        raise
\ No newline at end of file
+        raise
+
+
+# ---------- TRIGGER EVALUATION ----------
+def process_prices(prices: Dict[str, float], now: float | None = None, notify=notify_triggered):
+    """
+    Fire every alert crossed by the given {symbol: price} map and hand them to the notifier.
+    The replay benchmark passes a virtual `now` and a capturing `notify` instead.
+    """
+
+    # The index hands back only the alerts that crossed (already removed).
+    # Delivery happens in the notifier's workers, so this never waits on Telegram.
+    fired = pop_triggered(prices, now)
+    if fired:
+        notify(fired, prices)
+
+
+# ---------- REST POLLING LOOP ----------
+async def _poll_loop(duration: float | None = None):
+    """
+    Poll each watched symbol on its own adaptive deadline (for `duration` seconds if given).
+    Deadlines are absolute, so the period doesn't stretch with processing time,
+    and nothing is requested while no symbol is due.
+    """
+    loop = asyncio.get_running_loop()
+    scheduler = PollScheduler(nearest_thresholds)
+    stop_at = None if duration is None else loop.time() + duration
+
+    while stop_at is None or loop.time() < stop_at:
+        now = loop.time()
+        scheduler.sync(watched_symbols(), now)
+
+        due = scheduler.pop_due(now)
+        if due:
+            with CHECK_CYCLE_SECONDS.time():
+                prices = await _fetch_prices(due)
+                if prices:
+                    process_prices(prices)
+
+            now = loop.time()
+            for symbol in due:
+                scheduler.observe(symbol, prices.get(symbol) if prices else None, now)
+
+        # Sleep until the next deadline, waking at least every POLL_MIN_INTERVAL for new alerts
+        wake_at = now + POLL_MIN_INTERVAL
+        next_deadline = scheduler.next_deadline()
+        if next_deadline is not None:
+            wake_at = min(wake_at, next_deadline)
+        await asyncio.sleep(max(0.0, wake_at - loop.time()))
+
+
+async def _fetch_prices(symbols: list) -> Dict[str, float] | None:
+    """Fetch due symbols with the cheapest request that covers them."""
+    if len(symbols) > BATCH_LIMIT:
+        return await refresh_snapshot()
+
+    if len(symbols) == 1:
+        price = await get_price(symbols[0])
+        prices = {symbols[0]: price} if price is not None else None
+    else:
+        prices = await get_prices(symbols)
+
+    if prices is None:
+        # A batch fails as a whole (e.g. one delisted symbol) → fall back to the full list,
+        # unless the last full list had none of these symbols either
+        listed = listed_symbols()
+        if listed and not any(symbol in listed for symbol in symbols):
+            return None
+        return await refresh_snapshot()
+
+    update_snapshot(prices)
+    return prices
+
+
+# ---------- WEBSOCKET STREAMING LOOP ----------
+async def _stream_loop():
+    """Evaluate triggers on every streamed update; poll via REST while the stream is down."""
+
+    async def on_prices(prices: Dict[str, float]):
+        with CHECK_CYCLE_SECONDS.time():
+            update_snapshot(prices)
+            process_prices(prices)
+
+    while True:
+        # Returns only after repeated connection failures
+        await stream_prices(on_prices, watched_symbols)
+
+        log.warning(f"Falling back to REST polling for {STREAM_FALLBACK_PERIOD}s")
+        await _poll_loop(duration=STREAM_FALLBACK_PERIOD)
@@ -0,0 +1,400 @@
+# services/providers.py - Price providers (Binance, backup exchanges) with health scoring and hedged requests
+
+import asyncio
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+import aiohttp
+from services import binance
+from services.binance_client import RequestRejected
+from services.session import get_session
+from utils.circuit_breaker import CircuitBreaker
+from utils.logger import log
+from utils.metrics import PROVIDER_REQUESTS, PROVIDER_HEDGES, PROVIDER_SCORE
+from config import (
+    PRICE_PROVIDERS, PROVIDER_HEDGE_DELAY, PROVIDER_HEDGE_MIN, PROVIDER_MAX_DEVIATION,
+    OKX_API_URL, BYBIT_API_URL,
+)
+
+HEALTH_ALPHA = 0.2         # weight of the newest observation in the moving averages
+LATENCY_REF = 0.25         # seconds; a provider this slow scores half of an instant one
+HEDGE_FACTOR = 3           # start the next provider once the current one takes 3× its usual time
+PREFERENCE_BONUS = 0.1     # score per position in PRICE_PROVIDERS, so the configured order wins near-ties
+BREAKER_THRESHOLD = 3      # consecutive failures that take a provider out of rotation…
+BREAKER_COOLDOWN = 30      # …for this many seconds
+REFERENCE_MAX_AGE = 3600   # seconds a price from the first provider is used to sanity-check the others
+SECONDARY_TIMEOUT = 5      # seconds per request to a backup exchange (the pool hedges instead of retrying)
+
+
+class ProviderError(Exception):
+    """The provider failed (network, server error, bad payload) — as opposed to not listing the coin."""
+
+
+# ---------- HEALTH ----------
+class ProviderHealth:
+    """
+    Moving averages of one provider's success rate and latency (per request kind: "one"
+    symbol or "many"), plus a circuit breaker. A request cancelled because another provider
+    answered first counts as at least that slow, so a provider that keeps losing races
+    drifts down the ranking even though it never fails outright.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.success = 1.0
+        self.latency: Dict[str, float] = {}
+        self.breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN)
+        self.wins = 0
+
+    def record(self, kind: str, ok: bool, seconds: float):
+        self.success += HEALTH_ALPHA * (ok - self.success)
+        if ok:
+            self._observe(kind, seconds)
+            self.breaker.success()
+        else:
+            self.breaker.failure()
+        PROVIDER_SCORE.set(round(self.score(kind), 4), provider=self.name)
+
+    def record_lost(self, kind: str, seconds: float):
+        """Cancelled after `seconds` without an answer — only a lower bound on its latency."""
+        if seconds > self.latency.get(kind, 0.0):
+            self._observe(kind, seconds)
+        self.breaker.release()
+
+    def _observe(self, kind: str, seconds: float):
+        old = self.latency.get(kind)
+        self.latency[kind] = seconds if old is None else old + HEALTH_ALPHA * (seconds - old)
+
+    def score(self, kind: str = "one") -> float:
+        """0–1: success rate discounted by typical latency; 0 while the circuit is open."""
+        if self.breaker.state == "open":
+            return 0.0
+        latency = self.latency.get(kind, LATENCY_REF)  # not measured yet → middling
+        return self.success * LATENCY_REF / (LATENCY_REF + latency)
+
+
+# ---------- PROVIDERS ----------
+class PriceProvider:
+    """One exchange's spot prices in USDT, keyed by base asset ("BTC")."""
+    name = "provider"
+
+    def __init__(self):
+        self.health = ProviderHealth(self.name)
+
+    async def fetch_price(self, symbol: str) -> float | None:
+        """The coin's price, None if the exchange doesn't list it; raises ProviderError on failure."""
+        raise NotImplementedError
+
+    async def fetch_prices(self, symbols: List[str] | None) -> Dict[str, float] | None:
+        """Prices of the listed ones among `symbols` (every listed coin for None); raises ProviderError."""
+        raise NotImplementedError
+
+
+class BinanceProvider(PriceProvider):
+    """
+    services/binance.py (retries, mirror failover, weight budget, alt-quote pairs).
+    A 4xx (unknown or delisted symbol) means "not listed"; no answer at all — 5xx, timeouts
+    and connection errors, after the client's retries — means it failed.
+    """
+    name = "binance"
+
+    async def fetch_price(self, symbol: str) -> float | None:
+        try:
+            price = await binance.get_price(symbol, raise_rejected=True)
+        except RequestRejected:
+            return None
+        if price is None:
+            raise ProviderError("no answer")
+        return price
+
+    async def fetch_prices(self, symbols: List[str] | None) -> Dict[str, float] | None:
+        try:
+            prices = await binance.get_prices(symbols, raise_rejected=True)
+        except RequestRejected:
+            return {}  # one unknown symbol fails the whole batch → the other providers fill it in
+        if prices is None:
+            raise ProviderError("no answer")
+        return prices
+
+
+class HttpProvider(PriceProvider):
+    """A backup exchange's public ticker endpoints: one GET per call, no retries."""
+
+    def __init__(self, base_url: str):
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+
+    async def _get_json(self, path: str, params: dict) -> dict:
+        session = await get_session()
+        try:
+            async with session.get(f"{self.base_url}{path}", params=params,
+                                   timeout=aiohttp.ClientTimeout(total=SECONDARY_TIMEOUT)) as resp:
+                if resp.status >= 500 or resp.status == 429:
+                    raise ProviderError(f"HTTP {resp.status}")
+                # Other 4xx carry the exchange's own error code (e.g. unknown instrument) for the caller
+                return await resp.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            raise ProviderError(str(e) or type(e).__name__) from e
+
+    async def fetch_prices(self, symbols: List[str] | None) -> Dict[str, float] | None:
+        # Every ticker costs one request on these exchanges, so batches are filtered locally
+        prices = await self._all_tickers()
+        if symbols is None:
+            return prices
+        return {s: prices[s] for s in symbols if s in prices}
+
+    async def _all_tickers(self) -> Dict[str, float]:
+        raise NotImplementedError
+
+
+class OkxProvider(HttpProvider):
+    name = "okx"
+
+    async def fetch_price(self, symbol: str) -> float | None:
+        data = await self._get_json("/api/v5/market/ticker", {"instId": f"{symbol}-USDT"})
+        if data.get("code") != "0":
+            return None  # e.g. 51001 "Instrument ID does not exist"
+        rows = data.get("data") or []
+        return _number(rows[0].get("last")) if rows else None
+
+    async def _all_tickers(self) -> Dict[str, float]:
+        data = await self._get_json("/api/v5/market/tickers", {"instType": "SPOT"})
+        if data.get("code") != "0":
+            raise ProviderError(f"code {data.get('code')}: {data.get('msg')}")
+        return {row["instId"][:-5]: _number(row.get("last")) for row in data.get("data") or []
+                if row.get("instId", "").endswith("-USDT")}
+
+
+class BybitProvider(HttpProvider):
+    name = "bybit"
+
+    async def fetch_price(self, symbol: str) -> float | None:
+        data = await self._get_json("/v5/market/tickers", {"category": "spot", "symbol": f"{symbol}USDT"})
+        if data.get("retCode") != 0:
+            return None  # e.g. 10001 "Not supported symbols"
+        rows = (data.get("result") or {}).get("list") or []
+        return _number(rows[0].get("lastPrice")) if rows else None
+
+    async def _all_tickers(self) -> Dict[str, float]:
+        data = await self._get_json("/v5/market/tickers", {"category": "spot"})
+        if data.get("retCode") != 0:
+            raise ProviderError(f"retCode {data.get('retCode')}: {data.get('retMsg')}")
+        rows = (data.get("result") or {}).get("list") or []
+        return {row["symbol"][:-4]: _number(row.get("lastPrice")) for row in rows
+                if row.get("symbol", "").endswith("USDT")}
+
+
+def _number(value) -> float:
+    """Exchanges send prices as strings; anything unparsable becomes NaN and is rejected later."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+PROVIDER_TYPES: Dict[str, Callable[[], PriceProvider]] = {
+    "binance": BinanceProvider,
+    "okx": lambda: OkxProvider(OKX_API_URL),
+    "bybit": lambda: BybitProvider(BYBIT_API_URL),
+}
+
+
+def build_providers(names: Iterable[str]) -> List[PriceProvider]:
+    unknown = [n for n in names if n not in PROVIDER_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown price provider(s) {', '.join(unknown)} — choose from {', '.join(PROVIDER_TYPES)}")
+    return [PROVIDER_TYPES[n]() for n in names]
+
+
+# ---------- HEDGED POOL ----------
+class ProviderPool:
+    """
+    Asks the best-ranked provider first. If it hasn't answered within its latency budget
+    (HEDGE_FACTOR × its usual latency, clamped to [hedge_min, hedge_delay]) or answers
+    without a usable price, the next provider is started as well — the first valid answer
+    wins and the others are cancelled.
+
+    Answers from the other providers are checked against the first provider's recent
+    prices, so a different coin trading under the same ticker elsewhere is rejected.
+    """
+
+    def __init__(self, providers: List[PriceProvider], hedge_delay: float = PROVIDER_HEDGE_DELAY,
+                 hedge_min: float = PROVIDER_HEDGE_MIN, max_deviation: float = PROVIDER_MAX_DEVIATION):
+        if not providers:
+            raise ValueError("at least one price provider is required")
+        self.providers = providers
+        self.hedge_delay = hedge_delay
+        self.hedge_min = min(hedge_min, hedge_delay)
+        self.max_deviation = max_deviation / 100
+        self.reference: Dict[str, Tuple[float, float]] = {}  # symbol → (price, monotonic time), first provider's
+
+    # ---------- PUBLIC ----------
+    async def get_price(self, symbol: str) -> float | None:
+        """USDT price of one coin from whichever provider answers validly first, or None."""
+        symbol = symbol.upper()
+
+        def check(provider, price):
+            if price is not None and not self._plausible(provider, symbol, price):
+                raise ProviderError(f"implausible price {price!r} for {symbol}")
+            return price
+
+        return await self._race("one", lambda p: p.fetch_price(symbol), check, lambda price: True)
+
+    async def get_prices(self, symbols: Iterable[str] | None = None) -> Dict[str, float] | None:
+        """
+        {symbol: price} for many coins (every listed coin for None). Answers that miss some
+        requested symbols are merged until they cover all of them; if they never do, the
+        merged partial answer is returned.
+        """
+        wanted = None if symbols is None else [s.upper() for s in symbols]
+        if wanted is not None and not wanted:
+            return {}
+
+        def check(provider, prices):
+            if not prices:
+                return None
+            clean = {s: p for s, p in prices.items() if self._plausible(provider, s, p)}
+            if not clean:
+                raise ProviderError(f"no plausible prices among {len(prices)}")
+            return clean
+
+        def complete(prices):
+            return wanted is None or all(s in prices for s in wanted)
+
+        return await self._race("many", lambda p: p.fetch_prices(wanted), check, complete)
+
+    def ranked(self, kind: str = "one") -> List[PriceProvider]:
+        """Providers by health score, with a small bonus for their position in PRICE_PROVIDERS."""
+        last = len(self.providers) - 1
+        bonus = {p: PREFERENCE_BONUS * (last - i) for i, p in enumerate(self.providers)}
+        return sorted(self.providers, key=lambda p: -(p.health.score(kind) + bonus[p]))
+
+    def budget(self, provider: PriceProvider, kind: str) -> float:
+        """Seconds to wait for this provider before hedging."""
+        latency = provider.health.latency.get(kind)
+        if latency is None:
+            return self.hedge_delay
+        return min(self.hedge_delay, max(self.hedge_min, HEDGE_FACTOR * latency))
+
+    def health(self) -> List[dict]:
+        """Per-provider summary for /stats, best first."""
+        return [{"name": p.name, "score": p.health.score(), "success": p.health.success,
+                 "latency": p.health.latency.get("one"), "wins": p.health.wins,
+                 "state": p.health.breaker.state} for p in self.ranked()]
+
+    # ---------- RACE ----------
+    async def _race(self, kind: str, call, check, complete):
+        """
+        Run call(provider) down the ranking, starting the next provider whenever the newest one
+        is over budget or done without a complete answer. check(provider, result) returns the
+        usable value (None if the provider doesn't list it) and raises ProviderError for answers
+        that count as failures; complete(value) says whether it wins outright.
+        """
+        loop = asyncio.get_running_loop()
+        queue = self.ranked(kind)
+        running: Dict[asyncio.Future, Tuple[PriceProvider, float]] = {}
+        fallback = None
+
+        def launch(force: bool = False) -> float | None:
+            """Start the next provider whose circuit allows it; its budget, or None if none is left."""
+            while queue:
+                provider = queue.pop(0)
+                if provider.health.breaker.allow() or force:
+                    running[asyncio.ensure_future(call(provider))] = (provider, loop.time())
+                    return self.budget(provider, kind)
+                PROVIDER_REQUESTS.inc(provider=provider.name, outcome="circuit_open")
+            return None
+
+        timeout = launch()
+        if not running:
+            # Every circuit is open → still ask the best one rather than give up without a request
+            queue = self.ranked(kind)[:1]
+            timeout = launch(force=True)
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if queue:
+                        PROVIDER_HEDGES.inc()
+                    timeout = launch()
+                    continue
+
+                for task in done:
+                    provider, started = running.pop(task)
+                    seconds = loop.time() - started
+                    try:
+                        value = check(provider, task.result())
+                    except Exception as e:
+                        log.warning(f"Price provider {provider.name} failed ({kind}): {e!r}")
+                        provider.health.record(kind, False, seconds)
+                        PROVIDER_REQUESTS.inc(provider=provider.name, outcome="failed")
+                        continue
+
+                    if value is None:
+                        # Not listed there: the provider answered, but that says nothing about its speed
+                        provider.health.breaker.success()
+                        PROVIDER_REQUESTS.inc(provider=provider.name, outcome="missing")
+                        continue
+
+                    provider.health.record(kind, True, seconds)
+                    if complete(value):
+                        provider.health.wins += 1
+                        PROVIDER_REQUESTS.inc(provider=provider.name, outcome="ok")
+                        return value
+                    PROVIDER_REQUESTS.inc(provider=provider.name, outcome="partial")
+                    # Partial batches add up: earlier (better-ranked) answers keep their prices
+                    fallback = {**value, **(fallback or {})}
+                    if complete(fallback):
+                        return fallback
+
+                # Nothing usable yet → don't wait out the budget, ask the next provider now
+                started_next = launch()
+                if started_next is not None:
+                    timeout = started_next
+                elif not running:
+                    break
+                else:
+                    timeout = None
+            return fallback
+        finally:
+            now = loop.time()
+            for task, (provider, started) in running.items():
+                if task.done():
+                    # Finished in the same step as the winner: the race is decided, just collect it
+                    if not task.cancelled():
+                        task.exception()
+                    provider.health.breaker.release()
+                    continue
+                task.cancel()
+                provider.health.record_lost(kind, now - started)
+                PROVIDER_REQUESTS.inc(provider=provider.name, outcome="cancelled")
+
+    # ---------- SANITY CHECK ----------
+    def _plausible(self, provider: PriceProvider, symbol: str, price: float) -> bool:
+        """Positive and finite; from a backup provider also within max_deviation of the first one's price."""
+        if not (price > 0 and math.isfinite(price)):
+            return False
+
+        now = time.monotonic()
+        if provider is self.providers[0]:
+            self.reference[symbol] = (price, now)
+            return True
+
+        ref = self.reference.get(symbol)
+        if ref is None or now - ref[1] > REFERENCE_MAX_AGE:
+            return True
+        return abs(price / ref[0] - 1) <= self.max_deviation
+
+
+pool = ProviderPool(build_providers(PRICE_PROVIDERS))
+
+
+# ---------- MODULE API ----------
+async def get_price(symbol: str) -> float | None:
+    """Drop-in for services.binance.get_price, served by the hedged provider pool."""
+    return await pool.get_price(symbol)
+
+
+async def get_prices(symbols: Iterable[str] | None = None) -> Dict[str, float] | None:
+    """Drop-in for services.binance.get_prices, served by the hedged provider pool."""
+    return await pool.get_prices(symbols)
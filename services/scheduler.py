@@ -0,0 +1,130 @@
+# services/scheduler.py - Adaptive per-symbol polling deadlines
+
+import heapq
+import math
+from typing import Callable, Dict, List, Tuple
+from config import POLL_MIN_INTERVAL, POLL_MAX_INTERVAL, POLL_NEAR_PCT
+
+VOLATILITY_HALF_LIFE = 60.0  # seconds; how fast the per-symbol volatility estimate forgets
+SAFETY_FACTOR = 0.25         # poll 4× more often than the estimated time to reach a threshold
+
+
+class PollScheduler:
+    """
+    Give every watched symbol its own absolute deadline (monotonic clock).
+
+    After each observed price the next deadline is chosen from:
+    - distance to the nearest pending threshold (as a fraction of the price)
+    - recent volatility (EWMA of |relative change| per second)
+    Symbols close to a threshold or moving fast are polled every POLL_MIN_INTERVAL,
+    quiet far-away ones only every POLL_MAX_INTERVAL.
+    Deadlines are absolute, so the schedule does not drift with processing time.
+    """
+
+    def __init__(
+        self,
+        nearest: Callable[[str], Tuple[float | None, float | None]],
+        min_interval: float = POLL_MIN_INTERVAL,
+        max_interval: float = POLL_MAX_INTERVAL,
+        near_pct: float = POLL_NEAR_PCT,
+    ):
+        self.nearest = nearest  # symbol → (lowest up threshold, highest down threshold)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.near = near_pct / 100
+
+        self._heap: List[Tuple[float, str]] = []
+        self._deadlines: Dict[str, float] = {}
+        self._last: Dict[str, Tuple[float, float]] = {}  # symbol → (price, time)
+        self._volatility: Dict[str, float] = {}          # symbol → EWMA |Δp/p| per second
+        self._failures: Dict[str, int] = {}              # symbol → consecutive failed fetches
+
+    # ---------- WATCHED SET ----------
+    def sync(self, symbols, now: float):
+        """Schedule new symbols immediately and forget ones nobody watches anymore."""
+        for symbol in symbols:
+            if symbol not in self._deadlines:
+                self._push(symbol, now)
+
+        watched = set(symbols)
+        for symbol in [s for s in self._deadlines if s not in watched]:
+            del self._deadlines[symbol]  # heap entry becomes stale and is skipped
+            self._last.pop(symbol, None)
+            self._volatility.pop(symbol, None)
+            self._failures.pop(symbol, None)
+
+    # ---------- DUE SYMBOLS ----------
+    def next_deadline(self) -> float | None:
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> List[str]:
+        """Return every symbol whose deadline has passed."""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, symbol = heapq.heappop(self._heap)
+            if self._deadlines.get(symbol) == deadline:
+                due.append(symbol)
+        return due
+
+    # ---------- RESCHEDULE ----------
+    def observe(self, symbol: str, price: float | None, now: float):
+        """Record a polled price and schedule the symbol's next poll."""
+        if symbol not in self._deadlines:
+            return  # unwatched meanwhile
+
+        if price is None:
+            # Failed fetch: back off exponentially (a delisted symbol ends up at max_interval)
+            failures = self._failures.get(symbol, 0)
+            self._failures[symbol] = failures + 1
+            self._push(symbol, now + min(self.max_interval, self.min_interval * 2 ** failures))
+            return
+
+        self._failures.pop(symbol, None)
+        self._update_volatility(symbol, price, now)
+        self._push(symbol, now + self.interval_for(symbol, price))
+
+    def interval_for(self, symbol: str, price: float) -> float:
+        up, down = self.nearest(symbol)
+        distances = [abs(t - price) / price for t in (up, down) if t is not None]
+        if not distances:
+            return self.max_interval
+
+        distance = min(distances)
+        if distance <= self.near:
+            return self.min_interval
+
+        # Expected seconds to cover the distance at the current volatility
+        # (random-walk scaling: distance grows with sqrt(time))
+        vol = self._volatility.get(symbol, 0.0)
+        if vol <= 0:
+            return self.max_interval
+        time_to_reach = (distance / vol) ** 2
+
+        return max(self.min_interval, min(self.max_interval, time_to_reach * SAFETY_FACTOR))
+
+    # ---------- INTERNALS ----------
+    def _update_volatility(self, symbol: str, price: float, now: float):
+        last = self._last.get(symbol)
+        self._last[symbol] = (price, now)
+        if last is None or now <= last[1]:
+            return
+
+        last_price, last_time = last
+        elapsed = now - last_time
+        # |Δp/p| normalised to one second under random-walk scaling
+        move = abs(price - last_price) / last_price / math.sqrt(elapsed)
+        weight = 1 - 0.5 ** (elapsed / VOLATILITY_HALF_LIFE)
+        previous = self._volatility.get(symbol, move)
+        self._volatility[symbol] = previous + weight * (move - previous)
+
+    def _push(self, symbol: str, deadline: float):
+        self._deadlines[symbol] = deadline
+        heapq.heappush(self._heap, (deadline, symbol))
+
+    def _drop_stale(self):
+        while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
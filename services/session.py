@@ -1,6 +1,13 @@
 # services/session.py
 
 import aiohttp
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from config import BOT_TOKEN, TELEGRAM_API_URL, HTTP_POOL_LIMIT, HTTP_POOL_PER_HOST, HTTP_TIMEOUT
+
+DNS_CACHE_TTL = 300     # seconds a resolved host is reused
+KEEPALIVE_TIMEOUT = 30  # seconds an idle connection is kept for reuse
 
 session: aiohttp.ClientSession | None = None  # global shared
 
@@ -10,10 +17,31 @@ async def get_session() -> aiohttp.ClientSession:
     """
     Return a global aiohttp session.
     Creates a new session only if none exists or the previous one is closed.
+    Connections are pooled and kept alive, and DNS answers are cached,
+    so steady polling doesn't pay for a TCP/TLS handshake or lookup per request.
     """
     global session
 
     if session is None or session.closed:
-        session = aiohttp.ClientSession()
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT, connect=min(5, HTTP_TIMEOUT)),
+        )
+
+    return session
+
+
+# ---------- CREATE TELEGRAM BOT ----------
+def create_bot() -> Bot:
+    """Create a Bot, pointed at a custom Bot API server if TELEGRAM_API_URL is set."""
+    api_session = None
+    if TELEGRAM_API_URL:
+        api_session = AiohttpSession(api=TelegramAPIServer.from_base(TELEGRAM_API_URL))
 
-    return session
\ No newline at end of file
+    return Bot(token=BOT_TOKEN, session=api_session)
@@ -0,0 +1,452 @@
+# services/sharding.py - Multi-process deployment: one price fetcher, N alert-evaluating shards
+#
+#   main process     Telegram polling + handlers + SQLite (source of truth for alerts)
+#   fetcher process  bulk price snapshot → shared memory, every CHECK_INTERVAL
+#   shard k          alerts with abs(chat_id) % N == k: evaluates them against the
+#                    shared snapshot and sends the notifications itself
+#
+# Alert changes made by handlers are forwarded to the owning shard; shards report
+# fired alerts back so the main process can drop them from its store and SQLite.
+# A symbol first watched after startup takes a spare slot of the shared price vector
+# (its id is broadcast to every process); once the spares run out the table is rebuilt.
+
+import asyncio
+import math
+from array import array
+import multiprocessing as mp
+import queue
+import signal
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List
+from database import alerts as alert_db
+from services import binance, providers
+from services.snapshot import update_snapshot
+from utils.logger import log
+from config import CHECK_INTERVAL, TELEGRAM_GLOBAL_RATE
+
+HEADER = 2                 # float64 slots before the prices: [sequence, timestamp]
+SYMBOL_HEADROOM = 256      # spare slots for symbols listed after startup
+SHARD_POLL_INTERVAL = 0.2  # seconds between shard checks for a new snapshot / commands
+SUPERVISE_INTERVAL = 5     # seconds between worker liveness checks
+STOP_TIMEOUT = 15          # seconds a process gets to exit before being terminated
+
+
+# ---------- SHARED SNAPSHOT (SEQLOCK OVER SHARED MEMORY) ----------
+class SharedSnapshot:
+    """
+    Price vector indexed by symbol id in a shared memory block of float64:
+    [sequence, timestamp, price_0, price_1, ...]. Missing prices are NaN.
+
+    The single writer makes the sequence odd while writing and even when done;
+    readers retry until they see the same even sequence before and after copying.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, size: int, owner: bool):
+        self.shm = shm
+        self.size = size
+        self.owner = owner
+        self.buf = shm.buf.cast("d")
+
+    @classmethod
+    def create(cls, size: int) -> "SharedSnapshot":
+        shm = shared_memory.SharedMemory(create=True, size=(HEADER + size) * 8)
+        snapshot = cls(shm, size, owner=True)
+        snapshot.buf[0] = 0.0
+        snapshot.buf[1] = 0.0
+        for i in range(size):
+            snapshot.buf[HEADER + i] = math.nan
+        return snapshot
+
+    @classmethod
+    def attach(cls, name: str, size: int) -> "SharedSnapshot":
+        return cls(shared_memory.SharedMemory(name=name), size, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def sequence(self) -> int:
+        return int(self.buf[0])
+
+    def write(self, prices: List[float]):
+        seq = self.sequence()
+        self.buf[0] = seq + 1  # odd → write in progress
+        self.buf[1] = time.time()
+        self.buf[HEADER:HEADER + len(prices)] = array("d", prices)
+        self.buf[0] = seq + 2  # even → consistent
+
+    def read(self) -> tuple:
+        """Return (sequence, timestamp, prices list) from one consistent version."""
+        while True:
+            seq = self.buf[0]
+            if int(seq) % 2 == 0:
+                ts = self.buf[1]
+                prices = self.buf[HEADER:HEADER + self.size].tolist()
+                if self.buf[0] == seq:
+                    return int(seq), ts, prices
+            time.sleep(0)  # writer in progress: yield and retry
+
+    def close(self):
+        self.buf.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# ---------- FETCHER PROCESS ----------
+def _fetcher_main(shm_name: str, symbols: List[str], interval: float, alt_quotes: Dict[str, str], commands):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the main process drives shutdown
+    binance.set_alt_quotes(alt_quotes)  # the catalog lives in the main process
+    asyncio.run(_fetcher_loop(shm_name, symbols, interval, commands))
+
+
+async def _fetcher_loop(shm_name: str, symbols: List[str], interval: float, commands):
+    from services.session import get_session
+
+    snapshot = SharedSnapshot.attach(shm_name, len(symbols))
+    loop = asyncio.get_running_loop()
+    next_at = loop.time()
+
+    try:
+        while True:
+            # Symbols watched since startup, placed in spare slots by the main process
+            while True:
+                try:
+                    _, sid, symbol = commands.get_nowait()
+                except queue.Empty:
+                    break
+                symbols[sid] = symbol
+
+            prices = await providers.get_prices()
+            if prices is not None:
+                snapshot.write([prices.get(s, math.nan) for s in symbols])
+
+            # Absolute deadlines: the period doesn't drift with request time
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - loop.time()))
+    finally:
+        await (await get_session()).close()
+        snapshot.close()
+
+
+# ---------- SHARD WORKER PROCESS ----------
+def _worker_main(shard: int, shm_name: str, symbols: List[str], commands, results, global_rate: float):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(_worker_loop(shard, shm_name, symbols, commands, results, global_rate))
+
+
+async def _worker_loop(shard: int, shm_name: str, symbols: List[str], commands, results, global_rate: float):
+    from database.alert_index import ThresholdIndex
+    from database.alert_store import AlertStore, ROLLING_TYPES
+    from database.rolling import RollingAlerts
+    from services.notifier import start_notifier, stop_notifier, notify_triggered
+    from services.session import create_bot, get_session
+
+    bot = create_bot()
+    start_notifier(bot, global_rate=global_rate)
+    snapshot = SharedSnapshot.attach(shm_name, len(symbols))
+    symbol_ids = {s: i for i, s in enumerate(symbols)}
+
+    store, index, rolling = AlertStore(), ThresholdIndex(), RollingAlerts()
+    slots: Dict[int, int] = {}       # alert id → local slot
+    main_slots: Dict[int, int] = {}  # alert id → slot in the main process (echoed back when fired)
+    last_seq = 0
+
+    def add(alert_id, main_slot, chat_id, symbol, price, alert_type, param=None):
+        slot = store.add(alert_id, chat_id, symbol, price, alert_type, param)
+        if alert_type in ROLLING_TYPES:
+            rolling.add(slot, alert_id, symbol, alert_type, price, param)
+        else:
+            index.add(symbol, alert_type, price, slot)
+        slots[alert_id] = slot
+        main_slots[alert_id] = main_slot
+
+    def remove(alert_id):
+        slot = slots.pop(alert_id, None)
+        main_slots.pop(alert_id, None)
+        if slot is not None:
+            if store.type_of(slot) in ROLLING_TYPES:
+                rolling.remove(slot)
+            else:
+                index.remove(store.symbol_of(slot), store.type_of(slot), store.prices[slot], slot)
+            store.remove(slot)
+
+    try:
+        while True:
+            # Apply alert changes forwarded by the main process
+            while True:
+                try:
+                    command = commands.get_nowait()
+                except queue.Empty:
+                    break
+                kind = command[0]
+                if kind == "stop":
+                    return
+                elif kind == "load":
+                    for row in command[1]:
+                        add(*row)
+                    log.info(f"Shard {shard}: {len(command[1])} alerts loaded")
+                elif kind == "add":
+                    add(*command[1])
+                elif kind == "remove":
+                    remove(command[1])
+                elif kind == "symbol":
+                    _, sid, symbol = command
+                    symbol_ids[symbol] = sid
+
+            # Evaluate only when the fetcher published a new snapshot
+            if snapshot.sequence() != last_seq:
+                last_seq, fetched_at, vector = snapshot.read()
+                prices = {}
+                for symbol in {*index.symbols(), *rolling.symbols()}:
+                    sid = symbol_ids.get(symbol)
+                    if sid is not None and not math.isnan(vector[sid]):
+                        prices[symbol] = vector[sid]
+
+                fired = []
+                for symbol, price in prices.items():
+                    triggered = [(slot, None) for slot in index.pop_triggered(symbol, price)]
+                    if len(rolling):
+                        triggered += rolling.update(symbol, price, fetched_at)
+                    for slot, ref in triggered:
+                        alert = store.get(slot)
+                        if ref is not None:
+                            alert["ref"] = ref
+                        alert["main_slot"] = main_slots.pop(alert["id"])
+                        slots.pop(alert["id"], None)
+                        store.remove(slot)
+                        fired.append(alert)
+
+                if fired:
+                    notify_triggered(fired, prices)
+                    results.put(("fired", [(a["id"], a["main_slot"]) for a in fired]))
+
+            await asyncio.sleep(SHARD_POLL_INTERVAL)
+    finally:
+        await stop_notifier()
+        await bot.session.close()
+        await (await get_session()).close()
+        snapshot.close()
+
+
+# ---------- MANAGER (MAIN PROCESS) ----------
+class ShardManager:
+    """Start, supervise, rebalance and stop the fetcher and shard processes."""
+
+    def __init__(self, shards: int):
+        self.shards = shards
+        self.ctx = mp.get_context("spawn")  # no forked event loops / threads
+        self.symbols: List[str] = []          # symbol id → name ("" for a spare slot)
+        self.symbol_ids: Dict[str, int] = {}  # name → id, for every assigned slot
+        self.snapshot: SharedSnapshot | None = None
+        self.fetcher = None
+        self.fetcher_commands = None  # new symbol ids for the fetcher (one queue per table)
+        self.workers: list = []   # [(process, command queue)]
+        self.results = self.ctx.Queue()
+        self.swapping = False     # shards are being replaced; they reload every alert from the store
+        self.growing = False      # a rebuild of the symbol table is scheduled
+        self._swap_lock = asyncio.Lock()  # one rebalance / rebuild at a time
+
+    # ---------- STARTUP ----------
+    async def start(self):
+        """Build the symbol table, create the shared snapshot and spawn every process."""
+        listed = await binance.get_prices() or {}
+        self._build_table(set(listed) | set(alert_db.watched_symbols()))
+        self._start_fetcher()
+        self._start_workers(self.shards)
+
+        alert_db.add_listener(self._forward)
+        log.info(f"Sharded mode: 1 fetcher + {self.shards} shards, {len(self.symbol_ids)} symbols")
+
+    def _build_table(self, names):
+        """Give every known symbol an id and create a shared snapshot with spare slots after them."""
+        known = sorted(names)
+        self.symbols = known + [""] * SYMBOL_HEADROOM  # empty names never match
+        self.symbol_ids = {s: i for i, s in enumerate(known)}
+        self.snapshot = SharedSnapshot.create(len(self.symbols))
+        self.fetcher_commands = self.ctx.Queue()  # ids queued for an older table must not reach the new one
+
+    def _start_fetcher(self):
+        self.fetcher = self.ctx.Process(
+            target=_fetcher_main,
+            args=(self.snapshot.name, self.symbols, CHECK_INTERVAL, binance.alt_quotes, self.fetcher_commands),
+            name="price-fetcher", daemon=True,
+        )
+        self.fetcher.start()
+
+    def _start_workers(self, shards: int):
+        """Spawn `shards` workers and hand each its share of the current alerts."""
+        self.shards = shards
+        self.workers = []
+        for k in range(shards):
+            commands = self.ctx.Queue()
+            process = self.ctx.Process(
+                target=_worker_main,
+                args=(k, self.snapshot.name, self.symbols, commands, self.results, TELEGRAM_GLOBAL_RATE / shards),
+                name=f"alert-shard-{k}", daemon=True,
+            )
+            process.start()
+            self.workers.append((process, commands))
+
+        # Done synchronously: no handler can change alerts between this read and the hand-off
+        batches = [[] for _ in range(shards)]
+        for alert in alert_db.all_alerts():
+            batches[self.shard_of(alert["chat_id"])].append(_row(alert))
+        for (_, commands), batch in zip(self.workers, batches):
+            commands.put(("load", batch))
+
+    def shard_of(self, chat_id: int) -> int:
+        return abs(chat_id) % self.shards
+
+    # ---------- ALERT FORWARDING ----------
+    def _forward(self, event: str, alert: dict):
+        if event == "add" and not self._assign_symbol(alert["symbol"]):
+            # No spare slot left: the rebuilt shards load this alert from the store
+            if not self.growing:
+                self.growing = True
+                asyncio.get_running_loop().create_task(self._grow_symbols())
+            return
+        if self.swapping:
+            return  # already in the store, which the new shards load when they start
+        _, commands = self.workers[self.shard_of(alert["chat_id"])]
+        if event == "add":
+            commands.put(("add", _row(alert)))
+        elif event == "remove":
+            commands.put(("remove", alert["id"]))
+
+    def _assign_symbol(self, symbol: str) -> bool:
+        """Make sure `symbol` has an id everywhere; False when the table has no spare slot."""
+        if symbol in self.symbol_ids:
+            return True
+        sid = len(self.symbol_ids)  # ids are handed out in order, so this is the first spare slot
+        if sid >= len(self.symbols):
+            return False
+
+        self.symbols[sid] = symbol
+        self.symbol_ids[symbol] = sid
+        # Same queues as the alert commands → every shard knows the id before an alert uses it
+        self.fetcher_commands.put(("symbol", sid, symbol))
+        for _, commands in self.workers:
+            commands.put(("symbol", sid, symbol))
+        log.info(f"Sharded mode: {symbol} added as symbol #{sid}")
+        return True
+
+    # ---------- RUN ----------
+    async def run(self):
+        """Collect fired alerts, mirror the snapshot for handlers and supervise the processes."""
+        try:
+            await asyncio.gather(self._collect_results(), self._mirror_snapshot(), self._supervise())
+        finally:
+            await self.stop()
+
+    async def _collect_results(self):
+        # Polled on the loop: a blocking get() in a thread would lose the report it takes
+        # if this task were cancelled meanwhile
+        while True:
+            self._drain_results()
+            await asyncio.sleep(SHARD_POLL_INTERVAL)
+
+    def _drain_results(self):
+        """Apply every fired report still queued (shards flush their queue before exiting)."""
+        while True:
+            try:
+                kind, payload = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "fired":
+                alert_db.remove_fired(payload)
+
+    async def _mirror_snapshot(self):
+        """Feed the fetcher's prices into the local snapshot/cache so /price rarely hits the network."""
+        last_seq = 0
+        while True:
+            if self.snapshot.sequence() != last_seq:
+                last_seq, _, vector = self.snapshot.read()
+                update_snapshot({s: p for s, p in zip(self.symbols, vector) if s and not math.isnan(p)})
+            await asyncio.sleep(SHARD_POLL_INTERVAL)
+
+    async def _supervise(self):
+        while True:
+            await asyncio.sleep(SUPERVISE_INTERVAL)
+            if self.swapping:
+                continue  # processes are being replaced on purpose
+            if not self.fetcher.is_alive():
+                log.error("Price fetcher process died — restarting it")
+                self._start_fetcher()
+            if any(not p.is_alive() for p, _ in self.workers):
+                log.error("A shard process died — rebalancing")
+                await self.rebalance(self.shards)
+
+    # ---------- REBALANCE ----------
+    async def rebalance(self, shards: int):
+        """
+        Stop every shard and redistribute all alerts over `shards` new ones.
+        Alert changes made meanwhile aren't forwarded (the new shards load them from the store),
+        and alerts the old shards fired are removed before that load, so none fires twice.
+        """
+        async with self._swap_lock:
+            self.swapping = True
+            try:
+                await self._stop_workers(self.workers)
+                self._drain_results()
+                self._start_workers(shards)
+            finally:
+                self.swapping = False
+        log.info(f"Rebalanced alerts over {shards} shards")
+
+    async def _grow_symbols(self):
+        """Every spare slot is taken: restart all processes over a table with fresh spares."""
+        async with self._swap_lock:
+            self.swapping = True
+            try:
+                await self._stop_workers(self.workers)
+                await self._stop_fetcher()
+                self._drain_results()
+
+                old = self.snapshot
+                self._build_table(set(self.symbol_ids) | set(alert_db.watched_symbols()))
+                old.close()
+                self._start_fetcher()
+                self._start_workers(self.shards)
+            finally:
+                self.swapping = False
+                self.growing = False
+        log.info(f"Sharded mode: symbol table rebuilt with {len(self.symbol_ids)} symbols")
+
+    # ---------- SHUTDOWN ----------
+    async def stop(self):
+        """Stop shards (they flush their notifications), then the fetcher, then free shared memory."""
+        alert_db.remove_listener(self._forward)
+
+        await self._stop_workers(self.workers)
+        self.workers = []
+
+        await self._stop_fetcher()
+
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+
+        # Fired alerts reported during shutdown still need removing
+        self._drain_results()
+
+    async def _stop_fetcher(self):
+        if self.fetcher is not None:
+            self.fetcher.terminate()
+            await asyncio.to_thread(self.fetcher.join, STOP_TIMEOUT)
+            self.fetcher = None
+
+    async def _stop_workers(self, workers: list):
+        for process, commands in workers:
+            commands.put(("stop",))
+        for process, _ in workers:
+            await asyncio.to_thread(process.join, STOP_TIMEOUT)
+            if process.is_alive():
+                log.warning(f"{process.name} did not stop in {STOP_TIMEOUT}s — terminating")
+                process.terminate()
+
+
+def _row(alert: dict) -> tuple:
+    return (alert["id"], alert["slot"], alert["chat_id"], alert["symbol"], alert["price"], alert["type"],
+            alert.get("param"))
@@ -3,14 +3,33 @@
 import asyncio
 from utils.logger import log
 from services.session import get_session
+from database.storage import close_storage
+from database.alerts import save_trailing_peaks
+from database.history import close_history
+from services.notifier import stop_notifier
+from services.metrics_server import stop_metrics_server
 
-async def graceful_shutdown(bot, task_checker, polling_task):
+async def graceful_shutdown(bot, task_checker, polling_task, dp=None, background=()):
     log.info("Stopping background tasks...")
 
+    # Let aiogram stop polling itself: cancelling start_polling() from outside
+    # leaves its internal polling task running
+    if dp is not None and not polling_task.done():
+        try:
+            await asyncio.wait_for(dp.stop_polling(), timeout=5)
+        except (RuntimeError, asyncio.TimeoutError):
+            pass
+
     # Cancel tasks
-    task_checker.cancel()
-    polling_task.cancel()
-    await asyncio.gather(task_checker, polling_task, return_exceptions=True)
+    tasks = [task_checker, polling_task, *background]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Flush queued notifications while the bot session is still open
+    await stop_notifier()
+
+    await stop_metrics_server()
 
     # Close bot session
     try:
@@ -24,3 +43,12 @@ async def graceful_shutdown(bot, task_checker, polling_task):
         await session.close()
     except:
         pass
+
+    # Finished price bars not appended yet
+    await asyncio.to_thread(close_history)
+
+    # Trailing stops keep their peaks across restarts
+    save_trailing_peaks()
+
+    # Commit pending alert writes (blocking join → run off the event loop)
+    await asyncio.to_thread(close_storage)
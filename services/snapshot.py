@@ -0,0 +1,78 @@
+# services/snapshot.py - One shared price snapshot per check cycle
+
+import time
+from typing import Dict, Iterable, Tuple
+from services.providers import get_prices
+from services.price_cache import put_prices
+from database.history import record
+
+prices: Dict[str, float] = {}  # symbol → price, replaced on a full refresh, patched in place by partial updates
+updated_at: float = 0.0        # time.time() of the last successful full refresh
+listed: frozenset = frozenset() # symbols in the last full refresh (empty until the first one)
+seen: Dict[str, float] = {}    # symbol → time.time() its price was last updated (full or partial)
+latest: float = 0.0            # time.time() of the last update of any kind
+
+
+# ---------- REFRESH SNAPSHOT ----------
+async def refresh_snapshot() -> Dict[str, float] | None:
+    """
+    Pull every ticker in one request (from the first provider to answer) and publish it as the current snapshot.
+    Returns the new snapshot, or None if the request failed (old snapshot is kept).
+    """
+    global prices, updated_at, listed, seen, latest
+
+    fresh = await get_prices()
+    if fresh is None:
+        return None
+
+    # Our own copy: later partial updates patch it in place, never the dict returned here
+    prices = dict(fresh)
+    updated_at = latest = time.time()
+    listed = frozenset(fresh)
+    seen = dict.fromkeys(fresh, updated_at)
+
+    # Interactive commands read from the cache → usually no network I/O at all
+    put_prices(fresh)
+    record(fresh, updated_at)
+    return fresh
+
+
+# ---------- APPLY STREAM UPDATES ----------
+def update_snapshot(updates: Dict[str, float]):
+    """
+    Merge prices for a few symbols (stream or batch poll) into the snapshot, in place: O(updates).
+    Only those symbols count as fresh: the full-refresh timestamp stays where it was.
+    """
+    global latest
+
+    prices.update(updates)
+    latest = time.time()
+    seen.update(dict.fromkeys(updates, latest))
+    put_prices(updates)
+    record(updates, latest)
+
+
+# ---------- READ SNAPSHOT ----------
+def get_snapshot() -> Tuple[Dict[str, float], float]:
+    """
+    Return a copy of the current prices and the last full refresh time.
+    Copied on read (handlers only), so stream ticks never pay for a copy.
+    """
+    return dict(prices), updated_at
+
+
+def listed_symbols() -> frozenset:
+    """Symbols the last full refresh returned a price for."""
+    return listed
+
+
+def snapshot_age(symbols: Iterable[str] | None = None) -> float:
+    """
+    Seconds since the stalest of `symbols` got a price (inf if one never did),
+    or without symbols, since the last update of any kind.
+    """
+    now = time.time()
+    if symbols is None:
+        return now - latest
+    return max((now - seen.get(s, -float("inf")) for s in symbols), default=0.0)
+
@@ -0,0 +1,205 @@
+# services/symbols.py - Local catalog of Binance USDT pairs (from exchangeInfo) with typo suggestions
+
+import asyncio
+import time
+from itertools import combinations
+from typing import Dict, List, Set
+from services.binance import get_exchange_info, set_alt_quotes, QUOTE_ASSET, QUOTE_FALLBACKS
+from utils.logger import log
+from config import SYMBOL_REFRESH_INTERVAL
+
+MAX_EDITS = 2        # suggestions are at most this many edits away from the typed symbol
+MAX_SUGGESTIONS = 3
+RETRY_INTERVAL = 60  # seconds between attempts while the catalog has never loaded
+
+catalog: Dict[str, dict] = {}     # base asset → {"pair", "status", "tick_size"}
+alt_quotes: Dict[str, str] = {}     # base asset without a trading USDT pair → quote it trades against instead
+_deletes: Dict[str, Set[str]] = {}  # every string reachable by ≤ MAX_EDITS deletions → symbols
+loaded_at: float = 0.0              # time.time() of the last successful refresh (0 → never)
+
+
+# ---------- LOAD / REFRESH ----------
+async def refresh_catalog() -> bool:
+    """Download exchangeInfo and swap in a new catalog + fuzzy index. Returns success."""
+    global catalog, alt_quotes, _deletes, loaded_at
+
+    data = await get_exchange_info()
+    if data is None:
+        return False
+
+    fresh = parse_exchange_info(data)
+    if not fresh:
+        log.warning("exchangeInfo returned no USDT pairs, keeping the previous catalog")
+        return False
+
+    # Build off to the side and swap, so lookups never see a half-built index
+    alternatives = parse_alt_quotes(data, fresh)
+    deletes = _build_deletes(set(fresh) | set(alternatives))
+    catalog, alt_quotes, _deletes = fresh, alternatives, deletes
+    set_alt_quotes(alternatives)
+    loaded_at = time.time()
+
+    halted = sum(1 for info in fresh.values() if info["status"] != "TRADING")
+    log.info(f"Symbol catalog loaded: {len(fresh)} {QUOTE_ASSET} pairs ({halted} not trading), "
+             f"{len(alternatives)} more coins via {'/'.join(QUOTE_FALLBACKS) or '-'}")
+    return True
+
+
+def parse_exchange_info(symbols: list) -> Dict[str, dict]:
+    """Keep the USDT pairs of an exchangeInfo "symbols" list, keyed by base asset."""
+    result = {}
+
+    for item in symbols:
+        if item.get("quoteAsset") != QUOTE_ASSET:
+            continue
+
+        tick_size = None
+        for f in item.get("filters", []):
+            if f.get("filterType") == "PRICE_FILTER":
+                tick_size = float(f["tickSize"])
+
+        result[item["baseAsset"]] = {
+            "pair": item["symbol"],
+            "status": item.get("status", "TRADING"),
+            "tick_size": tick_size,
+        }
+
+    return result
+
+
+def parse_alt_quotes(symbols: list, usdt: Dict[str, dict]) -> Dict[str, str]:
+    """
+    Base asset → first quote in QUOTE_FALLBACKS it trades against, for coins whose
+    USDT pair is missing or not trading.
+    """
+    rank = {quote: i for i, quote in enumerate(QUOTE_FALLBACKS)}
+    best: Dict[str, str] = {}
+
+    for item in symbols:
+        base, quote = item.get("baseAsset"), item.get("quoteAsset")
+        if quote not in rank or item.get("status", "TRADING") != "TRADING":
+            continue
+        if base in usdt and usdt[base]["status"] == "TRADING":
+            continue
+        if base not in best or rank[quote] < rank[best[base]]:
+            best[base] = quote
+
+    return best
+
+
+async def catalog_refresher(interval: float = SYMBOL_REFRESH_INTERVAL):
+    """Background task: keep the catalog current (new listings, halts, delistings)."""
+    try:
+        while True:
+            ok = await refresh_catalog()
+            # Until the first load succeeds, retry sooner (handlers fall back to live lookups meanwhile)
+            await asyncio.sleep(interval if ok or loaded_at else RETRY_INTERVAL)
+    except asyncio.CancelledError:
+        log.info("Symbol catalog refresher cancelled.")
+        raise
+
+
+# ---------- LOOKUP ----------
+def catalog_size() -> int:
+    return len(catalog)
+
+
+def catalog_age() -> float | None:
+    """Seconds since the last successful exchangeInfo load, or None if it never loaded."""
+    return time.time() - loaded_at if loaded_at else None
+
+
+def symbol_status(symbol: str) -> str | None:
+    """
+    "TRADING", another Binance status ("BREAK", "HALT", ...), "UNKNOWN" for no such pair,
+    or None while the catalog isn't loaded (caller should fall back to a live request).
+    Coins that only trade against a fallback quote (USDC, BTC, ...) count as trading.
+    """
+    if not catalog:
+        return None
+    if symbol.upper() in alt_quotes:
+        return "TRADING"
+    info = catalog.get(symbol.upper())
+    return info["status"] if info else "UNKNOWN"
+
+
+def quote_asset(symbol: str) -> str:
+    """The quote a coin's price comes from ("USDT" unless it's only listed against a fallback)."""
+    return alt_quotes.get(symbol.upper(), QUOTE_ASSET)
+
+
+def tick_size(symbol: str) -> float | None:
+    info = catalog.get(symbol.upper())
+    return info["tick_size"] if info else None
+
+
+def symbol_error(symbol: str) -> str | None:
+    """User-facing reason why `symbol` can't be used right now, or None if it's fine (or unknown to us)."""
+    status = symbol_status(symbol)
+
+    if status is None or status == "TRADING":
+        return None
+
+    if status == "UNKNOWN":
+        text = f"🛑 {symbol} is not traded against {'/'.join([QUOTE_ASSET, *QUOTE_FALLBACKS])} on Binance."
+        matches = suggest(symbol)
+        if matches:
+            text += "\nDid you mean: " + ", ".join(matches) + "?"
+        return text
+
+    return f"⏸ {symbol}/{QUOTE_ASSET} is not trading right now (status: {status})."
+
+
+# ---------- FUZZY SUGGESTIONS (SYMMETRIC DELETE) ----------
+def _deletions(word: str, max_edits: int = MAX_EDITS) -> Set[str]:
+    """Every string obtained by removing up to `max_edits` characters (keeping at least one)."""
+    result = {word}
+    for n in range(1, min(max_edits, len(word) - 1) + 1):
+        for drop in combinations(range(len(word)), n):
+            result.add("".join(c for i, c in enumerate(word) if i not in drop))
+    return result
+
+
+def _build_deletes(symbols) -> Dict[str, Set[str]]:
+    deletes: Dict[str, Set[str]] = {}
+    for symbol in symbols:
+        for variant in _deletions(symbol):
+            deletes.setdefault(variant, set()).add(symbol)
+    return deletes
+
+
+def _distance(a: str, b: str) -> int:
+    """Optimal string alignment distance (Levenshtein + adjacent transpositions)."""
+    prev2, prev = None, list(range(len(b) + 1))
+
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        prev2, prev = prev, cur
+
+    return prev[-1]
+
+
+def suggest(symbol: str, limit: int = MAX_SUGGESTIONS) -> List[str]:
+    """
+    Closest listed symbols to a typo, nearest first (trading pairs before halted ones).
+    Candidates share a deletion variant with the query, so only a handful are scored.
+    """
+    symbol = symbol.upper()
+    candidates = set()
+    for variant in _deletions(symbol):
+        candidates |= _deletes.get(variant, set())
+
+    scored = []
+    for candidate in candidates:
+        distance = _distance(symbol, candidate)
+        if distance <= MAX_EDITS:
+            trading = candidate in alt_quotes or catalog[candidate]["status"] == "TRADING"
+            scored.append((distance, not trading, abs(len(candidate) - len(symbol)), candidate))
+
+    scored.sort()
+    return [s[-1] for s in scored[:limit]]
@@ -0,0 +1,124 @@
+# services/watchdog.py - Event-loop health: lag monitor, blocked-loop stack dumps, profiler toggle
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from utils.logger import log
+from utils.metrics import LOOP_LAG_SECONDS
+from utils.sampler import StackSampler
+from config import LOOP_LAG_INTERVAL, LOOP_LAG_WARN, LOOP_BLOCK_DUMP, SLOW_CALLBACK_SECONDS, PROFILE_DIR
+
+last_lag = 0.0                        # lag of the most recent probe (seconds)
+sampler: StackSampler | None = None   # created by start_watchdog() for the loop's thread
+_heartbeat = 0.0                      # time.monotonic() of the last probe wake-up
+_block_thread: threading.Thread | None = None
+_stop = threading.Event()
+
+
+# ---------- START / STOP ----------
+async def start_watchdog() -> asyncio.Task:
+    """Start lag probing (and the blocked-loop detector / slow-callback logging if configured)."""
+    global sampler, _block_thread, _heartbeat
+
+    loop = asyncio.get_running_loop()
+    loop_thread = threading.get_ident()
+    sampler = StackSampler(loop_thread)
+
+    if SLOW_CALLBACK_SECONDS:
+        # asyncio debug mode logs every callback / task step slower than this (has some overhead)
+        loop.set_debug(True)
+        loop.slow_callback_duration = SLOW_CALLBACK_SECONDS
+        logging.getLogger("asyncio").handlers = log.handlers
+        log.info(f"Slow-callback detection on: steps over {SLOW_CALLBACK_SECONDS * 1000:g} ms are logged")
+
+    _heartbeat = time.monotonic()
+    if LOOP_BLOCK_DUMP:
+        _stop.clear()
+        _block_thread = threading.Thread(target=_block_detector, args=(loop_thread,),
+                                         name="loop-watchdog", daemon=True)
+        _block_thread.start()
+
+    return asyncio.create_task(_lag_probe(), name="loop-lag-probe")
+
+
+def stop_watchdog():
+    global _block_thread
+
+    _stop.set()
+    if _block_thread is not None:
+        _block_thread.join()
+        _block_thread = None
+    if sampler is not None and sampler.running:
+        stop_profiling()
+
+
+# ---------- LAG PROBE ----------
+async def _lag_probe(interval: float = LOOP_LAG_INTERVAL):
+    """Sleep `interval` and measure how late we wake up: that delay is what every callback waits too."""
+    global last_lag, _heartbeat
+
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            last_lag = max(0.0, loop.time() - started - interval)
+            _heartbeat = time.monotonic()
+
+            LOOP_LAG_SECONDS.observe(last_lag)
+            if last_lag >= LOOP_LAG_WARN:
+                log.warning(f"Event loop lag {last_lag * 1000:,.0f} ms", extra={"event": "loop_lag", "lag": last_lag})
+    finally:
+        stop_watchdog()
+
+
+def _block_detector(loop_thread: int):
+    """
+    Runs in its own thread: if the probe hasn't woken up for LOOP_BLOCK_DUMP seconds,
+    the loop is stuck in one callback right now — log that callback's stack (once per stall).
+    """
+    reported = 0.0
+    while not _stop.wait(LOOP_LAG_INTERVAL):
+        stalled = time.monotonic() - _heartbeat - LOOP_LAG_INTERVAL
+        if stalled < LOOP_BLOCK_DUMP or reported == _heartbeat:
+            continue
+
+        frame = sys._current_frames().get(loop_thread)
+        if frame is not None:
+            stack = "".join(traceback.format_stack(frame)[-15:])
+            log.warning(f"Event loop blocked for {stalled:,.1f}s, currently running:\n{stack}",
+                        extra={"event": "loop_blocked", "stalled": stalled})
+        reported = _heartbeat
+
+
+# ---------- SAMPLING PROFILER (RUNTIME TOGGLE) ----------
+def start_profiling():
+    if sampler is None:
+        raise RuntimeError("watchdog not started")
+    sampler.start()
+    log.info("Sampling profiler started")
+
+
+def stop_profiling() -> str:
+    """Stop sampling, log the summary and write the folded stacks next to the logs."""
+    sampler.stop()
+    report = sampler.report()
+    log.info(f"Sampling profiler stopped\n{report}")
+
+    path = Path(PROFILE_DIR) / f"profile-{time.strftime('%Y%m%d-%H%M%S')}.folded"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(sampler.folded(), encoding="utf-8")
+    log.info(f"Folded stacks written to {path} (flamegraph.pl / speedscope)")
+    return report
+
+
+def toggle_profiling() -> str | None:
+    """Start the profiler, or stop it and return the report (used by /profile and SIGUSR1)."""
+    if sampler is not None and sampler.running:
+        return stop_profiling()
+    start_profiling()
+    return None
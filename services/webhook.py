@@ -0,0 +1,151 @@
+# services/webhook.py - Receive Telegram updates over HTTPS webhook instead of long polling
+
+import asyncio
+import hmac
+from typing import List
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from aiohttp import web
+from utils.logger import log
+from utils.metrics import WEBHOOK_UPDATES
+from config import (
+    WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_SECRET,
+    WEBHOOK_CONCURRENCY, WEBHOOK_MAX_PENDING,
+)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+RETRY_AFTER = 1  # seconds suggested to the sender when we shed load (Telegram retries non-2xx anyway)
+
+_queue: asyncio.Queue | None = None
+_workers: List[asyncio.Task] = []
+_runner: web.AppRunner | None = None
+
+
+# ---------- RUN (REPLACES dp.start_polling) ----------
+async def run_webhook(bot: Bot, dp: Dispatcher):
+    """
+    Serve the webhook until cancelled, then stop accepting updates and
+    let the workers finish what was already accepted.
+    """
+    await start_webhook(bot, dp)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await stop_webhook()
+
+
+async def start_webhook(
+    bot: Bot,
+    dp: Dispatcher,
+    host: str = WEBHOOK_HOST,
+    port: int = WEBHOOK_PORT,
+    concurrency: int = WEBHOOK_CONCURRENCY,
+    max_pending: int = WEBHOOK_MAX_PENDING,
+) -> str:
+    """Start the HTTP server and the update workers; register the webhook if WEBHOOK_URL is set."""
+    global _queue, _runner
+
+    if WEBHOOK_URL and not WEBHOOK_SECRET:
+        # Without it anyone who finds the URL can post fake updates as any user
+        raise ValueError("WEBHOOK_SECRET must be set when WEBHOOK_URL is!")
+
+    _queue = asyncio.Queue(maxsize=max_pending)
+    for i in range(concurrency):
+        _workers.append(asyncio.create_task(_worker(bot, dp), name=f"webhook-{i}"))
+
+    app = web.Application()
+    app["bot"] = bot
+    app.router.add_post(WEBHOOK_PATH, _handle_update)
+
+    _runner = web.AppRunner(app, access_log=None)
+    await _runner.setup()
+    await web.TCPSite(_runner, host, port).start()
+
+    host, port = _runner.addresses[0][:2]
+    local_url = f"http://{host}:{port}{WEBHOOK_PATH}"
+    log.info(f"Webhook listening on {local_url} — {concurrency} workers, {max_pending} pending max")
+
+    if WEBHOOK_URL:
+        await bot.set_webhook(
+            f"{WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET,
+            max_connections=min(100, max(1, concurrency)),
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+        log.info(f"Webhook registered with Telegram: {WEBHOOK_URL}")
+
+    return local_url
+
+
+async def stop_webhook(timeout: float = 10):
+    """Stop the server first (no new updates), then drain the queue and stop the workers."""
+    global _runner
+
+    if _runner is not None:
+        await _runner.cleanup()
+        _runner = None
+
+    if _queue is not None:
+        try:
+            await asyncio.wait_for(_queue.join(), timeout)
+        except asyncio.TimeoutError:
+            log.warning(f"Webhook stopped with {_queue.qsize()} updates unprocessed")
+
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+
+def pending_updates() -> int:
+    return _queue.qsize() if _queue is not None else 0
+
+
+# ---------- HTTP HANDLER ----------
+async def _handle_update(request: web.Request) -> web.Response:
+    """
+    Accept one update: verify the secret, parse it and queue it for the workers.
+    Answers right away, so a slow handler never holds Telegram's connection open;
+    a full queue answers 503 and Telegram redelivers the update later.
+    """
+    if WEBHOOK_SECRET:
+        token = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(token.encode(), WEBHOOK_SECRET.encode()):
+            WEBHOOK_UPDATES.inc(status="unauthorized")
+            return web.Response(status=401)
+
+    if _queue.full():
+        return _busy()  # fast path: don't read the body
+
+    try:
+        update = Update.model_validate(await request.json(), context={"bot": request.app["bot"]})
+    except Exception as e:
+        # A malformed update would be redelivered forever on an error status → acknowledge it
+        log.warning(f"Ignoring invalid webhook update: {e}")
+        WEBHOOK_UPDATES.inc(status="invalid")
+        return web.Response()
+
+    try:
+        _queue.put_nowait(update)
+    except asyncio.QueueFull:
+        return _busy()  # other requests filled the queue while this body was being read
+    WEBHOOK_UPDATES.inc(status="accepted")
+    return web.Response()
+
+
+def _busy() -> web.Response:
+    WEBHOOK_UPDATES.inc(status="rejected")
+    return web.Response(status=503, headers={"Retry-After": str(RETRY_AFTER)})
+
+
+# ---------- WORKERS ----------
+async def _worker(bot: Bot, dp: Dispatcher):
+    """Feed queued updates to the dispatcher; the number of workers caps handler concurrency."""
+    while True:
+        update = await _queue.get()
+        try:
+            await dp.feed_update(bot, update)
+        except Exception as e:
+            log.error(f"Error while handling update {update.update_id}: {e}")
+        finally:
+            _queue.task_done()
@@ -0,0 +1,58 @@
+# utils/circuit_breaker.py - Per-endpoint circuit breaker
+
+import random
+import time
+
+
+class CircuitBreaker:
+    """
+    closed    → requests pass; `threshold` consecutive failures open the circuit
+    open      → requests are refused for `cooldown` seconds
+    half-open → one trial request passes; success closes the circuit, failure reopens it
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial = False  # a half-open trial request is in flight
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        """May a request be sent now? (Reserves the single trial slot when half-open.)"""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def release(self):
+        """Give back a half-open trial slot without a verdict (the request was cancelled)."""
+        self._trial = False
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def failure(self):
+        self.failures += 1
+        if self._trial or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+        self._trial = False
+
+
+def backoff_delay(attempt: int, base: float = 0.25, cap: float = 30.0) -> float:
+    """Exponential backoff with jitter: half fixed, half random, so retrying clients spread out."""
+    delay = min(cap, base * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
@@ -1,55 +1,115 @@
 # utils/logger.py - Logging settings
 
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
+from config import LOG_FILE, LOG_FORMAT, LOG_MAX_BYTES, LOG_BACKUPS, LOG_ROTATE_WHEN
+
+# Attributes every LogRecord has; anything else was passed via `extra=` and goes into JSON output
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+# ---------- JSON FORMATTER ----------
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, plus any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
 
 # ---------- SETUP LOGGER ----------
 def setup_logger(
     name: str = "Coin Tracker Bot",
-    log_file: str = "logs/crypto_alert_bot.log",
+    log_file: str = LOG_FILE,
     console_level=logging.INFO,
-    file_level=logging.DEBUG
+    file_level=logging.DEBUG,
+    fmt: str = LOG_FORMAT,
 ) -> logging.Logger:
     """
     Configure and return the main logger for CryptoAlertBot.
-    
+
     Features:
     - INFO level for console, DEBUG level for file logging
-    - Standard formatter with full timestamp
+    - Text (full timestamp) or JSON lines, see LOG_FORMAT
+    - Rotating log file: by size, or by time when LOG_ROTATE_WHEN is set
+    - Callers only put records on a queue; a background thread does the
+      formatting and the console/disk writes, so the event loop never blocks on I/O
     - Prevents duplicate handlers
-    - Logs both to console and file
     """
-    
+    global _listener
+
     logger = logging.getLogger(name)
     logger.setLevel(logging.DEBUG)  # base level
+    logger.propagate = False
 
     # Prevent duplicate handlers
     if logger.hasHandlers():
         logger.handlers.clear()
+    stop_logging()
 
     # Formatter
-    formatter = logging.Formatter(
-        fmt="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-        datefmt="%Y-%m-%d | %H:%M:%S"
-    )
+    if fmt == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            fmt="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+            datefmt="%Y-%m-%d | %H:%M:%S"
+        )
 
     # ---------- Console Handler ----------
     ch = logging.StreamHandler(sys.stdout)
     ch.setLevel(console_level)
     ch.setFormatter(formatter)
-    logger.addHandler(ch)
 
-    # ---------- File Handler ----------
+    # ---------- File Handler (rotating) ----------
     log_path = Path(log_file)
     log_path.parent.mkdir(parents=True, exist_ok=True)  # make sure folder exists
 
-    fh = logging.FileHandler(log_file, encoding="utf-8")
+    if LOG_ROTATE_WHEN:
+        fh = logging.handlers.TimedRotatingFileHandler(
+            log_file, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUPS, encoding="utf-8")
+    else:
+        fh = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
     fh.setLevel(file_level)
     fh.setFormatter(formatter)
-    logger.addHandler(fh)
+
+    # ---------- Queue → background writer thread ----------
+    records = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(records))  # message (and traceback) formatted here
+    _listener = logging.handlers.QueueListener(records, ch, fh, respect_handler_level=True)
+    _listener.start()
 
     return logger
 
+
+def stop_logging():
+    """Write out every queued record and stop the writer thread (safe to call twice)."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
 # Ready-to-use logger
 log = setup_logger()
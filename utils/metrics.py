@@ -0,0 +1,170 @@
+# utils/metrics.py - In-process counters / gauges / histograms with Prometheus text output
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_registry: List["_Metric"] = []
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        _registry.append(self)
+
+    def _key(self, label_values: dict) -> Tuple[str, ...]:
+        return tuple(str(label_values.get(l, "")) for l in self.labels)
+
+    def _fmt_labels(self, key: Tuple[str, ...], extra: str = "") -> str:
+        parts = [f'{l}="{v}"' for l, v in zip(self.labels, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+# ---------- COUNTER ----------
+class Counter(_Metric):
+    """Monotonically increasing value, optionally split by labels."""
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **label_values):
+        key = self._key(label_values)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def total(self) -> float:
+        return sum(self.values.values())
+
+    def render(self):
+        if not self.values and not self.labels:
+            return [f"{self.name} 0"]
+        return [f"{self.name}{self._fmt_labels(k)} {v}" for k, v in self.values.items()]
+
+
+# ---------- GAUGE ----------
+class Gauge(_Metric):
+    """Current value — either set explicitly or read from a callback at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labels=(), callback: Callable[[], float] | None = None):
+        super().__init__(name, help_text, labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+        self.callback = callback
+
+    def set(self, value: float, **label_values):
+        self.values[self._key(label_values)] = value
+
+    def value(self, **label_values) -> float:
+        if self.callback is not None:
+            return self.callback()
+        return self.values.get(self._key(label_values), 0)
+
+    def render(self):
+        if self.callback is not None:
+            return [f"{self.name} {self.callback()}"]
+        return [f"{self.name}{self._fmt_labels(k)} {v}" for k, v in self.values.items()]
+
+
+# ---------- HISTOGRAM ----------
+class Histogram(_Metric):
+    """Bucketed distribution (cumulative buckets in the output, like prometheus_client)."""
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+        # label key → [per-bucket counts..., +Inf count], sum
+        self.counts: Dict[Tuple[str, ...], List[int]] = {}
+        self.sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **label_values):
+        key = self._key(label_values)
+        counts = self.counts.get(key)
+        if counts is None:
+            counts = self.counts[key] = [0] * (len(self.buckets) + 1)
+            self.sums[key] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self.sums[key] += value
+
+    @contextmanager
+    def time(self, **label_values):
+        """Observe the duration of a `with` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **label_values)
+
+    def count(self, **label_values) -> int:
+        return sum(self.counts.get(self._key(label_values), ()))
+
+    def mean(self, **label_values) -> float:
+        n = self.count(**label_values)
+        return self.sums.get(self._key(label_values), 0.0) / n if n else 0.0
+
+    def quantile(self, q: float, **label_values) -> float:
+        """Upper bound of the bucket holding the q-quantile (coarse, but free)."""
+        counts = self.counts.get(self._key(label_values))
+        if not counts:
+            return 0.0
+        target, seen = q * sum(counts), 0
+        for bound, c in zip(self.buckets + (float("inf"),), counts):
+            seen += c
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def render(self):
+        lines = []
+        for key, counts in self.counts.items():
+            cumulative = 0
+            for bound, c in zip(self.buckets + ("+Inf",), counts):
+                cumulative += c
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{self._fmt_labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._fmt_labels(key)} {self.sums[key]}")
+            lines.append(f"{self.name}_count{self._fmt_labels(key)} {cumulative}")
+        return lines
+
+
+# ---------- EXPOSITION ----------
+def render_prometheus() -> str:
+    """Render every registered metric in the Prometheus text format (v0.0.4)."""
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------- BOT METRICS ----------
+CHECK_CYCLE_SECONDS = Histogram("price_check_cycle_seconds", "Duration of one price check cycle (fetch + evaluation)")
+BINANCE_REQUEST_SECONDS = Histogram("binance_request_seconds", "Binance REST request latency", ("endpoint",))
+BINANCE_REQUESTS = Counter("binance_requests_total", "Binance REST requests by status code", ("endpoint", "status"))
+BINANCE_RETRIES = Counter("binance_retries_total", "Binance REST attempts after the first", ("endpoint",))
+PROVIDER_REQUESTS = Counter("price_provider_requests_total", "Price provider requests by outcome", ("provider", "outcome"))
+PROVIDER_HEDGES = Counter("price_provider_hedges_total", "Price requests that started a backup provider")
+PROVIDER_SCORE = Gauge("price_provider_health_score", "Provider health: success rate discounted by latency (0–1)",
+                       ("provider",))
+ALERTS_EVALUATED = Counter("alerts_evaluated_total", "Pending alerts on symbols whose price was checked")
+ALERTS_TRIGGERED = Counter("alerts_triggered_total", "Alerts that fired")
+NOTIFY_SEND_SECONDS = Histogram("notification_send_seconds", "Telegram sendMessage latency")
+NOTIFICATIONS = Counter("notifications_total", "Notification send attempts by outcome", ("status",))
+LOOP_LAG_SECONDS = Histogram("event_loop_lag_seconds", "How late the event loop wakes a sleeping probe")
+HANDLER_SECONDS = Histogram("handler_seconds", "Command handler latency", ("command",))
+FLOOD_CONTROL = Counter("flood_control_total", "Commands not handled normally by outcome", ("outcome",))
+WEBHOOK_UPDATES = Counter("webhook_updates_total", "Webhook requests by outcome", ("status",))
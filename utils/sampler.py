@@ -0,0 +1,104 @@
+# utils/sampler.py - Low-overhead sampling profiler for the event-loop thread
+
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType
+from typing import Callable, Dict, List, Tuple
+
+MAX_DEPTH = 40  # frames kept per sample (innermost first when walking)
+
+
+class StackSampler:
+    """
+    A daemon thread that snapshots another thread's Python stack every `interval` seconds.
+
+    Only code that is actually running shows up (suspended coroutines aren't on the stack),
+    so the counts are CPU hot spots of the event loop. Each sample is attributed to the
+    innermost tracked function on the stack (see track()), e.g. "price_check" or "/price".
+    """
+
+    def __init__(self, thread_id: int | None = None, interval: float = 0.005):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.targets: Dict[CodeType, str] = {}
+        self.stacks: Counter = Counter()  # (label, folded stack) → samples
+        self.samples = 0
+        self.started_at = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def track(self, label: str, func: Callable):
+        """Attribute samples taken while `func` (or anything it calls) runs to `label`."""
+        code = getattr(func, "__code__", None)
+        if code is not None:
+            self.targets[code] = label
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ---------- START / STOP ----------
+    def start(self):
+        if self.running:
+            return
+        self.stacks.clear()
+        self.samples = 0
+        self.started_at = time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            names, label = [], None
+            while frame is not None and len(names) < MAX_DEPTH:
+                code = frame.f_code
+                if label is None:
+                    label = self.targets.get(code)
+                names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                frame = frame.f_back
+
+            # The loop waiting in select() is idle time, not a hot spot
+            if names and names[0].startswith("select ("):
+                label = "idle"
+
+            self.stacks[(label or "other", ";".join(reversed(names)))] += 1
+            self.samples += 1
+
+    # ---------- REPORTS ----------
+    def by_label(self) -> List[Tuple[str, int]]:
+        """Samples per label, most first."""
+        totals = Counter()
+        for (label, _), count in self.stacks.items():
+            totals[label] += count
+        return totals.most_common()
+
+    def report(self, top: int = 5) -> str:
+        """Share of samples per label and the hottest stacks of each (innermost frames only)."""
+        elapsed = time.monotonic() - self.started_at
+        lines = [f"{self.samples:,} samples over {elapsed:,.1f}s ({self.interval * 1000:g} ms interval)"]
+
+        for label, count in self.by_label():
+            lines.append(f"\n{label}: {count:,} samples ({count / max(1, self.samples):.1%})")
+            hottest = [(s, c) for (l, s), c in self.stacks.most_common() if l == label][:top]
+            for stack, c in hottest:
+                frames = stack.split(";")
+                lines.append(f"  {c:>6,}  " + " ← ".join(reversed(frames[-4:])))
+
+        return "\n".join(lines)
+
+    def folded(self) -> str:
+        """Brendan Gregg's folded format ("a;b;c 42" per line) for flamegraph.pl / speedscope."""
+        return "\n".join(f"{label};{stack} {count}" for (label, stack), count in self.stacks.most_common())
@@ -0,0 +1,48 @@
+# utils/token_bucket.py - Async token bucket rate limiter
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, up to `capacity` stored.
+    `acquire()` waits until a token is available; `try_acquire()` never waits.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if available right now."""
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens now, going into debt if needed; return the seconds until they were due."""
+        self._refill()
+        self.tokens -= tokens
+        return max(0.0, -self.tokens / self.rate)
+
+    async def acquire(self, tokens: float = 1.0):
+        """Wait (fairly, one waiter at a time) until tokens can be taken."""
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+    def is_idle(self) -> bool:
+        """True when the bucket is full again, i.e. it can be discarded safely."""
+        self._refill()
+        return self.tokens >= self.capacity